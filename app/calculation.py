@@ -2,9 +2,16 @@ from dataclasses import dataclass, field
 import datetime
 from decimal import Decimal, InvalidOperation
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Set
 
-from app.exceptions import OperationError
+from app.decimal_context import quantizer, thread_context, working_precision
+from app.exceptions import OperationError, ValidationError
+
+# Operations whose history entries summarise many values (see
+# ReductionCalculation); app.operations registers every Reduction here.
+REDUCTION_OPERATIONS: Set[str] = set()
+# Marks the operation name of a VectorCalculation, e.g. 'Addition[]'.
+VECTOR_SUFFIX = '[]'
 
 
 @dataclass
@@ -35,13 +42,26 @@ class Calculation:
 
         op = operations.get(self.operation)
         if not op:
-            raise OperationError(f"Unknown operation: {self.operation}")
+            return self._calculate_registered()
 
         try:
             return op(self.operand1, self.operand2)
         except (InvalidOperation, ValueError, ArithmeticError) as e:
             raise OperationError(f"Calculation failed: {str(e)}")
 
+    def _calculate_registered(self) -> Decimal:
+        # Operations added through OperationFactory (registered or plugins).
+        from app.operations import OperationFactory
+
+        try:
+            operation = OperationFactory.operation_named(self.operation)
+        except ValueError:
+            raise OperationError(f"Unknown operation: {self.operation}")
+        try:
+            return Decimal(operation.execute(self.operand1, self.operand2))
+        except (ValidationError, InvalidOperation, ValueError, ArithmeticError) as e:
+            raise OperationError(f"Calculation failed: {str(e)}")
+
     @staticmethod
     def _raise_div_zero():
         raise OperationError("Division by zero is not allowed")
@@ -68,8 +88,36 @@ class Calculation:
         }
 
     @staticmethod
-    def from_dict(data: Dict[str, Any]) -> 'Calculation':
+    def from_dict(data: Dict[str, Any], recompute: bool = True) -> 'Calculation':
+        """Rebuild a calculation from ``to_dict`` output.
+
+        With ``recompute=False`` the stored result is trusted, e.g. one a
+        replication primary has already computed.
+        """
         try:
+            if data['operation'].endswith(VECTOR_SUFFIX):
+                return VectorCalculation(
+                    operation=data['operation'][:-len(VECTOR_SUFFIX)],
+                    operand1=_vector_or_decimal(data['operand1']),
+                    operand2=_vector_or_decimal(data['operand2']),
+                    result=DecimalVector.parse(str(data['result'])),
+                    timestamp=datetime.datetime.fromisoformat(data['timestamp'])
+                )
+            if data['operation'] in REDUCTION_OPERATIONS:
+                return ReductionCalculation(
+                    operation=data['operation'],
+                    count=int(Decimal(data['operand1'])),
+                    result=Decimal(data['result']),
+                    timestamp=datetime.datetime.fromisoformat(data['timestamp'])
+                )
+            if not recompute:
+                calc = Calculation.__new__(Calculation)
+                calc.operation = data['operation']
+                calc.operand1 = Decimal(data['operand1'])
+                calc.operand2 = Decimal(data['operand2'])
+                calc.result = Decimal(data['result'])
+                calc.timestamp = datetime.datetime.fromisoformat(data['timestamp'])
+                return calc
             calc = Calculation(
                 operation=data['operation'],
                 operand1=Decimal(data['operand1']),
@@ -78,9 +126,12 @@ class Calculation:
             calc.timestamp = datetime.datetime.fromisoformat(data['timestamp'])
             saved_result = Decimal(data['result'])
             if calc.result != saved_result:
-                logging.warning(
-                    f"Loaded result {saved_result} != computed {calc.result}"
-                )
+                if _rounds_to(calc.result, saved_result):
+                    calc.result = saved_result  # stored rounded to the configured places
+                else:
+                    logging.warning(
+                        f"Loaded result {saved_result} != computed {calc.result}"
+                    )
             return calc
         except (KeyError, InvalidOperation, ValueError) as e:
             raise OperationError(f"Invalid calculation data: {str(e)}")
@@ -107,8 +158,114 @@ class Calculation:
 
     def format_result(self, precision: int = 10) -> str:
         try:
-            return str(self.result.normalize().quantize(
-                Decimal('0.' + '0' * precision)
-            ).normalize())
+            context = thread_context(working_precision(precision) + max(self.result.adjusted(), 0))
+            value = self.result.normalize(context).quantize(quantizer(-precision), context=context)
+            return str(value.normalize(context))
         except InvalidOperation:
             return str(self.result)
+
+
+def _rounds_to(computed: Decimal, saved: Decimal) -> bool:
+    try:
+        return saved.is_finite() and computed.quantize(saved) == saved
+    except InvalidOperation:
+        return False
+
+
+class ReductionCalculation(Calculation):
+    """History entry for an n-ary reduction, recorded once for all its values.
+
+    ``operand1`` holds how many values were reduced and ``operand2`` is
+    unused (zero). The inputs are not kept, so the result is stored rather
+    than recomputed.
+    """
+
+    def __init__(
+        self,
+        operation: str,
+        count: int,
+        result: Decimal,
+        timestamp: Optional[datetime.datetime] = None
+    ):
+        self.operation = operation
+        self.operand1 = Decimal(count)
+        self.operand2 = Decimal(0)
+        self.result = result
+        self.timestamp = timestamp or datetime.datetime.now()
+
+    @property
+    def count(self) -> int:
+        return int(self.operand1)
+
+    def calculate(self) -> Decimal:
+        return self.result
+
+    def __str__(self) -> str:
+        return f"{self.operation}({self.count} values) = {self.result}"
+
+
+class DecimalVector(tuple):
+    """A vector operand or result of a VectorCalculation.
+
+    ``str()`` gives the stored form, e.g. '[1, 2, 3.5]', which ``parse``
+    reads back.
+    """
+
+    def __str__(self) -> str:
+        return f"[{', '.join(str(value) for value in self)}]"
+
+    @classmethod
+    def parse(cls, text: str) -> 'DecimalVector':
+        inner = text.strip()[1:-1].strip()
+        return cls(Decimal(item) for item in inner.split(',')) if inner else cls()
+
+
+def _vector_or_decimal(text: str) -> Any:
+    text = str(text).strip()
+    return DecimalVector.parse(text) if text.startswith('[') else Decimal(text)
+
+
+class VectorCalculation(Calculation):
+    """History entry for one elementwise operation over whole vectors.
+
+    ``operand1`` and ``operand2`` are DecimalVectors, or a Decimal for a
+    scalar that was broadcast; ``result`` is the DecimalVector of
+    elementwise results. The results are stored rather than recomputed.
+    """
+
+    PREVIEW = 5
+
+    def __init__(
+        self,
+        operation: str,
+        operand1: Any,
+        operand2: Any,
+        result: DecimalVector,
+        timestamp: Optional[datetime.datetime] = None
+    ):
+        self.operation = operation + VECTOR_SUFFIX
+        self.operand1 = operand1
+        self.operand2 = operand2
+        self.result = DecimalVector(result)
+        self.timestamp = timestamp or datetime.datetime.now()
+
+    @property
+    def count(self) -> int:
+        return len(self.result)
+
+    def calculate(self) -> DecimalVector:
+        return self.result
+
+    @classmethod
+    def _preview(cls, value: Any) -> str:
+        if not isinstance(value, DecimalVector) or len(value) <= cls.PREVIEW:
+            return str(value)
+        head = ', '.join(str(item) for item in value[:cls.PREVIEW])
+        return f"[{head}, ... ({len(value)} values)]"
+
+    def __str__(self) -> str:
+        name = self.operation[:-len(VECTOR_SUFFIX)]
+        return (
+            f"{name}({self._preview(self.operand1)}, {self._preview(self.operand2)})"
+            f" = {self._preview(self.result)}"
+        )
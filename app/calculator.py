@@ -1,23 +1,64 @@
+import datetime
 from decimal import Decimal
+import itertools
 import logging
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import weakref
 
-import pandas as pd
-
-from app.calculation import Calculation
+from app.calculation import Calculation, DecimalVector, ReductionCalculation, VectorCalculation
 from app.calculator_config import CalculatorConfig
 from app.calculator_memento import CalculatorMemento
+from app.checkpoint import read_checkpoint, write_checkpoint
+from app.decimal_context import precision_context, round_places, working_precision
+from app.event_bus import EventBus
 from app.exceptions import OperationError, ValidationError
 from app.history import HistoryObserver
+from app.history_export import export_format_for, export_records
+from app.history_storage import (
+    HistoryStorage,
+    Record,
+    create_history_storage,
+    drop_removed,
+    filter_calculations,
+    pending_records,
+    record_chunks,
+    row_key,
+)
 from app.input_validators import InputValidator
-from app.operations import Operation
+from app.log_rotation import CompressingRotatingFileHandler
+from app.memory_report import build_memory_report
+from app.metrics import MetricsRecorder
+from app.operations import (
+    Operand,
+    Operation,
+    OperationFactory,
+    Reduction,
+    is_numeric_array,
+    is_vector,
+)
+from app.pipeline import Executor, Pipeline
+from app.remote_workers import WorkerPool
+from app.replication import ReplicationFollower, ReplicationLog, history_edit
+from app.result_cache import ResultCache
+from app.tiered_history import SegmentStore, estimate_size
+from app.undo_journal import UndoJournal, delta_between, make_delta
+
+if TYPE_CHECKING:  # pragma: no cover
+    import pandas as pd
 
 Number = Union[int, float, Decimal]
 CalculationResult = Union[Number, str]
 
 
+def _execute_locally(operation: Operation, a: Sequence[Decimal], b: Sequence[Decimal]) -> List[Number]:
+    return operation.execute_many(a, b)
+
+
 class Calculator:
     def __init__(self, config: Optional[CalculatorConfig] = None):
         if config is None:
@@ -27,21 +68,104 @@ class Calculator:
 
         self.config = config
         self.config.validate()
+        # Arithmetic runs in a per-thread context at the configured
+        # precision plus guard digits rather than the global context.
+        self.decimal_precision = working_precision(self.config.precision)
         os.makedirs(self.config.log_dir, exist_ok=True)
         self._setup_logging()
 
         self.history: List[Calculation] = []
         self.operation_strategy: Optional[Operation] = None
         self.observers: List[HistoryObserver] = []
+        self.event_bus = EventBus(
+            mode=self.config.observer_dispatch,
+            max_queue_size=self.config.observer_queue_size,
+            policy=self.config.observer_backpressure,
+            batch_size=self.config.observer_batch_size
+        )
         self.undo_stack: List[CalculatorMemento] = []
         self.redo_stack: List[CalculatorMemento] = []
+        self.metrics: Optional[MetricsRecorder] = (
+            MetricsRecorder() if self.config.metrics_enabled else None
+        )
+
+        self._history_lock = threading.RLock()
+        self._history_ready = threading.Event()
+        self._history_ready.set()
+        self._discard_pending_load = False
+        # Changes not yet written to an incremental storage backend: new
+        # calculations, saved ones to remove, and whether to clear first.
+        # Unsaved calculations taken back by undo wait in _withdrawn.
+        self._unsaved: List[Calculation] = []
+        self._withdrawn: Dict[int, Calculation] = {}
+        self._pending_removals: Dict[int, Calculation] = {}
+        self._pending_clear = False
+        # Held while changes are written, so readers never see half a save.
+        self._save_lock = threading.Lock()
+
+        # Tiered mode spills evicted calculations to compressed segments on
+        # disk; _spilled tracks them so undo never brings them back to memory.
+        self.cold_store: Optional[SegmentStore] = None
+        self._spilled: 'weakref.WeakValueDictionary[int, Calculation]' = weakref.WeakValueDictionary()
+        self._hot_bytes = 0
 
         self._setup_directories()
+        OperationFactory.discover(self.config.plugin_dir)
+        self.storage: HistoryStorage = create_history_storage(self.config)
+        # Batch steps are sent to remote workers when any are configured.
+        self.worker_pool: Optional[WorkerPool] = None
+        if self.config.workers:
+            self.worker_pool = WorkerPool(
+                self.config.workers,
+                chunk_size=self.config.worker_chunk_size,
+                timeout=self.config.worker_timeout
+            )
+        # Persistent undo keeps undo_window mementos in memory and journals
+        # every step as a delta; the journal is only replayed past the window.
+        self.undo_journal: Optional[UndoJournal] = None
+        if self.config.persistent_undo:
+            self.undo_journal = UndoJournal(
+                self.config.undo_journal_file,
+                encoding=self.config.default_encoding,
+                max_depth=self.config.undo_depth
+            )
+        # Persistent cache for cacheable (expensive) operations.
+        self.result_cache: Optional[ResultCache] = None
+        if self.config.result_cache:
+            self.result_cache = ResultCache(
+                self.config.result_cache_file,
+                max_bytes=self.config.result_cache_max_bytes,
+                timeout=self.config.lock_timeout
+            )
+        if self.config.tiered_history:
+            self.cold_store = SegmentStore(
+                self.config.segments_dir,
+                segment_size=self.config.segment_size,
+                encoding=self.config.default_encoding
+            )
 
-        try:
-            self.load_history()
-        except Exception as e:
-            logging.warning(f"Could not load existing history: {e}")
+        # A primary ships every history change to the replication log; a
+        # follower replays that log instead of loading its own history.
+        self.replication_log: Optional[ReplicationLog] = None
+        self.replication_follower: Optional[ReplicationFollower] = None
+        if self.config.replication == 'primary':
+            self.replication_log = ReplicationLog(
+                self.config.replication_file,
+                encoding=self.config.default_encoding,
+                max_bytes=self.config.replication_max_bytes
+            )
+
+        if self.config.replication == 'follower':
+            self.replication_follower = ReplicationFollower(self, self.config.replication_file)
+            self.replication_follower.poll()
+            self.replication_follower.start()
+        elif self.config.background_load:
+            self._start_background_load()
+        else:
+            try:
+                self.load_history()
+            except Exception as e:
+                logging.warning(f"Could not load existing history: {e}")
 
         logging.info("Calculator initialized with configuration")
 
@@ -49,8 +173,16 @@ class Calculator:
         try:
             os.makedirs(self.config.log_dir, exist_ok=True)
             log_file = self.config.log_file.resolve()
+            handler = CompressingRotatingFileHandler(
+                str(log_file),
+                max_bytes=self.config.log_max_bytes,
+                backup_count=self.config.log_backup_count,
+                rotate_interval=self.config.log_rotate_interval,
+                compress=self.config.log_compress,
+                encoding=self.config.default_encoding
+            )
             logging.basicConfig(
-                filename=str(log_file),
+                handlers=[handler],
                 level=logging.INFO,
                 format='%(asctime)s - %(levelname)s - %(message)s',
                 force=True
@@ -63,47 +195,254 @@ class Calculator:
     def _setup_directories(self) -> None:
         self.config.history_dir.mkdir(parents=True, exist_ok=True)
 
-    def add_observer(self, observer: HistoryObserver) -> None:
+    def add_observer(
+        self,
+        observer: HistoryObserver,
+        operations: Optional[Iterable[str]] = None,
+        max_queue_size: Optional[int] = None,
+        policy: Optional[str] = None
+    ) -> None:
         self.observers.append(observer)
+        self.event_bus.subscribe(
+            observer,
+            operations=operations,
+            max_queue_size=max_queue_size,
+            policy=policy
+        )
         logging.info(f"Added observer: {observer.__class__.__name__}")
 
     def remove_observer(self, observer: HistoryObserver) -> None:
         self.observers.remove(observer)
+        self.event_bus.unsubscribe(observer)
         logging.info(f"Removed observer: {observer.__class__.__name__}")
 
     def notify_observers(self, calculation: Calculation) -> None:
-        for observer in self.observers:
-            observer.update(calculation)
+        self.event_bus.publish(calculation)
+
+    def flush_observers(self, timeout: Optional[float] = None) -> bool:
+        return self.event_bus.flush(timeout)
+
+    def get_observer_stats(self) -> List[Dict[str, Any]]:
+        return self.event_bus.stats()
 
     def set_operation(self, operation: Operation) -> None:
         self.operation_strategy = operation
         logging.info(f"Set operation: {operation}")
 
     def perform_operation(self, a: Union[str, Number], b: Union[str, Number]) -> CalculationResult:
+        self._check_writable()
         if not self.operation_strategy:
             raise OperationError("No operation set")
 
         try:
+            if self.metrics is None:
+                return self._perform(a, b)
+            return self._perform_timed(a, b, self.metrics)
+
+        except ValidationError as e:
+            logging.error(f"Validation error: {str(e)}")
+            raise
+        except Exception as e:
+            logging.error(f"Operation failed: {str(e)}")
+            raise OperationError(f"Operation failed: {str(e)}")
+
+    def _perform(self, a: Union[str, Number], b: Union[str, Number]) -> CalculationResult:
+        # _perform_timed runs the same stages with a clock reading between them.
+        with precision_context(self.decimal_precision):
             validated_a = InputValidator.validate_number(a, self.config)
             validated_b = InputValidator.validate_number(b, self.config)
-            result = self.operation_strategy.execute(validated_a, validated_b)
+            result = self._round(self._execute(validated_a, validated_b))
+            calculation = self._calculation(validated_a, validated_b)
 
-            calculation = Calculation(
-                operation=str(self.operation_strategy),
-                operand1=validated_a,
-                operand2=validated_b
-            )
+        with self._history_lock:
+            self._push_memento()
+            self._append_history([calculation])
+        self.notify_observers(calculation)
+        return result
 
-            self.undo_stack.append(CalculatorMemento(self.history.copy()))
-            self.redo_stack.clear()
-            self.history.append(calculation)
+    def _calculation(self, a: Decimal, b: Decimal) -> Calculation:
+        calculation = Calculation(operation=str(self.operation_strategy), operand1=a, operand2=b)
+        calculation.result = self._round(calculation.result)
+        return calculation
+
+    def _round(self, value: CalculationResult) -> CalculationResult:
+        # Results keep the configured decimal places, not the guard digits.
+        if isinstance(value, Decimal):
+            return round_places(value, self.config.precision)
+        return value
+
+    def _execute(self, a: Decimal, b: Decimal) -> CalculationResult:
+        operation = self.operation_strategy
+        if self.result_cache is None or not operation.cacheable:
+            return operation.execute(a, b)
+        cached = self._cached(operation, a, b)
+        if cached is not None:
+            return cached
+        result = operation.execute(a, b)
+        self._cache(operation, a, b, result)
+        return result
+
+    def _executor(self) -> Optional[Executor]:
+        # Column executor for pipelines and vectors, or None to run them
+        # locally with no cache.
+        if self.worker_pool is None and self.result_cache is None:
+            return None
+        return self._execute_column
+
+    def _execute_column(self, operation: Operation, a: Sequence[Decimal], b: Sequence[Decimal]) -> List[Number]:
+        compute: Executor = self.worker_pool.execute_many if self.worker_pool else _execute_locally
+        if self.result_cache is None or not operation.cacheable:
+            return compute(operation, a, b)
+        xs, ys = operation.validate_many(a, b)
+        results = [self._cached(operation, x, y) for x, y in zip(xs, ys)]
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            computed = compute(operation, [xs[i] for i in missing], [ys[i] for i in missing])
+            for index, result in zip(missing, computed):
+                results[index] = result
+                self._cache(operation, xs[index], ys[index], result)
+        return results
+
+    def _cached(self, operation: Operation, a: Decimal, b: Decimal) -> Optional[Decimal]:
+        try:
+            return self.result_cache.get(str(operation), a, b, self.decimal_precision)
+        except sqlite3.Error as e:
+            logging.warning(f"Result cache lookup failed: {e}")
+            return None
+
+    def _cache(self, operation: Operation, a: Decimal, b: Decimal, result: Number) -> None:
+        try:
+            self.result_cache.put(str(operation), a, b, self.decimal_precision, Decimal(result))
+        except sqlite3.Error as e:
+            logging.warning(f"Result cache update failed: {e}")
 
-            if len(self.history) > self.config.max_history_size:
-                self.history.pop(0)
+    def _perform_timed(
+        self,
+        a: Union[str, Number],
+        b: Union[str, Number],
+        metrics: MetricsRecorder
+    ) -> CalculationResult:
+        # Mirrors _perform stage by stage; kept separate so the untimed path
+        # pays nothing when metrics are disabled.
+        operation = str(self.operation_strategy)
+        clock = time.perf_counter
+        start = clock()
+        try:
+            with precision_context(self.decimal_precision):
+                validated_a = InputValidator.validate_number(a, self.config)
+                validated_b = InputValidator.validate_number(b, self.config)
+                t_validated = clock()
+                result = self._round(self._execute(validated_a, validated_b))
+                t_executed = clock()
+                calculation = self._calculation(validated_a, validated_b)
+            t_built = clock()
 
+            with self._history_lock:
+                self._push_memento()
+                t_memento = clock()
+                self._extend_history([calculation])
+                t_extended = clock()
+                evicted = self._evict_overflow()
+                t_evicted = clock()
+                self._record_append([calculation], evicted)
+                t_appended = clock()
             self.notify_observers(calculation)
-            return result
+            end = clock()
+        except Exception:
+            metrics.count_error(operation)
+            raise
+
+        metrics.observe('validation', operation, t_validated - start)
+        metrics.observe('execute', operation, t_executed - t_validated)
+        metrics.observe('calculation', operation, t_built - t_executed)
+        metrics.observe('memento', operation, t_memento - t_built)
+        metrics.observe('append', operation, (t_extended - t_memento) + (t_appended - t_evicted))
+        metrics.observe('eviction', operation, t_evicted - t_extended)
+        metrics.observe('notify', operation, end - t_appended)
+        metrics.observe('total', operation, end - start)
+        metrics.count_operation(operation)
+        return result
+
+    def run_pipeline(
+        self,
+        pipeline: Pipeline,
+        values: Iterable[Union[str, Number]],
+        record: Optional[str] = None
+    ) -> List[Decimal]:
+        """Apply ``pipeline`` to every value in one fused pass; return the final results.
+
+        The run is validated and computed up front, then recorded as a single
+        undo step and published to observers as one batch. ``record`` ('all'
+        or 'final', defaulting to the configuration) chooses whether history
+        gets every step or only each value's last step.
+        """
+        self._check_writable()
+        record = record or self.config.pipeline_record
+        if record not in ('all', 'final'):
+            raise OperationError(f"Unknown pipeline record mode: {record}")
+        try:
+            with precision_context(self.decimal_precision):
+                inputs = [InputValidator.validate_number(value, self.config) for value in values]
+                for _, operand in pipeline.steps:
+                    InputValidator.validate_number(operand, self.config)
+                columns = pipeline.run(inputs, self._executor())
+                first_step = 0 if record == 'all' else len(pipeline) - 1
+                calculations = [
+                    Calculation(
+                        operation=str(operation),
+                        operand1=columns[step][index],
+                        operand2=operand
+                    )
+                    for index in range(len(inputs))
+                    for step, (operation, operand) in enumerate(pipeline.steps[first_step:], first_step)
+                ]
+                for calculation in calculations:
+                    calculation.result = self._round(calculation.result)
+                results = [self._round(result) for result in columns[-1]]
+        except ValidationError as e:
+            logging.error(f"Validation error: {str(e)}")
+            raise
+        except Exception as e:
+            logging.error(f"Pipeline failed: {str(e)}")
+            raise OperationError(f"Pipeline failed: {str(e)}")
+
+        if calculations:
+            with self._history_lock:
+                self._push_memento()
+                self._append_history(calculations)
+            self.event_bus.publish_many(calculations)
+        logging.info(f"Ran pipeline {pipeline} over {len(inputs)} values")
+        return results
+
+    def perform_reduction(
+        self,
+        operation: Union[str, Reduction],
+        values: Iterable[Union[str, Number]]
+    ) -> Decimal:
+        """Reduce any number of values (e.g. 'sum', 'mean', 'stddev') to one result.
+
+        Values are validated as they are consumed, so iterators are streamed
+        without being held in memory. History gets one compact entry with
+        the value count and the result. Reductions always run locally: the
+        worker pool computes elementwise columns, not running totals.
+        """
+        self._check_writable()
+        if isinstance(operation, str):
+            operation = OperationFactory.create_operation(operation)
+        if not isinstance(operation, Reduction):
+            raise OperationError(f"{operation} is not a reduction operation")
 
+        count = 0
+
+        def validated() -> Iterator[Decimal]:
+            nonlocal count
+            for value in values:
+                count += 1
+                yield InputValidator.validate_number(value, self.config)
+
+        try:
+            with precision_context(self.decimal_precision):
+                result = self._round(operation.reduce(validated()))
         except ValidationError as e:
             logging.error(f"Validation error: {str(e)}")
             raise
@@ -111,48 +450,513 @@ class Calculator:
             logging.error(f"Operation failed: {str(e)}")
             raise OperationError(f"Operation failed: {str(e)}")
 
+        calculation = ReductionCalculation(operation=str(operation), count=count, result=result)
+        with self._history_lock:
+            self._push_memento()
+            self._append_history([calculation])
+        self.notify_observers(calculation)
+        return result
+
+    def perform_vector_operation(
+        self,
+        operation: Union[str, Operation],
+        a: Operand,
+        b: Operand
+    ) -> Union[List[Decimal], Any]:
+        """Apply an operation elementwise over vector operands (lists or NumPy arrays).
+
+        A scalar operand is broadcast against the other. Numeric NumPy
+        arrays are computed in float64 and return an array; other inputs
+        are computed in Decimal, on the worker pool if one is configured,
+        and return a list. History gets one entry holding the operand and
+        result vectors, not one entry per element.
+        """
+        self._check_writable()
+        if isinstance(operation, str):
+            operation = OperationFactory.create_operation(operation)
+        try:
+            with precision_context(self.decimal_precision):
+                a, b = self._validate_operand(a), self._validate_operand(b)
+                result = operation.execute_vector(a, b, self._executor())
+                if not is_numeric_array(result):
+                    result = [self._round(item) for item in result]
+                calculation = VectorCalculation(
+                    operation=str(operation),
+                    operand1=self._recorded(a),
+                    operand2=self._recorded(b),
+                    result=self._recorded(result)
+                )
+        except ValidationError as e:
+            logging.error(f"Validation error: {str(e)}")
+            raise
+        except Exception as e:
+            logging.error(f"Operation failed: {str(e)}")
+            raise OperationError(f"Operation failed: {str(e)}")
+
+        with self._history_lock:
+            self._push_memento()
+            self._append_history([calculation])
+        self.notify_observers(calculation)
+        return result
+
+    @staticmethod
+    def _recorded(value: Operand) -> Union[Decimal, DecimalVector]:
+        # Arrays are flattened to their values; float64 entries are stored exactly.
+        if is_numeric_array(value):
+            return DecimalVector(Decimal(repr(item)) for item in value.ravel().tolist())
+        if is_vector(value):
+            return DecimalVector(Decimal(item) for item in value)
+        return value
+
+    def _validate_operand(self, value: Operand) -> Operand:
+        if is_numeric_array(value):
+            return InputValidator.validate_array(value, self.config)
+        if is_vector(value):
+            return [InputValidator.validate_number(item, self.config) for item in value]
+        return InputValidator.validate_number(value, self.config)
+
+    def _push_memento(self) -> None:
+        self._push_bounded(self.undo_stack, CalculatorMemento(self.history.copy()))
+        self.redo_stack.clear()
+
+    def _push_bounded(self, stack: List[CalculatorMemento], memento: CalculatorMemento) -> None:
+        stack.append(memento)
+        if self.undo_journal is not None and len(stack) > self.config.undo_window:
+            del stack[0]
+
+    def _append_history(self, calculations: List[Calculation]) -> None:
+        self._extend_history(calculations)
+        self._record_append(calculations, self._evict_overflow())
+
+    def _extend_history(self, calculations: List[Calculation]) -> None:
+        self.history.extend(calculations)
+        if self.storage.incremental:
+            self._unsaved.extend(calculations)
+        if self.config.max_history_bytes:
+            self._hot_bytes += sum(estimate_size(calc) for calc in calculations)
+
+    def _evict_overflow(self) -> List[Calculation]:
+        byte_cap = self.config.max_history_bytes
+        if len(self.history) > self.config.max_history_size or (byte_cap and self._hot_bytes > byte_cap):
+            return self._evict_history()
+        return []
+
+    def _record_append(self, calculations: List[Calculation], evicted: List[Calculation]) -> None:
+        # Journal and replicate an append, including what it evicted.
+        if self.undo_journal is not None:
+            appended, dropped = calculations, evicted
+            if len(calculations) > 1 and evicted:
+                # A large batch can evict some of its own calculations.
+                new_ids = {id(calc) for calc in calculations}
+                evicted_ids = {id(calc) for calc in evicted}
+                appended = [calc for calc in calculations if id(calc) not in evicted_ids]
+                dropped = [calc for calc in evicted if id(calc) not in new_ids]
+            self.undo_journal.record(make_delta(appended, dropped))
+        if self.replication_log is not None:
+            self.replication_log.publish('append', calcs=[calc.to_dict() for calc in calculations])
+            if evicted:
+                self.replication_log.publish('evict', count=len(evicted))
+            self._compact_replication_log()
+
+    def _evict_history(self) -> List[Calculation]:
+        byte_cap = self.config.max_history_bytes
+        evicted = []
+        while len(self.history) > self.config.max_history_size or (
+            byte_cap and self._hot_bytes > byte_cap and len(self.history) > 1
+        ):
+            calc = self.history.pop(0)
+            if byte_cap:
+                self._hot_bytes -= estimate_size(calc)
+            evicted.append(calc)
+        if evicted and self.cold_store is not None:
+            self.cold_store.append(evicted)
+            for calc in evicted:
+                self._spilled[id(calc)] = calc
+        return evicted
+
+    def _restore_history(self, entries: List[Calculation]) -> None:
+        if self._spilled:
+            entries = [calc for calc in entries if id(calc) not in self._spilled]
+        self.history = entries
+        if self.config.max_history_bytes:
+            self._hot_bytes = sum(estimate_size(calc) for calc in entries)
+
+    def _replicate_edit(self, kind: str, before: List[Calculation]) -> None:
+        if self.replication_log is not None:
+            self.replication_log.publish(kind, **history_edit(before, self.history))
+            self._compact_replication_log()
+
+    def _replicate_reset(self) -> None:
+        # A reset carries the whole window, so it replaces the log's earlier events.
+        if self.replication_log is not None:
+            self.replication_log.compact([calc.to_dict() for calc in self.history])
+
+    def _compact_replication_log(self) -> None:
+        if self.replication_log is not None and self.replication_log.oversized:
+            self._replicate_reset()
+
+    def replace_history(
+        self,
+        entries: List[Calculation],
+        added: Optional[List[Calculation]] = None,
+        removed: Optional[List[Calculation]] = None,
+        cleared: bool = False
+    ) -> None:
+        """Replace the whole history, e.g. with a replicated one; undo/redo start over.
+
+        ``added`` and ``removed`` are the stored rows that change (by
+        default, the old window's rows are swapped for ``entries``); other
+        stored rows are kept unless ``cleared``.
+        """
+        with self._history_lock:
+            before = self.history
+            self._restore_history(list(entries))
+            self.undo_stack.clear()
+            self.redo_stack.clear()
+            self._record_replacement(
+                before + self.history if removed is None else removed,
+                self.history if added is None else added,
+                cleared
+            )
+
+    def _check_writable(self) -> None:
+        # A follower's history is the primary's: local edits would be
+        # discarded or misapplied by the next replicated event.
+        if self.replication_follower is not None:
+            raise OperationError("A replication follower is read-only")
+
+    def replication_status(self) -> Optional[Dict[str, Any]]:
+        """Replication role and position; a follower also reports its lag."""
+        if self.replication_follower is not None:
+            return self.replication_follower.lag()
+        if self.replication_log is not None:
+            return {'role': 'primary', 'seq': self.replication_log.seq}
+        return None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        if self.metrics is None:
+            return {}
+        return self.metrics.snapshot()
+
+    def export_metrics(self, path: Optional[Union[str, Path]] = None, fmt: str = 'prometheus') -> Path:
+        if self.metrics is None:
+            raise OperationError("Metrics are disabled in the calculator configuration")
+        target = self.metrics.export(path or self.config.metrics_file, fmt)
+        logging.info(f"Metrics exported to {target}")
+        return target
+
     def save_history(self) -> None:
+        # Saving a partially loaded history would overwrite the file.
+        self.wait_for_history()
         try:
-            self.config.history_dir.mkdir(parents=True, exist_ok=True)
-            history_data = [
-                {
-                    'operation': str(calc.operation),
-                    'operand1': str(calc.operand1),
-                    'operand2': str(calc.operand2),
-                    'result': str(calc.result),
-                    'timestamp': calc.timestamp.isoformat()
-                }
-                for calc in self.history
-            ]
-            if history_data:
-                pd.DataFrame(history_data).to_csv(self.config.history_file, index=False)
-                logging.info(f"History saved successfully to {self.config.history_file}")
+            if self.cold_store is not None:
+                self.cold_store.flush()
+            if self.storage.incremental:
+                self._save_changes()
             else:
-                pd.DataFrame(columns=['operation', 'operand1', 'operand2', 'result', 'timestamp']).to_csv(self.config.history_file, index=False)
-                logging.info("Empty history saved")
+                with self._history_lock:
+                    snapshot = list(self.history)
+                self.storage.save(snapshot)
         except Exception as e:
             logging.error(f"Failed to save history: {e}")
             raise OperationError(f"Failed to save history: {e}")
 
+    def _save_changes(self) -> None:
+        with self._save_lock:
+            with self._history_lock:
+                appended = self._unsaved
+                removals = self._pending_removals
+                cleared = self._pending_clear
+                self._unsaved, self._pending_removals, self._pending_clear = [], {}, False
+            try:
+                self.storage.apply_changes(appended, list(removals.values()), cleared)
+            except Exception:
+                with self._history_lock:
+                    self._unsaved = appended + self._unsaved
+                    self._pending_removals = {**removals, **self._pending_removals}
+                    self._pending_clear = cleared or self._pending_clear
+                raise
+
+    def _pending_changes(self) -> Tuple[bool, List[Calculation], List[Calculation]]:
+        # Call with _save_lock held.
+        with self._history_lock:
+            return self._pending_clear, list(self._pending_removals.values()), list(self._unsaved)
+
     def load_history(self) -> None:
+        self.wait_for_history()
+        loaded = self._read_history()
+        with self._history_lock:
+            if loaded is not None:
+                self._restore_history(loaded)
+                self._reset_pending_changes()
+            self._replicate_reset()
+
+    def _read_history(self) -> Optional[List[Calculation]]:
         try:
-            if self.config.history_file.exists():
-                df = pd.read_csv(self.config.history_file)
-                if not df.empty:
-                    self.history = [
-                        Calculation.from_dict(row.to_dict())
-                        for _, row in df.iterrows()
-                    ]
-                    logging.info(f"Loaded {len(self.history)} calculations from history")
-                else:
-                    logging.info("Loaded empty history file")
-            else:
-                logging.info("No history file found - starting with empty history")
+            with precision_context(self.decimal_precision):
+                loaded = self.storage.load(limit=self.config.max_history_size)
+            if loaded and self.cold_store is not None:
+                loaded = self._unspilled(loaded)
+            return loaded
         except Exception as e:
             logging.error(f"Failed to load history: {e}")
             raise OperationError(f"Failed to load history: {e}")
 
-    def get_history_dataframe(self) -> pd.DataFrame:
+    def _record_replacement(
+        self,
+        removed: List[Calculation],
+        added: List[Calculation],
+        cleared: bool = False
+    ) -> None:
+        # Queue the storage changes for a history that was replaced rather
+        # than edited. An incremental backend drops the ``removed`` rows and
+        # appends ``added``; rows evicted from memory before the window stay
+        # stored.
+        if not self.storage.incremental or self.config.history_mode == 'shared':
+            self._reset_pending_changes()
+            return
+        if cleared:
+            self._reset_pending_changes()
+            self._pending_clear = True
+        else:
+            unsaved_ids = {id(calc) for calc in self._unsaved}
+            for calc in removed:
+                if id(calc) not in unsaved_ids:
+                    self._pending_removals[id(calc)] = calc
+            replaced_ids = {id(calc) for calc in removed + added}
+            self._unsaved = [calc for calc in self._unsaved if id(calc) not in replaced_ids]
+            self._withdrawn.clear()
+        self._unsaved.extend(added)
+
+    def _unspilled(self, loaded: List[Calculation]) -> List[Calculation]:
+        # The cold tier holds the history before the hot window, so loaded
+        # rows up to its newest record were already spilled.
+        last = self.cold_store.last_record()
+        if last is None:
+            return loaded
+        key = row_key(last)
+        for index in range(len(loaded) - 1, -1, -1):
+            if row_key(loaded[index].to_dict()) == key:
+                return loaded[index + 1:]
+        return loaded
+
+    def _reset_pending_changes(self) -> None:
+        self._unsaved = []
+        self._withdrawn.clear()
+        self._pending_removals.clear()
+        self._pending_clear = False
+
+    def query_history(
+        self,
+        operation: Optional[str] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[Calculation]:
+        # Incremental backends hold every saved calculation, so the query
+        # runs in the backend, with unsaved changes laid over its rows.
+        self.wait_for_history()
+        with precision_context(self.decimal_precision):
+            if self.storage.incremental:
+                with self._save_lock:
+                    cleared, removed, unsaved = self._pending_changes()
+                    stored = [] if cleared else self.storage.query(
+                        operation, since, until, limit + len(removed) if limit else None
+                    )
+                stored = drop_removed(stored, removed)
+                return filter_calculations(stored + unsaved, operation, since, until, limit)
+            with self._history_lock:
+                snapshot = list(self.history)
+            if self.cold_store is not None:
+                snapshot = itertools.chain(self.cold_store.iter_range(), snapshot)
+            return filter_calculations(snapshot, operation, since, until, limit)
+
+    def history_length(self) -> int:
+        """Number of calculations across the in-memory and spilled tiers."""
+        cold = len(self.cold_store) if self.cold_store is not None else 0
+        return cold + len(self.history)
+
+    def get_history_range(self, start: int = 0, stop: Optional[int] = None) -> List[Calculation]:
+        """Return calculations by position, oldest first, reading spilled segments as needed."""
+        self.wait_for_history()
+        with self._history_lock:
+            hot = list(self.history)
+            cold_length = len(self.cold_store) if self.cold_store is not None else 0
+        total = cold_length + len(hot)
+        stop = total if stop is None else min(stop, total)
+        entries: List[Calculation] = []
+        if start < cold_length:
+            with precision_context(self.decimal_precision):
+                entries.extend(self.cold_store.iter_range(start, min(stop, cold_length)))
+        entries.extend(hot[max(start - cold_length, 0):max(stop - cold_length, 0)])
+        return entries
+
+    def iter_history_records(self, chunk_size: int = 1000) -> Iterator[List[Record]]:
+        # Incremental backends stream from storage, with unsaved changes
+        # laid over its rows; otherwise the in-memory history is serialized
+        # one chunk at a time.
+        self.wait_for_history()
+        if self.storage.incremental:
+            with self._save_lock:
+                cleared, removed, unsaved = self._pending_changes()
+            stored = iter([]) if cleared else self.storage.iter_records(chunk_size)
+            return pending_records(stored, removed, unsaved, chunk_size)
+        with self._history_lock:
+            snapshot = list(self.history)
+        if self.cold_store is not None:
+            return itertools.chain(
+                self.cold_store.iter_records(chunk_size=chunk_size),
+                record_chunks(snapshot, chunk_size)
+            )
+        return record_chunks(snapshot, chunk_size)
+
+    def export_history(
+        self,
+        path: Union[str, Path],
+        format: Optional[str] = None,
+        chunk_size: int = 1000
+    ) -> int:
+        fmt = (format or export_format_for(path)).lower()
+        try:
+            rows = export_records(
+                path, self.iter_history_records(chunk_size), fmt, self.config.default_encoding
+            )
+        except OperationError:
+            raise
+        except Exception as e:
+            logging.error(f"Failed to export history: {e}")
+            raise OperationError(f"Failed to export history: {e}")
+        logging.info(f"Exported {rows} calculations to {path} as {fmt}")
+        return rows
+
+    def memory_report(self, top: int = 10) -> Dict[str, Any]:
+        """Estimate memory per history entry, per memento and in total.
+
+        Includes the ``top`` allocation sites when tracemalloc is tracing.
+        """
+        with self._history_lock:
+            return build_memory_report(self, top)
+
+    def cache_report(self) -> Optional[Dict[str, Any]]:
+        """Hit, miss and size statistics of the result cache, if enabled."""
+        return self.result_cache.report() if self.result_cache is not None else None
+
+    def checkpoint(self, path: Optional[Union[str, Path]] = None) -> Path:
+        """Write history, undo/redo state and the active operation to one file."""
+        self.wait_for_history()
+        if self.cold_store is not None:
+            self.cold_store.flush()
+        with self._history_lock:
+            state = {
+                'history': self.history,
+                'undo_stack': self.undo_stack,
+                'redo_stack': self.redo_stack,
+                # Stored by name: plugin classes cannot be pickled, and a
+                # fresh process loads them lazily.
+                'operation': str(self.operation_strategy) if self.operation_strategy else None,
+                'config': self._config_snapshot(),
+            }
+            try:
+                target = write_checkpoint(path or self.config.checkpoint_file, state)
+            except Exception as e:
+                logging.error(f"Failed to write checkpoint: {e}")
+                raise OperationError(f"Failed to write checkpoint: {e}")
+        logging.info(f"Checkpoint written to {target} with {len(self.history)} calculations")
+        return target
+
+    def restore(self, path: Optional[Union[str, Path]] = None) -> None:
+        """Replace the session with one saved by ``checkpoint``."""
+        self._check_writable()
+        source = path or self.config.checkpoint_file
+        state = read_checkpoint(source)
+        snapshot = state['config']
+        if snapshot != self._config_snapshot():
+            logging.warning(f"Checkpoint was taken with different settings: {snapshot}")
+        try:
+            operation = OperationFactory.operation_named(state['operation']) if state['operation'] else None
+        except ValueError as e:
+            raise OperationError(f"Failed to restore checkpoint: {e}")
+
+        self.wait_for_history()
+        limit = self.config.max_history_size
+        with self._history_lock:
+            before = self.history
+            self._restore_history(state['history'][-limit:])
+            self.undo_stack = state['undo_stack']
+            self.redo_stack = state['redo_stack']
+            self.operation_strategy = operation
+            # Stored copies of restored entries evicted since the checkpoint
+            # are removed too, so none is stored twice.
+            self._record_replacement(before + self.history, self.history)
+            if self.undo_journal is not None:
+                self.undo_journal.clear()
+            self._replicate_reset()
+        logging.info(f"Restored {len(self.history)} calculations from checkpoint {source}")
+
+    def _config_snapshot(self) -> Dict[str, Any]:
+        return {
+            'max_history_size': self.config.max_history_size,
+            'precision': self.config.precision,
+            'max_input_value': self.config.max_input_value,
+            'history_backend': self.config.history_backend,
+            'history_mode': self.config.history_mode,
+        }
+
+    def close(self) -> None:
+        if self.replication_follower is not None:
+            self.replication_follower.stop()
+        self.event_bus.close()
+        if self.cold_store is not None:
+            self.cold_store.flush()
+        if self.undo_journal is not None:
+            self.undo_journal.close()
+        if self.result_cache is not None:
+            self.result_cache.close()
+        if self.replication_log is not None:
+            self.replication_log.close()
+        self.storage.close()
+
+    def _start_background_load(self) -> None:
+        self._history_ready.clear()
+        self._discard_pending_load = False
+        loader = threading.Thread(
+            target=self._load_history_background, name="history-loader", daemon=True
+        )
+        loader.start()
+
+    def _load_history_background(self) -> None:
+        try:
+            loaded = self._read_history()
+        except Exception as e:
+            logging.warning(f"Could not load existing history: {e}")
+            loaded = None
+        with self._history_lock:
+            if loaded and not self._discard_pending_load:
+                self._merge_loaded_history(loaded)
+            self._history_ready.set()
+
+    def _merge_loaded_history(self, loaded: List[Calculation]) -> None:
+        # Calculations made while loading were recorded against an empty
+        # history, so the loaded entries go in front of the live history
+        # and of every memento captured in the meantime.
+        limit = self.config.max_history_size
+        self._restore_history((loaded + self.history)[-limit:])
+        for memento in self.undo_stack + self.redo_stack:
+            memento.history = (loaded + memento.history)[-limit:]
+        self._replicate_reset()
+        logging.info(f"Merged {len(loaded)} background-loaded calculations")
+
+    @property
+    def history_loaded(self) -> bool:
+        return self._history_ready.is_set()
+
+    def wait_for_history(self, timeout: Optional[float] = None) -> bool:
+        return self._history_ready.wait(timeout)
+
+    def get_history_dataframe(self) -> 'pd.DataFrame':
+        import pandas as pd
+
+        self.wait_for_history()
         return pd.DataFrame([
             {
                 'operation': str(calc.operation),
@@ -165,29 +969,148 @@ class Calculator:
         ])
 
     def show_history(self) -> List[str]:
-        return [
-            f"{calc.operation}({calc.operand1}, {calc.operand2}) = {calc.result}"
-            for calc in self.history
-        ]
+        self.wait_for_history()
+        return [str(calc) for calc in self.history]
 
     def clear_history(self) -> None:
-        self.history.clear()
-        self.undo_stack.clear()
-        self.redo_stack.clear()
+        self._check_writable()
+        with self._history_lock:
+            self._discard_pending_load = True
+            self._reset_pending_changes()
+            self._pending_clear = True
+            self.history.clear()
+            self._hot_bytes = 0
+            self.undo_stack.clear()
+            self.redo_stack.clear()
+            if self.cold_store is not None:
+                self.cold_store.clear()
+                self._spilled.clear()
+            if self.undo_journal is not None:
+                self.undo_journal.clear()
+            if self.replication_log is not None:
+                self.replication_log.publish('clear')
+                self._compact_replication_log()
         logging.info("History cleared")
 
     def undo(self) -> bool:
-        if not self.undo_stack:
-            return False
+        self._check_writable()
+        # Undo only touches this session's mementos, so it never waits for
+        # a background load; the merge fixes the mementos up afterwards.
+        with self._history_lock:
+            if self.undo_stack:
+                self._undo_memento()
+                return True
+            if self.undo_journal is None:
+                return False
+        # Past the in-memory window: the journal's deltas are relative to
+        # the full history, so this is the only path that waits for a load.
+        self.wait_for_history()
+        with self._history_lock:
+            return self._undo_from_journal()
+
+    def _undo_memento(self) -> None:
         memento = self.undo_stack.pop()
-        self.redo_stack.append(CalculatorMemento(self.history.copy()))
-        self.history = memento.history.copy()
-        return True
+        self._push_bounded(self.redo_stack, CalculatorMemento(self.history.copy()))
+        if self.undo_journal is not None:
+            self.undo_journal.drop('undo')
+            self.undo_journal.push('redo', delta_between(memento.history, self.history))
+        before = self.history
+        self._sync_unsaved(before, memento.history, undoing=True)
+        self._restore_history(memento.history.copy())
+        self._replicate_edit('undo', before)
 
     def redo(self) -> bool:
-        if not self.redo_stack:
-            return False
+        self._check_writable()
+        with self._history_lock:
+            if self.redo_stack:
+                self._redo_memento()
+                return True
+            if self.undo_journal is None:
+                return False
+        self.wait_for_history()
+        with self._history_lock:
+            return self._redo_from_journal()
+
+    def _redo_memento(self) -> None:
         memento = self.redo_stack.pop()
-        self.undo_stack.append(CalculatorMemento(self.history.copy()))
-        self.history = memento.history.copy()
-        return True
\ No newline at end of file
+        self._push_bounded(self.undo_stack, CalculatorMemento(self.history.copy()))
+        if self.undo_journal is not None:
+            self.undo_journal.drop('redo')
+            self.undo_journal.push('undo', delta_between(self.history, memento.history))
+        before = self.history
+        self._sync_unsaved(before, memento.history, undoing=False)
+        self._restore_history(memento.history.copy())
+        self._replicate_edit('redo', before)
+
+    def _undo_from_journal(self) -> bool:
+        delta = self.undo_journal.pop('undo')
+        if delta is None:
+            return False
+        undone = delta['calcs']
+        tail = self.history[len(self.history) - len(undone):] if undone else []
+        if len(tail) != len(undone) or any(
+            (calc.operation, calc.timestamp.isoformat()) != (record['operation'], record['timestamp'])
+            for calc, record in zip(tail, undone)
+        ):
+            logging.warning("Undo journal does not match the loaded history; discarding it")
+            self.undo_journal.clear()
+            return False
+        after = self.history[:len(self.history) - len(undone)]
+        if self.cold_store is None:
+            # Spilled calculations stay in the cold tier instead.
+            after = self._calculations(delta['evicted']) + after
+        self._push_bounded(self.redo_stack, CalculatorMemento(self.history.copy()))
+        self.undo_journal.push('redo', delta)
+        before = self.history
+        self._sync_unsaved(before, after, undoing=True)
+        self._restore_history(after)
+        self._replicate_edit('undo', before)
+        return True
+
+    def _redo_from_journal(self) -> bool:
+        delta = self.undo_journal.pop('redo')
+        if delta is None:
+            return False
+        after = self.history + self._calculations(delta['calcs'])
+        evicted = len(delta['evicted'])
+        if evicted and self.cold_store is None:
+            after = after[evicted:]
+        self._push_bounded(self.undo_stack, CalculatorMemento(self.history.copy()))
+        self.undo_journal.push('undo', delta)
+        before = self.history
+        self._sync_unsaved(before, after, undoing=False)
+        self._restore_history(after)
+        self._replicate_edit('redo', before)
+        return True
+
+    def _calculations(self, records: List[Record]) -> List[Calculation]:
+        with precision_context(self.decimal_precision):
+            return [Calculation.from_dict(record) for record in records]
+
+    def _sync_unsaved(self, before: List[Calculation], after: List[Calculation], undoing: bool) -> None:
+        # Keep incremental-save bookkeeping in step with undo/redo. Each step
+        # reverses exactly one calculation; entries that differ at the old
+        # end of the history are evictions and need no storage change.
+        if not self.storage.incremental:
+            return
+        if undoing:
+            after_ids = {id(calc) for calc in after}
+            unsaved_ids = {id(calc) for calc in self._unsaved}
+            for calc in before:
+                if id(calc) in after_ids:
+                    continue
+                if id(calc) in unsaved_ids:
+                    self._withdrawn[id(calc)] = calc
+                else:
+                    self._pending_removals[id(calc)] = calc
+            self._unsaved = [calc for calc in self._unsaved if id(calc) not in self._withdrawn]
+        else:
+            before_ids = {id(calc) for calc in before}
+            for calc in after:
+                if id(calc) in before_ids:
+                    continue
+                if id(calc) in self._withdrawn:
+                    self._unsaved.append(self._withdrawn.pop(id(calc)))
+                elif self._pending_removals.pop(id(calc), None) is None:
+                    # Removed from storage by a save since it was undone.
+                    self._unsaved.append(calc)
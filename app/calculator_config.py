@@ -1,14 +1,22 @@
 from dataclasses import dataclass
 from decimal import Decimal
+from functools import lru_cache
 from numbers import Number
 from pathlib import Path
 import os
-from typing import Optional
+from typing import Optional, Sequence
 
-from dotenv import load_dotenv
 from app.exceptions import ConfigurationError
 
-load_dotenv()  # Load environment variables from .env
+
+@lru_cache(maxsize=None)
+def load_environment(env_file: Optional[str] = None) -> bool:
+    """Load environment variables from a .env file once; repeat calls are cached."""
+    from dotenv import load_dotenv
+
+    if env_file is None:
+        env_file = str(get_project_root() / ".env")
+    return load_dotenv(env_file)
 
 
 def get_project_root() -> Path:
@@ -27,7 +35,34 @@ class CalculatorConfig:
         auto_save: Optional[bool] = None,
         precision: Optional[int] = None,
         max_input_value: Optional[Number] = None,
-        default_encoding: Optional[str] = None
+        default_encoding: Optional[str] = None,
+        observer_dispatch: Optional[str] = None,
+        observer_queue_size: Optional[int] = None,
+        observer_backpressure: Optional[str] = None,
+        observer_batch_size: Optional[int] = None,
+        metrics_enabled: Optional[bool] = None,
+        background_load: Optional[bool] = None,
+        history_mode: Optional[str] = None,
+        lock_timeout: Optional[float] = None,
+        history_backend: Optional[str] = None,
+        tiered_history: Optional[bool] = None,
+        max_history_bytes: Optional[int] = None,
+        segment_size: Optional[int] = None,
+        persistent_undo: Optional[bool] = None,
+        undo_window: Optional[int] = None,
+        undo_depth: Optional[int] = None,
+        log_max_bytes: Optional[int] = None,
+        log_backup_count: Optional[int] = None,
+        log_rotate_interval: Optional[float] = None,
+        log_compress: Optional[bool] = None,
+        pipeline_record: Optional[str] = None,
+        workers: Optional[Sequence[str]] = None,
+        worker_chunk_size: Optional[int] = None,
+        worker_timeout: Optional[float] = None,
+        result_cache: Optional[bool] = None,
+        result_cache_max_bytes: Optional[int] = None,
+        replication: Optional[str] = None,
+        replication_max_bytes: Optional[int] = None
     ):
         project_root = get_project_root()
         self.base_dir = base_dir or Path(
@@ -62,6 +97,160 @@ class CalculatorConfig:
             else os.getenv('CALCULATOR_DEFAULT_ENCODING', 'utf-8')
         )
 
+        self.observer_dispatch = (
+            observer_dispatch if observer_dispatch is not None
+            else os.getenv('CALCULATOR_OBSERVER_DISPATCH', 'sync').lower()
+        )
+
+        self.observer_queue_size = int(
+            observer_queue_size if observer_queue_size is not None
+            else os.getenv('CALCULATOR_OBSERVER_QUEUE_SIZE', '1000')
+        )
+
+        self.observer_backpressure = (
+            observer_backpressure if observer_backpressure is not None
+            else os.getenv('CALCULATOR_OBSERVER_BACKPRESSURE', 'block').lower()
+        )
+
+        self.observer_batch_size = int(
+            observer_batch_size if observer_batch_size is not None
+            else os.getenv('CALCULATOR_OBSERVER_BATCH_SIZE', '100')
+        )
+
+        metrics_env = os.getenv('CALCULATOR_METRICS_ENABLED', 'false').lower()
+        self.metrics_enabled = (
+            metrics_enabled if metrics_enabled is not None
+            else (metrics_env == 'true' or metrics_env == '1')
+        )
+
+        background_env = os.getenv('CALCULATOR_BACKGROUND_LOAD', 'false').lower()
+        self.background_load = (
+            background_load if background_load is not None
+            else (background_env == 'true' or background_env == '1')
+        )
+
+        self.history_mode = (
+            history_mode if history_mode is not None
+            else os.getenv('CALCULATOR_HISTORY_MODE', 'overwrite').lower()
+        )
+
+        self.history_backend = (
+            history_backend if history_backend is not None
+            else os.getenv('CALCULATOR_HISTORY_BACKEND', 'csv').lower()
+        )
+
+        tiered_env = os.getenv('CALCULATOR_TIERED_HISTORY', 'false').lower()
+        self.tiered_history = (
+            tiered_history if tiered_history is not None
+            else (tiered_env == 'true' or tiered_env == '1')
+        )
+
+        result_cache_env = os.getenv('CALCULATOR_RESULT_CACHE', 'false').lower()
+        self.result_cache = (
+            result_cache if result_cache is not None
+            else (result_cache_env == 'true' or result_cache_env == '1')
+        )
+
+        self.result_cache_max_bytes = int(
+            result_cache_max_bytes if result_cache_max_bytes is not None
+            else os.getenv('CALCULATOR_RESULT_CACHE_MAX_BYTES', str(16 * 1024 * 1024))
+        )
+
+        # 'primary' ships history events to replication_file; 'follower'
+        # replays them into a warm standby.
+        self.replication = (
+            replication if replication is not None
+            else os.getenv('CALCULATOR_REPLICATION', 'off').lower()
+        )
+
+        # Past this size a primary compacts its log into one 'reset' event.
+        self.replication_max_bytes = int(
+            replication_max_bytes if replication_max_bytes is not None
+            else os.getenv('CALCULATOR_REPLICATION_MAX_BYTES', str(1024 * 1024))
+        )
+
+        # 0 disables the byte cap; only max_history_size applies then.
+        self.max_history_bytes = int(
+            max_history_bytes if max_history_bytes is not None
+            else os.getenv('CALCULATOR_MAX_HISTORY_BYTES', '0')
+        )
+
+        self.segment_size = int(
+            segment_size if segment_size is not None
+            else os.getenv('CALCULATOR_SEGMENT_SIZE', '1000')
+        )
+
+        self.lock_timeout = float(
+            lock_timeout if lock_timeout is not None
+            else os.getenv('CALCULATOR_LOCK_TIMEOUT', '10')
+        )
+
+        persistent_undo_env = os.getenv('CALCULATOR_PERSISTENT_UNDO', 'false').lower()
+        self.persistent_undo = (
+            persistent_undo if persistent_undo is not None
+            else (persistent_undo_env == 'true' or persistent_undo_env == '1')
+        )
+
+        # Undo/redo steps kept as full in-memory mementos when undo is
+        # persistent; older steps are read back from the journal on demand.
+        self.undo_window = int(
+            undo_window if undo_window is not None
+            else os.getenv('CALCULATOR_UNDO_WINDOW', '50')
+        )
+        # Most undo (and redo) steps the journal keeps across sessions.
+        self.undo_depth = int(
+            undo_depth if undo_depth is not None
+            else os.getenv('CALCULATOR_UNDO_DEPTH', '1000')
+        )
+
+        # Log rotation: by size (bytes) and/or age (seconds); 0 disables each.
+        self.log_max_bytes = int(
+            log_max_bytes if log_max_bytes is not None
+            else os.getenv('CALCULATOR_LOG_MAX_BYTES', str(5 * 1024 * 1024))
+        )
+
+        self.log_rotate_interval = float(
+            log_rotate_interval if log_rotate_interval is not None
+            else os.getenv('CALCULATOR_LOG_ROTATE_INTERVAL', '0')
+        )
+
+        self.log_backup_count = int(
+            log_backup_count if log_backup_count is not None
+            else os.getenv('CALCULATOR_LOG_BACKUP_COUNT', '5')
+        )
+
+        # Whether pipelines record every step to history or only the final one.
+        self.pipeline_record = (
+            pipeline_record if pipeline_record is not None
+            else os.getenv('CALCULATOR_PIPELINE_RECORD', 'final').lower()
+        )
+
+        # Remote batch workers as host:port addresses; none means compute locally.
+        self.workers = [
+            address.strip()
+            for address in (
+                workers if workers is not None
+                else os.getenv('CALCULATOR_WORKERS', '').split(',')
+            )
+            if address.strip()
+        ]
+
+        self.worker_chunk_size = int(
+            worker_chunk_size if worker_chunk_size is not None
+            else os.getenv('CALCULATOR_WORKER_CHUNK_SIZE', '256')
+        )
+
+        self.worker_timeout = float(
+            worker_timeout if worker_timeout is not None
+            else os.getenv('CALCULATOR_WORKER_TIMEOUT', '30')
+        )
+
+        log_compress_env = os.getenv('CALCULATOR_LOG_COMPRESS', 'true').lower()
+        self.log_compress = (
+            log_compress if log_compress is not None
+            else (log_compress_env == 'true' or log_compress_env == '1')
+        )
+
     @property
     def log_dir(self) -> Path:
         """Return directory path for log files."""
@@ -78,12 +267,82 @@ class CalculatorConfig:
             str(self.base_dir / "history")
         )).resolve()
 
+    @property
+    def cache_dir(self) -> Path:
+        """Return directory path for caches, kept apart from history data."""
+        return Path(os.getenv(
+            'CALCULATOR_CACHE_DIR',
+            str(self.base_dir / "cache")
+        )).resolve()
+
+    @property
+    def _history_name(self) -> str:
+        # A follower shares history_dir with its primary for the replication
+        # log, so it keeps its own copy of the history under another name.
+        return "calculator_history_follower" if self.replication == 'follower' else "calculator_history"
+
     @property
     def history_file(self) -> Path:
         """Return file path for storing calculation history."""
         return Path(os.getenv(
             'CALCULATOR_HISTORY_FILE',
-            str(self.history_dir / "calculator_history.csv")
+            str(self.history_dir / f"{self._history_name}.csv")
+        )).resolve()
+
+    @property
+    def segments_dir(self) -> Path:
+        """Return directory path for spilled history segments."""
+        return Path(os.getenv(
+            'CALCULATOR_SEGMENTS_DIR',
+            str(self.history_dir / "segments")
+        )).resolve()
+
+    @property
+    def history_db_file(self) -> Path:
+        """Return file path for the SQLite history database."""
+        return Path(os.getenv(
+            'CALCULATOR_HISTORY_DB_FILE',
+            str(self.history_dir / f"{self._history_name}.db")
+        )).resolve()
+
+    @property
+    def result_cache_file(self) -> Path:
+        """Return file path for the persistent computation cache."""
+        return Path(os.getenv(
+            'CALCULATOR_RESULT_CACHE_FILE',
+            str(self.cache_dir / "result_cache.db")
+        )).resolve()
+
+    @property
+    def replication_file(self) -> Path:
+        """Return file path of the history replication log shared with followers."""
+        return Path(os.getenv(
+            'CALCULATOR_REPLICATION_FILE',
+            str(self.history_dir / "replication.jsonl")
+        )).resolve()
+
+    @property
+    def plugin_dir(self) -> Path:
+        """Return directory path scanned for operation plugins."""
+        return Path(os.getenv(
+            'CALCULATOR_PLUGIN_DIR',
+            str(self.base_dir / "plugins")
+        )).resolve()
+
+    @property
+    def checkpoint_file(self) -> Path:
+        """Return file path for whole-session checkpoints."""
+        return Path(os.getenv(
+            'CALCULATOR_CHECKPOINT_FILE',
+            str(self.history_dir / "calculator_session.ckpt")
+        )).resolve()
+
+    @property
+    def undo_journal_file(self) -> Path:
+        """Return file path for the persistent undo/redo journal."""
+        return Path(os.getenv(
+            'CALCULATOR_UNDO_JOURNAL_FILE',
+            str(self.history_dir / "undo_journal.jsonl")
         )).resolve()
 
     @property
@@ -94,6 +353,14 @@ class CalculatorConfig:
             str(self.log_dir / "calculator.log")
         )).resolve()
 
+    @property
+    def metrics_file(self) -> Path:
+        """Return file path for exported operation metrics."""
+        return Path(os.getenv(
+            'CALCULATOR_METRICS_FILE',
+            str(self.log_dir / "metrics.prom")
+        )).resolve()
+
     def validate(self) -> None:
     ##validate configuration values
         if not isinstance(self.max_history_size, int) or self.max_history_size <= 0:
@@ -104,3 +371,60 @@ class CalculatorConfig:
 
         if not isinstance(self.max_input_value, (int, float, Decimal)) or Decimal(self.max_input_value) <= 0:
             raise ConfigurationError("max_input_value must be positive")
+
+        if self.history_mode not in ('overwrite', 'shared'):
+            raise ConfigurationError("history_mode must be 'overwrite' or 'shared'")
+
+        if self.history_backend not in ('csv', 'sqlite'):
+            raise ConfigurationError("history_backend must be 'csv' or 'sqlite'")
+
+        if self.max_history_bytes < 0:
+            raise ConfigurationError("max_history_bytes cannot be negative")
+
+        if self.replication not in ('off', 'primary', 'follower'):
+            raise ConfigurationError("replication must be 'off', 'primary' or 'follower'")
+
+        if self.replication_max_bytes <= 0:
+            raise ConfigurationError("replication_max_bytes must be positive")
+
+        if self.result_cache_max_bytes <= 0:
+            raise ConfigurationError("result_cache_max_bytes must be positive")
+
+        if self.segment_size <= 0:
+            raise ConfigurationError("segment_size must be positive")
+
+        if self.lock_timeout <= 0:
+            raise ConfigurationError("lock_timeout must be positive")
+
+        if self.undo_window <= 0:
+            raise ConfigurationError("undo_window must be positive")
+        if self.undo_depth <= 0:
+            raise ConfigurationError("undo_depth must be positive")
+
+        if self.log_max_bytes < 0 or self.log_rotate_interval < 0:
+            raise ConfigurationError("log rotation size and interval cannot be negative")
+
+        if self.pipeline_record not in ('all', 'final'):
+            raise ConfigurationError("pipeline_record must be 'all' or 'final'")
+
+        if self.worker_chunk_size <= 0 or self.worker_timeout <= 0:
+            raise ConfigurationError("worker_chunk_size and worker_timeout must be positive")
+
+        for address in self.workers:
+            host, sep, port = address.rpartition(':')
+            if not sep or not host or not port.isdigit():
+                raise ConfigurationError(f"Worker address must be host:port, got {address!r}")
+
+        if self.log_backup_count < 0:
+            raise ConfigurationError("log_backup_count cannot be negative")
+
+        if self.observer_dispatch not in ('sync', 'async'):
+            raise ConfigurationError("observer_dispatch must be 'sync' or 'async'")
+
+        if self.observer_queue_size <= 0 or self.observer_batch_size <= 0:
+            raise ConfigurationError("observer queue and batch sizes must be positive")
+
+        if self.observer_backpressure not in ('block', 'drop_oldest', 'drop_newest'):
+            raise ConfigurationError(
+                "observer_backpressure must be 'block', 'drop_oldest' or 'drop_newest'"
+            )
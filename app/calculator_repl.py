@@ -1,121 +1,365 @@
+from contextlib import redirect_stdout
 from decimal import Decimal
+import io
 import logging
+from pathlib import Path
+from typing import Callable, Dict, List
 
 from app.calculator import Calculator
+from app.calculator_config import load_environment
+from app.decimal_context import quantizer
+from app.memory_report import format_memory_report, set_tracing
 from app.exceptions import OperationError, ValidationError
 from app.history import AutoSaveObserver, LoggingObserver
-from app.operations import OperationFactory
+from app.operations import Operation, OperationFactory, Reduction
+from app.profiler import SamplingProfiler
+
+MAX_SOURCE_DEPTH = 16
+
+# Samples commands while 'profile on' is in effect; idle otherwise.
+PROFILER = SamplingProfiler()
+
+
+def format_result(result) -> str:
+    """Render a calculation result without trailing zeros."""
+    if isinstance(result, Decimal):
+        if result == result.to_integral():
+            return str(result.quantize(quantizer(0)))
+        return str(result.normalize())
+    return str(result)
+
+
+def _cmd_help(calc: Calculator, args: List[str], depth: int) -> bool:
+    print("\nAvailable commands:")
+    print(f"  {', '.join(OperationFactory.dispatch_table())} - Perform calculations")
+    print("  <operation> <a> <b> - Perform a calculation in one line (e.g. 'add 2 3')")
+    print("  <operation> 1,2,3 <b> - Apply an operation elementwise to comma-separated vectors")
+    print("  sum, product, mean, min, max, stddev <values...> - Reduce any number of values")
+    print("  history - Show calculation history")
+    print("  clear - Clear calculation history")
+    print("  undo - Undo the last calculation")
+    print("  redo - Redo the last undone calculation")
+    print("  save - Save calculation history to file")
+    print("  load - Load calculation history from file")
+    print("  export <file> [csv|jsonl|parquet] - Export history to a file")
+    print("  source <file> - Run commands from a script file")
+    print("  memory [trace on|off] - Show memory used by history, undo/redo and observers")
+    print("  cache [clear] - Show or clear the persistent result cache")
+    print("  profile on|off|dump <file> - Sample commands and write collapsed stacks")
+    print("  replication - Show replication role, position and lag")
+    print("  exit - Exit the calculator")
+    print("  Separate several commands on one line with ';'")
+    return True
+
+
+def _cmd_exit(calc: Calculator, args: List[str], depth: int) -> bool:
+    # Saving happens in _shutdown, which every way out of the REPL runs.
+    return False
+
+
+def _shutdown(calc: Calculator) -> None:
+    """Deliver pending observer events, save history and release resources."""
+    try:
+        calc.flush_observers()
+        calc.save_history()
+        print("History saved successfully.")
+    except Exception as e:
+        print(f"Warning: Could not save history: {e}") #pragma: no cover
+    finally:
+        calc.close()
+    print("Goodbye!")
+
+
+def _cmd_history(calc: Calculator, args: List[str], depth: int) -> bool:
+    history = calc.show_history()
+    if not history:
+        print("No calculations in history")
+    else:
+        print("\nCalculation History:")
+        for i, entry in enumerate(history, 1):
+            print(f"{i}. {entry}") #pragma: no cover
+    return True
+
+
+def _cmd_clear(calc: Calculator, args: List[str], depth: int) -> bool:
+    calc.clear_history()
+    print("History cleared")
+    return True
+
+
+def _cmd_undo(calc: Calculator, args: List[str], depth: int) -> bool:
+    if calc.undo():
+        print("Operation undone")
+    else:
+        print("Nothing to undo")
+    return True
+
+
+def _cmd_redo(calc: Calculator, args: List[str], depth: int) -> bool:
+    if calc.redo():
+        print("Operation redone")
+    else:
+        print("Nothing to redo")
+    return True
+
+
+def _cmd_save(calc: Calculator, args: List[str], depth: int) -> bool:
+    try:
+        calc.save_history()
+        print("History saved successfully")
+    except Exception as e:
+        print(f"Error saving history: {e}") #pragma: no cover
+    return True
+
+
+def _cmd_load(calc: Calculator, args: List[str], depth: int) -> bool:
+    try:
+        calc.load_history()
+        print("History loaded successfully")
+    except Exception as e:
+        print(f"Error loading history: {e}") #pragma: no cover
+    return True
+
+
+def _cmd_export(calc: Calculator, args: List[str], depth: int) -> bool:
+    if not args or len(args) > 2:
+        print("Usage: export <file> [csv|jsonl|parquet]")
+        return True
+    fmt = args[1].lower() if len(args) == 2 else None
+    try:
+        rows = calc.export_history(Path(args[0]).expanduser(), format=fmt)
+        print(f"Exported {rows} calculations to {args[0]}")
+    except Exception as e:
+        print(f"Error exporting history: {e}")
+    return True
+
+
+def _cmd_source(calc: Calculator, args: List[str], depth: int) -> bool:
+    if not args:
+        print("Usage: source <file>")
+        return True
+    if depth >= MAX_SOURCE_DEPTH:
+        print(f"Error: source nested more than {MAX_SOURCE_DEPTH} levels deep")
+        return True
+
+    path = Path(' '.join(args)).expanduser()
+    try:
+        script = path.read_text(encoding=calc.config.default_encoding)
+    except OSError as e:
+        print(f"Error reading script: {e}")
+        return True
+
+    # Output is collected and written once, so large scripts are not
+    # slowed down by per-line terminal writes.
+    buffer = io.StringIO()
+    keep_running = True
+    with redirect_stdout(buffer):
+        for line in script.splitlines():
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            if not run_line(calc, stripped, interactive=False, depth=depth + 1):
+                keep_running = False
+                break
+    print(buffer.getvalue(), end='')
+    return keep_running
+
+
+def _cmd_memory(calc: Calculator, args: List[str], depth: int) -> bool:
+    if args:
+        if len(args) != 2 or args[0] != 'trace' or args[1] not in ('on', 'off'):
+            print("Usage: memory [trace on|off]")
+            return True
+        set_tracing(args[1] == 'on')
+        print(f"Allocation tracing {args[1]}")
+        return True
+    for line in format_memory_report(calc.memory_report()):
+        print(line)
+    return True
+
+
+def _cmd_cache(calc: Calculator, args: List[str], depth: int) -> bool:
+    if calc.result_cache is None:
+        print("Result cache is disabled (set CALCULATOR_RESULT_CACHE=true)")
+        return True
+    if args == ['clear']:
+        calc.result_cache.clear()
+        print("Result cache cleared")
+        return True
+    if args:
+        print("Usage: cache [clear]")
+        return True
+    report = calc.cache_report()
+    print(
+        f"Result cache: {report['entries']} entries, {report['bytes']} of "
+        f"{report['max_bytes']} bytes ({report['path']})"
+    )
+    print(
+        f"  hits {report['hits']}, misses {report['misses']} "
+        f"(hit rate {report['hit_rate']:.1%}), stores {report['stores']}, "
+        f"evictions {report['evictions']}"
+    )
+    return True
+
+
+def _cmd_profile(calc: Calculator, args: List[str], depth: int) -> bool:
+    if args == ['on']:
+        PROFILER.start()
+        print("Profiling on")
+    elif args == ['off']:
+        PROFILER.stop()
+        print("Profiling off")
+    elif len(args) == 2 and args[0] == 'dump':
+        try:
+            samples = PROFILER.dump(args[1])
+            print(f"Wrote {samples} samples to {args[1]}")
+        except OSError as e:
+            print(f"Error: Could not write profile: {e}")
+    else:
+        print("Usage: profile on|off|dump <file>")
+    return True
+
+
+def _cmd_replication(calc: Calculator, args: List[str], depth: int) -> bool:
+    status = calc.replication_status()
+    if status is None:
+        print("Replication is off (set CALCULATOR_REPLICATION=primary or follower)")
+    elif status['role'] == 'primary':
+        print(f"Replication primary at event {status['seq']}")
+    else:
+        print(
+            f"Replication follower at event {status['applied_seq']} of {status['primary_seq']}: "
+            f"{status['events_behind']} events, {status['seconds_behind']:.3f} s behind"
+        )
+    return True
+
+
+COMMANDS: Dict[str, Callable[[Calculator, List[str], int], bool]] = {
+    'help': _cmd_help,
+    'exit': _cmd_exit,
+    'history': _cmd_history,
+    'clear': _cmd_clear,
+    'undo': _cmd_undo,
+    'redo': _cmd_redo,
+    'save': _cmd_save,
+    'load': _cmd_load,
+    'export': _cmd_export,
+    'source': _cmd_source,
+    'memory': _cmd_memory,
+    'cache': _cmd_cache,
+    'profile': _cmd_profile,
+    'replication': _cmd_replication,
+}
+
+
+def _vector_argument(arg: str):
+    # '1,2,3' is a vector operand; a plain number is broadcast against it.
+    if ',' not in arg:
+        return arg
+    return [item for item in arg.split(',') if item.strip()]
+
+
+def _run_operation(
+    calc: Calculator,
+    command: str,
+    operation: Callable[[], Operation],
+    args: List[str],
+    interactive: bool
+) -> None:
+    try:
+        instance = operation()
+        if isinstance(instance, Reduction):
+            if not args:
+                print(f"Usage: {command} <number> [<number> ...]")
+                return
+            result = calc.perform_reduction(instance, args)
+            print(f"\nResult: {format_result(result)}")
+            return
+        if len(args) == 2 and any(',' in arg for arg in args):
+            a, b = (_vector_argument(arg) for arg in args)
+            results = calc.perform_vector_operation(instance, a, b)
+            print(f"\nResult: [{', '.join(format_result(result) for result in results)}]")
+            return
+        if len(args) == 2:
+            a, b = args
+        elif not args and interactive:
+            print("\nEnter numbers (or 'cancel' to abort):")
+            a = input("First number: ")
+            if a.lower() == 'cancel':
+                print("Operation cancelled")
+                return
+            b = input("Second number: ")
+            if b.lower() == 'cancel':
+                print("Operation cancelled")
+                return
+        else:
+            print(f"Usage: {command} <first number> <second number>")
+            return
+
+        calc.set_operation(instance)
+
+        result = calc.perform_operation(a, b)
+        print(f"\nResult: {format_result(result)}")
+    except (ValidationError, OperationError) as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+
+
+def execute_command(calc: Calculator, text: str, interactive: bool = True, depth: int = 0) -> bool:
+    """Execute a single command; return False when the REPL should stop."""
+    parts = text.strip().split()
+    command = parts[0].lower() if parts else ''
+    args = parts[1:]
+
+    if PROFILER.running and command != 'profile':
+        with PROFILER.sampling():
+            return _dispatch(calc, command, args, interactive, depth)
+    return _dispatch(calc, command, args, interactive, depth)
+
+
+def _dispatch(calc: Calculator, command: str, args: List[str], interactive: bool, depth: int) -> bool:
+    handler = COMMANDS.get(command)
+    if handler is not None:
+        return handler(calc, args, depth)
+
+    operation = OperationFactory.resolve(command) if command else None
+    if operation is not None:
+        _run_operation(calc, command, operation, args, interactive)
+        return True
+
+    print(f"Unknown command: '{command}'. Type 'help' for available commands.")
+    return True
+
+
+def run_line(calc: Calculator, line: str, interactive: bool = True, depth: int = 0) -> bool:
+    """Execute one input line, which may hold several ';'-separated commands."""
+    if ';' not in line:
+        return execute_command(calc, line, interactive, depth)
+    for segment in line.split(';'):
+        if segment.strip() and not execute_command(calc, segment, interactive, depth):
+            return False
+    return True
+
 
 def calculator_repl():
     try:
+        load_environment()
         calc = Calculator()
         calc.add_observer(LoggingObserver())
         calc.add_observer(AutoSaveObserver(calc))
+    except Exception as e:
+        print(f"Fatal error: {e}") #pragma: no cover
+        logging.error(f"Fatal error in calculator REPL: {e}") #pragma: no cover
+        raise #pragma: no cover
 
-        print("Calculator started. Type 'help' for commands.")
-
+    print("Calculator started. Type 'help' for commands.")
+    try:
         while True:
             try:
-                command = input("\nEnter command: ").lower().strip()
-
-                if command == 'help':
-                    print("\nAvailable commands:")
-                    print("  add, subtract, multiply, divide, power, root - Perform calculations")
-                    print("  history - Show calculation history")
-                    print("  clear - Clear calculation history")
-                    print("  undo - Undo the last calculation")
-                    print("  redo - Redo the last undone calculation")
-                    print("  save - Save calculation history to file")
-                    print("  load - Load calculation history from file")
-                    print("  exit - Exit the calculator")
-                    continue #pragma: no cover
-
-                if command == 'exit':
-                    try:
-                        calc.save_history()
-                        print("History saved successfully.")
-                    except Exception as e:
-                        print(f"Warning: Could not save history: {e}") #pragma: no cover
-                    print("Goodbye!") #pragma: no cover
-                    break #pragma: no cover
-
-                if command == 'history':
-                    history = calc.show_history()
-                    if not history:
-                        print("No calculations in history")
-                    else:
-                        print("\nCalculation History:")
-                        for i, entry in enumerate(history, 1):
-                            print(f"{i}. {entry}") #pragma: no cover
-                    continue #pragma: no cover
-
-                if command == 'clear':
-                    calc.clear_history()
-                    print("History cleared")
-                    continue #pragma: no cover
-
-                if command == 'undo':
-                    if calc.undo():
-                        print("Operation undone")
-                    else:
-                        print("Nothing to undo")
-                    continue #pragma: no cover
-
-                if command == 'redo':
-                    if calc.redo():
-                        print("Operation redone")
-                    else:
-                        print("Nothing to redo")
-                    continue #pragma: no cover
-
-                if command == 'save':
-                    try:
-                        calc.save_history()
-                        print("History saved successfully")
-                    except Exception as e:
-                        print(f"Error saving history: {e}") #pragma: no cover
-                    continue #pragma: no cover
-
-                if command == 'load':
-                    try:
-                        calc.load_history()
-                        print("History loaded successfully")
-                    except Exception as e:
-                        print(f"Error loading history: {e}") #pragma: no cover
-                    continue #pragma: no cover
-
-                if command in ['add', 'subtract', 'multiply', 'divide', 'power', 'root']:
-                    try:
-                        print("\nEnter numbers (or 'cancel' to abort):")
-                        a = input("First number: ")
-                        if a.lower() == 'cancel':
-                            print("Operation cancelled")
-                            continue #pragma: no cover
-                        b = input("Second number: ")
-                        if b.lower() == 'cancel':
-                            print("Operation cancelled")
-                            continue #pragma: no cover
-
-                        operation = OperationFactory.create_operation(command)
-                        calc.set_operation(operation)
-
-                        result = calc.perform_operation(a, b)
-
-                        # Format result cleanly
-                        if isinstance(result, Decimal):
-                            if result == result.to_integral():
-                                result = str(result.quantize(Decimal("1")))
-                            else:
-                                result = str(result.normalize())
-
-                        print(f"\nResult: {result}")
-                    except (ValidationError, OperationError) as e:
-                        print(f"Error: {e}")
-                    except Exception as e:
-                        print(f"Unexpected error: {e}")
-                    continue #pragma: no cover
-
-                print(f"Unknown command: '{command}'. Type 'help' for available commands.")
+                line = input("\nEnter command: ")
+                if not run_line(calc, line):
+                    break
 
             except KeyboardInterrupt:
                 print("\nOperation cancelled")
@@ -130,4 +374,6 @@ def calculator_repl():
     except Exception as e:
         print(f"Fatal error: {e}") #pragma: no cover
         logging.error(f"Fatal error in calculator REPL: {e}") #pragma: no cover
-        raise #pragma: no cover
\ No newline at end of file
+        raise #pragma: no cover
+    finally:
+        _shutdown(calc)
@@ -0,0 +1,58 @@
+########################
+# Session Checkpoints  #
+########################
+
+import os
+from pathlib import Path
+import pickle
+import struct
+from typing import Any, Dict, Union
+
+from app.exceptions import OperationError
+
+MAGIC = b'CALCCKPT'
+VERSION = 1
+_HEADER = struct.Struct('>8sH')
+
+
+def write_checkpoint(path: Union[str, Path], state: Dict[str, Any]) -> Path:
+    """Write ``state`` to ``path`` as a versioned binary checkpoint.
+
+    Objects are pickled as they are, so restoring does not re-parse or
+    recompute anything; shared references (history entries held by both
+    the history and the undo mementos) are stored once.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION))
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return path
+
+
+def read_checkpoint(path: Union[str, Path]) -> Dict[str, Any]:
+    """Read a checkpoint written by ``write_checkpoint``.
+
+    Checkpoints are pickles: only restore files this calculator wrote.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise OperationError(f"Not a calculator checkpoint: {path}")
+            magic, version = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise OperationError(f"Not a calculator checkpoint: {path}")
+            if version != VERSION:
+                raise OperationError(f"Unsupported checkpoint version {version} in {path}")
+            return pickle.load(f)
+    except OperationError:
+        raise
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        raise OperationError(f"Failed to read checkpoint: {e}")
@@ -0,0 +1,72 @@
+########################
+# Decimal Contexts     #
+########################
+
+from contextlib import contextmanager
+import decimal
+from decimal import Decimal
+from functools import lru_cache
+import threading
+from typing import Dict, Iterator
+
+GUARD_DIGITS = 5
+
+_local = threading.local()
+
+
+def working_precision(precision: int) -> int:
+    """Digits to compute with for results shown to ``precision`` decimal places.
+
+    Never drops below decimal's default of 28 digits: ``precision`` counts
+    decimal places, so a smaller context would round the integer part of
+    large results.
+    """
+    return max(precision + GUARD_DIGITS, decimal.DefaultContext.prec)
+
+
+def thread_context(prec: int) -> decimal.Context:
+    """This thread's context for ``prec`` digits, created once and reused.
+
+    Contexts record signal flags as they are used, so each thread gets
+    its own instead of sharing one between calculators on different
+    threads.
+    """
+    contexts: Dict[int, decimal.Context] = getattr(_local, 'contexts', None)
+    if contexts is None:
+        contexts = _local.contexts = {}
+    context = contexts.get(prec)
+    if context is None:
+        context = contexts[prec] = decimal.Context(prec=prec, rounding=decimal.ROUND_HALF_EVEN)
+    return context
+
+
+@contextmanager
+def precision_context(prec: int) -> Iterator[decimal.Context]:
+    """Run the block under this thread's ``prec``-digit context."""
+    previous = decimal.getcontext()
+    context = thread_context(prec)
+    decimal.setcontext(context)
+    try:
+        yield context
+    finally:
+        decimal.setcontext(previous)
+
+
+@lru_cache(maxsize=256)
+def quantizer(exponent: int) -> Decimal:
+    """Cached ``Decimal`` with the given exponent, e.g. -2 -> Decimal('0.01')."""
+    return Decimal(1).scaleb(exponent)
+
+
+def round_places(value: Decimal, places: int) -> Decimal:
+    """Round ``value`` to at most ``places`` decimal places; shorter values are kept as they are."""
+    if not value.is_finite() or value.as_tuple().exponent >= -places:
+        return value
+    return value.quantize(quantizer(-places))
+
+
+def round_significant(value: Decimal, digits: int) -> Decimal:
+    """Round ``value`` to ``digits`` significant digits."""
+    if not value.is_finite() or not value:
+        return value
+    return value.quantize(quantizer(value.adjusted() - digits + 1))
@@ -0,0 +1,254 @@
+########################
+# Observer Event Bus   #
+########################
+
+from collections import deque
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from app.calculation import Calculation
+from app.exceptions import ConfigurationError
+
+BACKPRESSURE_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+DISPATCH_MODES = ('sync', 'async')
+
+
+@dataclass
+class ObserverStats:
+    """Delivery and timing counters for a single subscribed observer."""
+
+    delivered: int = 0
+    batches: int = 0
+    dropped: int = 0
+    failures: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the counters to a dictionary."""
+        return {
+            'delivered': self.delivered,
+            'batches': self.batches,
+            'dropped': self.dropped,
+            'failures': self.failures,
+            'total_time': self.total_time,
+            'max_time': self.max_time,
+        }
+
+
+class Subscription:
+    """An observer's queue, filter and delivery worker on the event bus."""
+
+    def __init__(
+        self,
+        observer: Any,
+        operations: Optional[Iterable[str]] = None,
+        max_queue_size: int = 1000,
+        policy: str = 'block',
+        batch_size: int = 100,
+        asynchronous: bool = True
+    ):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ConfigurationError(f"Unknown backpressure policy: {policy}")
+        if max_queue_size <= 0 or batch_size <= 0:
+            raise ConfigurationError("Queue and batch sizes must be positive")
+
+        self.observer = observer
+        self.operations = frozenset(operations) if operations else None
+        self.max_queue_size = max_queue_size
+        self.policy = policy
+        self.batch_size = batch_size
+        self.asynchronous = asynchronous
+        self.stats = ObserverStats()
+
+        self._queue: Deque[Calculation] = deque()
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def name(self) -> str:
+        return self.observer.__class__.__name__
+
+    def accepts(self, calculation: Calculation) -> bool:
+        """Return True if the calculation matches the operation filter."""
+        return self.operations is None or calculation.operation in self.operations
+
+    def enqueue(self, calculations: List[Calculation]) -> None:
+        """Queue calculations for delivery, or deliver them inline when synchronous."""
+        accepted = [calc for calc in calculations if self.accepts(calc)]
+        if not accepted:
+            return
+        if not self.asynchronous or threading.current_thread() is self._thread:
+            # Inline delivery also avoids deadlocking an observer that
+            # triggers new calculations from inside its own worker.
+            for start in range(0, len(accepted), self.batch_size):
+                self.deliver(accepted[start:start + self.batch_size])
+            return
+
+        with self._cond:
+            if self._closed:
+                self.stats.dropped += len(accepted)
+                return
+            self._ensure_worker()
+            for calc in accepted:
+                self._put(calc)
+            self._cond.notify_all()
+
+    def _put(self, calculation: Calculation) -> None:
+        if len(self._queue) >= self.max_queue_size:
+            if self.policy == 'drop_newest':
+                self.stats.dropped += 1
+                return
+            if self.policy == 'drop_oldest':
+                self._queue.popleft()
+                self.stats.dropped += 1
+            else:
+                self._cond.notify_all()
+                while len(self._queue) >= self.max_queue_size and not self._closed:
+                    self._cond.wait()
+        self._queue.append(calculation)
+
+    def deliver(self, batch: List[Calculation]) -> None:
+        """Hand a batch to the observer, isolating and counting any failure."""
+        start = time.perf_counter()
+        try:
+            update_many = getattr(self.observer, 'update_many', None)
+            if update_many is not None:
+                update_many(batch)
+            else:
+                for calc in batch:
+                    self.observer.update(calc)
+            self.stats.delivered += len(batch)
+        except Exception as e:
+            self.stats.failures += 1
+            logging.error(f"Observer {self.name} failed: {e}")
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats.batches += 1
+            self.stats.total_time += elapsed
+            self.stats.max_time = max(self.stats.max_time, elapsed)
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"observer-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                count = min(self.batch_size, len(self._queue))
+                batch = [self._queue.popleft() for _ in range(count)]
+                self._in_flight = count
+                self._cond.notify_all()
+            self.deliver(batch)
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued calculation has been delivered."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Drain the queue and stop the worker thread."""
+        if threading.current_thread() is not self._thread:
+            # From its own worker (an observer unsubscribing itself), the
+            # in-flight batch would never finish; the worker drains the rest.
+            self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+
+class EventBus:
+    """Dispatches calculation events to observers with batching and isolation."""
+
+    def __init__(
+        self,
+        mode: str = 'sync',
+        max_queue_size: int = 1000,
+        policy: str = 'block',
+        batch_size: int = 100
+    ):
+        if mode not in DISPATCH_MODES:
+            raise ConfigurationError(f"Unknown dispatch mode: {mode}")
+        self.mode = mode
+        self.max_queue_size = max_queue_size
+        self.policy = policy
+        self.batch_size = batch_size
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self,
+        observer: Any,
+        operations: Optional[Iterable[str]] = None,
+        max_queue_size: Optional[int] = None,
+        policy: Optional[str] = None,
+        batch_size: Optional[int] = None
+    ) -> Subscription:
+        """Register an observer, optionally limited to certain operations."""
+        subscription = Subscription(
+            observer,
+            operations=operations,
+            max_queue_size=max_queue_size or self.max_queue_size,
+            policy=policy or self.policy,
+            batch_size=batch_size or self.batch_size,
+            asynchronous=self.mode == 'async'
+        )
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, observer: Any) -> None:
+        """Remove an observer after delivering what is already queued to it."""
+        with self._lock:
+            removed = [s for s in self._subscriptions if s.observer is observer]
+            self._subscriptions = [s for s in self._subscriptions if s.observer is not observer]
+        for subscription in removed:
+            subscription.close()
+
+    def publish(self, calculation: Calculation) -> None:
+        """Publish a single calculation to every matching subscriber."""
+        self.publish_many([calculation])
+
+    def publish_many(self, calculations: List[Calculation]) -> None:
+        """Publish several calculations so observers can receive them as a batch."""
+        for subscription in self._subscriptions:
+            subscription.enqueue(calculations)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all subscribers have drained their queues."""
+        return all(s.flush(timeout) for s in self._subscriptions)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Drain and stop every subscriber worker."""
+        for subscription in self._subscriptions:
+            subscription.close(timeout)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Return per-observer delivery and timing counters."""
+        return [
+            {'observer': s.name, 'queued': len(s._queue), **s.stats.to_dict()}
+            for s in self._subscriptions
+        ]
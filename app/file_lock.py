@@ -0,0 +1,88 @@
+########################
+# Inter-process Locks  #
+########################
+
+import os
+from pathlib import Path
+import time
+from typing import Optional, Union
+
+from app.exceptions import OperationError
+
+try:  # POSIX
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Advisory lock on a sidecar file, shared between processes.
+
+    Readers may take a shared lock; writers take an exclusive one. On
+    Windows only exclusive locks are available, so shared requests are
+    upgraded.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        shared: bool = False,
+        timeout: Optional[float] = None,
+        poll_interval: float = 0.0005,
+        max_poll_interval: float = 0.01
+    ):
+        self.path = Path(path)
+        self.shared = shared
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        delay = self.poll_interval
+        while True:
+            try:
+                self._lock(fd, blocking=deadline is None)
+                self._fd = fd
+                return
+            except OSError as e:
+                if deadline is None or time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise OperationError(f"Could not lock {self.path}: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_poll_interval)
+
+    def _lock(self, fd: int, blocking: bool) -> None:
+        if fcntl is not None:
+            mode = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+            fcntl.flock(fd, mode if blocking else mode | fcntl.LOCK_NB)
+        else:  # pragma: no cover - Windows
+            msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    @property
+    def locked(self) -> bool:
+        return self._fd is not None
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
@@ -4,7 +4,7 @@
 
 from abc import ABC, abstractmethod
 import logging
-from typing import Any
+from typing import Any, List
 from app.calculation import Calculation
 
 
@@ -16,6 +16,11 @@ class HistoryObserver(ABC):
         """Handle a new calculation event."""
         pass  # pragma: no cover
 
+    def update_many(self, calculations: List[Calculation]) -> None:
+        """Handle a batch of calculation events; defaults to one update each."""
+        for calculation in calculations:
+            self.update(calculation)
+
 
 class LoggingObserver(HistoryObserver):
     """Logs each new calculation to the log file."""
@@ -43,3 +48,9 @@ class AutoSaveObserver(HistoryObserver):
         if self.calculator.config.auto_save:
             self.calculator.save_history()
             logging.info("History auto-saved") #pragma: no cover
+
+    def update_many(self, calculations: List[Calculation]) -> None:
+        # One save covers the whole batch.
+        if calculations and self.calculator.config.auto_save:
+            self.calculator.save_history()
+            logging.info(f"History auto-saved after {len(calculations)} calculations")
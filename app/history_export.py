@@ -0,0 +1,88 @@
+########################
+# History Export       #
+########################
+
+import csv
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Union
+
+from app.exceptions import OperationError
+from app.history_storage import HISTORY_COLUMNS, Record
+
+
+def _write_csv(path: Path, chunks: Iterable[List[Record]], encoding: str) -> int:
+    rows = 0
+    with open(path, 'w', newline='', encoding=encoding) as f:
+        writer = csv.DictWriter(f, fieldnames=HISTORY_COLUMNS, lineterminator='\n')
+        writer.writeheader()
+        for chunk in chunks:
+            writer.writerows(chunk)
+            rows += len(chunk)
+    return rows
+
+
+def _write_jsonl(path: Path, chunks: Iterable[List[Record]], encoding: str) -> int:
+    rows = 0
+    with open(path, 'w', encoding=encoding) as f:
+        for chunk in chunks:
+            f.write(''.join(json.dumps(record) + '\n' for record in chunk))
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet(path: Path, chunks: Iterable[List[Record]], encoding: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise OperationError("Parquet export requires the 'pyarrow' package") from e
+
+    schema = pa.schema([(column, pa.string()) for column in HISTORY_COLUMNS])
+    rows = 0
+    # Each chunk becomes one row group, so memory stays bounded by chunk_size.
+    with pq.ParquetWriter(str(path), schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+EXPORT_FORMATS: Dict[str, Callable[[Path, Iterable[List[Record]], str], int]] = {
+    'csv': _write_csv,
+    'jsonl': _write_jsonl,
+    'parquet': _write_parquet,
+}
+
+
+def export_format_for(path: Union[str, Path]) -> str:
+    """Infer the export format from a file extension, defaulting to CSV."""
+    suffix = Path(path).suffix.lower().lstrip('.')
+    return suffix if suffix in EXPORT_FORMATS else 'csv'
+
+
+def export_records(
+    path: Union[str, Path],
+    chunks: Iterable[List[Record]],
+    fmt: str = 'csv',
+    encoding: str = 'utf-8'
+) -> int:
+    """Stream record chunks to ``path``; return the number of rows written.
+
+    Output goes to a temporary file that replaces ``path`` only once the
+    export has completed.
+    """
+    writer = EXPORT_FORMATS.get(fmt)
+    if writer is None:
+        raise OperationError(f"Unknown export format: {fmt}")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        rows = writer(tmp_path, chunks, encoding)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return rows
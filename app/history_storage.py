@@ -0,0 +1,565 @@
+########################
+# History Storage      #
+########################
+
+from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import nullcontext
+import csv
+import datetime
+import logging
+import os
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.calculation import Calculation
+from app.calculator_config import CalculatorConfig
+from app.exceptions import ConfigurationError, OperationError
+from app.file_lock import FileLock
+
+HISTORY_COLUMNS = ['operation', 'operand1', 'operand2', 'result', 'timestamp']
+
+Record = Dict[str, Any]
+
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# Shared CSV history marks removals with rows instead of rewriting the file.
+CLEARED_MARKER = '#cleared'
+REMOVED_MARKER = '#removed'
+
+
+def record_chunks(calculations: Iterable[Calculation], chunk_size: int) -> Iterator[List[Record]]:
+    """Yield serialized calculations in lists of at most ``chunk_size``."""
+    if chunk_size <= 0:
+        raise OperationError("chunk_size must be positive")
+    chunk: List[Record] = []
+    for calc in calculations:
+        chunk.append(calc.to_dict())
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_calculations(records: Iterable[Record]) -> List[Calculation]:
+    """Rebuild stored calculations, skipping (with a warning) rows that cannot be."""
+    history = []
+    for record in records:
+        try:
+            history.append(Calculation.from_dict(record))
+        except OperationError as e:
+            logging.warning(f"Skipping unreadable history row {record}: {e}")
+    return history
+
+
+def filter_calculations(
+    calculations: Iterable[Calculation],
+    operation: Optional[str] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    limit: Optional[int] = None
+) -> List[Calculation]:
+    """Return the calculations matching the filters, keeping the last ``limit``."""
+    matches = [
+        calc for calc in calculations
+        if (operation is None or calc.operation == operation)
+        and (since is None or calc.timestamp >= since)
+        and (until is None or calc.timestamp < until)
+    ]
+    return matches[-limit:] if limit else matches
+
+
+def row_key(record: Record) -> Tuple[str, str, str, str]:
+    """Identify a stored row the way incremental backends match removals."""
+    return (record['timestamp'], record['operation'], str(record['operand1']), str(record['operand2']))
+
+
+def drop_removed(calculations: List[Calculation], removed: List[Calculation]) -> List[Calculation]:
+    """Return ``calculations`` without the last row matching each of ``removed``."""
+    pending = Counter(row_key(calc.to_dict()) for calc in removed)
+    kept = []
+    for calc in reversed(calculations):
+        key = row_key(calc.to_dict())
+        if pending[key]:
+            pending[key] -= 1
+        else:
+            kept.append(calc)
+    kept.reverse()
+    return kept
+
+
+def pending_records(
+    stored: Iterable[List[Record]],
+    removed: List[Calculation],
+    appended: List[Calculation],
+    chunk_size: int
+) -> Iterator[List[Record]]:
+    """Yield stored record chunks as they will read once pending changes are saved.
+
+    Appended calculations that turn up in ``stored`` (because a save ran
+    while it was read) are not yielded twice.
+    """
+    removals = Counter(row_key(calc.to_dict()) for calc in removed)
+    new_records = [calc.to_dict() for calc in appended]
+    new_keys = {row_key(record) for record in new_records}
+    saved: Counter = Counter()
+    for chunk in stored:
+        kept = []
+        for record in chunk:
+            key = row_key(record)
+            if removals[key]:
+                removals[key] -= 1
+                continue
+            if key in new_keys:
+                saved[key] += 1
+            kept.append(record)
+        if kept:
+            yield kept
+    unsaved = []
+    for record in new_records:
+        key = row_key(record)
+        if saved[key]:
+            saved[key] -= 1
+        else:
+            unsaved.append(record)
+    for start in range(0, len(unsaved), chunk_size):
+        yield unsaved[start:start + chunk_size]
+
+
+def read_tail_lines(path: Path, count: int, block_size: int = TAIL_BLOCK_SIZE) -> Tuple[bytes, List[bytes]]:
+    """Return a file's first line and its last ``count`` non-empty lines.
+
+    The tail is found by reading fixed-size blocks backwards from the end
+    until enough line breaks are seen, so the cost depends on ``count``
+    rather than on the file size.
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        position = f.seek(0, os.SEEK_END)
+        buffer = b''
+        while position > data_start and buffer.count(b'\n') <= count:
+            size = min(block_size, position - data_start)
+            position -= size
+            f.seek(position)
+            buffer = f.read(size) + buffer
+    lines = buffer.splitlines()
+    if position > data_start:
+        lines = lines[1:]  # the block boundary may split the first line
+    lines = [line for line in lines if line.strip()]
+    return header, lines[-count:] if count else []
+
+
+def _is_marker(record: Record) -> bool:
+    return record['operation'] == CLEARED_MARKER or record['result'] == REMOVED_MARKER
+
+
+class HistoryStorage(ABC):
+    """Persistence backend for calculation history.
+
+    Backends that are not ``incremental`` are rewritten in full by
+    ``save``; incremental backends receive only the changes since the
+    last save through ``apply_changes``.
+    """
+
+    incremental = False
+
+    @abstractmethod
+    def load(self, limit: Optional[int] = None) -> Optional[List[Calculation]]:
+        """Return stored calculations (at most the last ``limit``), or None if there are none."""
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def save(self, history: List[Calculation]) -> None:
+        """Replace the stored history with ``history``."""
+        pass  # pragma: no cover
+
+    def apply_changes(
+        self,
+        appended: List[Calculation],
+        removed: List[Calculation],
+        cleared: bool = False
+    ) -> None:
+        """Apply the changes made since the last save."""
+        raise OperationError(f"{self.__class__.__name__} does not support incremental saves")
+
+    def query(
+        self,
+        operation: Optional[str] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[Calculation]:
+        """Return stored calculations matching the filters, oldest first."""
+        return filter_calculations(self.load() or [], operation, since, until, limit)
+
+    def iter_records(self, chunk_size: int = 1000) -> Iterator[List[Record]]:
+        """Yield stored rows as serialized records, ``chunk_size`` at a time."""
+        return record_chunks(self.load() or [], chunk_size)
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class CsvHistoryStorage(HistoryStorage):
+    """Stores history as a CSV file that is rewritten on every save."""
+
+    def __init__(self, path: Path, encoding: str = 'utf-8'):
+        self.path = path
+        self.encoding = encoding
+
+    def load(self, limit: Optional[int] = None) -> Optional[List[Calculation]]:
+        if not self.path.exists():
+            logging.info("No history file found - starting with empty history")
+            return None
+        if limit is not None:
+            return self._load_tail(limit)
+        import pandas as pd  # deferred: only a full read needs pandas
+
+        df = self._read(pd)
+        if df.empty:
+            logging.info("Loaded empty history file")
+            return None
+        history = load_calculations(row.to_dict() for _, row in df.iterrows())
+        logging.info(f"Loaded {len(history)} calculations from history")
+        return history
+
+    def _load_tail(self, limit: int) -> Optional[List[Calculation]]:
+        history = load_calculations(self._tail_records(limit))
+        if not history:
+            logging.info("Loaded empty history file")
+            return None
+        logging.info(f"Loaded last {len(history)} calculations from history")
+        return history
+
+    def _tail_records(self, limit: int) -> List[Record]:
+        # History fields never contain line breaks, so every CSV row is one line.
+        with self._read_lock():
+            header, lines = read_tail_lines(self.path, limit)
+        columns = next(csv.reader([header.decode(self.encoding)]), [])
+        rows = csv.reader(line.decode(self.encoding) for line in lines)
+        return [dict(zip(columns, row)) for row in rows]
+
+    def _read(self, pd: Any) -> Any:
+        return pd.read_csv(self.path)
+
+    def _read_lock(self) -> Any:
+        return nullcontext()
+
+    def iter_records(self, chunk_size: int = 1000) -> Iterator[List[Record]]:
+        if chunk_size <= 0:
+            raise OperationError("chunk_size must be positive")
+        if not self.path.exists():
+            return
+        with self._read_lock(), open(self.path, newline='', encoding=self.encoding) as f:
+            chunk: List[Record] = []
+            for row in csv.DictReader(f):
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+    def save(self, history: List[Calculation]) -> None:
+        import pandas as pd
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        history_data = [
+            {
+                'operation': str(calc.operation),
+                'operand1': str(calc.operand1),
+                'operand2': str(calc.operand2),
+                'result': str(calc.result),
+                'timestamp': calc.timestamp.isoformat()
+            }
+            for calc in history
+        ]
+        if history_data:
+            pd.DataFrame(history_data).to_csv(self.path, index=False)
+            logging.info(f"History saved successfully to {self.path}")
+        else:
+            pd.DataFrame(columns=HISTORY_COLUMNS).to_csv(self.path, index=False)
+            logging.info("Empty history saved")
+
+
+class SharedCsvHistoryStorage(CsvHistoryStorage):
+    """CSV history shared by several processes through file locking.
+
+    Saves append this session's new rows under an exclusive lock.
+    Rows already written are never rewritten, because other processes may
+    be reading them; a clear or removal appends a marker row instead,
+    which every read honours.
+    """
+
+    incremental = True
+
+    def __init__(self, path: Path, encoding: str = 'utf-8', lock_timeout: float = 10.0):
+        super().__init__(path, encoding)
+        self.lock_timeout = lock_timeout
+
+    def _lock(self, shared: bool = False) -> FileLock:
+        return FileLock(
+            self.path.with_name(self.path.name + '.lock'),
+            shared=shared,
+            timeout=self.lock_timeout
+        )
+
+    def _read(self, pd: Any) -> Any:
+        return pd.DataFrame(self._live_records(), columns=HISTORY_COLUMNS)
+
+    def _read_lock(self) -> Any:
+        return self._lock(shared=True)
+
+    def _tail_records(self, limit: int) -> List[Record]:
+        records = super()._tail_records(limit)
+        # Markers only affect earlier rows, so a tail without any is exact.
+        if any(_is_marker(record) for record in records):
+            records = self._live_records()[-limit:]
+        return records
+
+    def _live_records(self) -> List[Record]:
+        """Read every row and apply the clear and removal markers."""
+        live: List[Record] = []
+        with self._read_lock(), open(self.path, newline='', encoding=self.encoding) as f:
+            for record in csv.DictReader(f):
+                if record['operation'] == CLEARED_MARKER:
+                    live = []
+                elif record['result'] == REMOVED_MARKER:
+                    key = row_key(record)
+                    for index in range(len(live) - 1, -1, -1):
+                        if row_key(live[index]) == key:
+                            del live[index]
+                            break
+                else:
+                    live.append(record)
+        return live
+
+    def iter_records(self, chunk_size: int = 1000) -> Iterator[List[Record]]:
+        if chunk_size <= 0:
+            raise OperationError("chunk_size must be positive")
+        if not self.path.exists():
+            return
+        records = self._live_records()
+        for start in range(0, len(records), chunk_size):
+            yield records[start:start + chunk_size]
+
+    def save(self, history: List[Calculation]) -> None:
+        raise OperationError("A shared history file cannot be rewritten")
+
+    def apply_changes(
+        self,
+        appended: List[Calculation],
+        removed: List[Calculation],
+        cleared: bool = False
+    ) -> None:
+        rows = []
+        if cleared:
+            rows.append([CLEARED_MARKER, '', '', '', datetime.datetime.now().isoformat()])
+        for calc in removed:
+            record = dict(calc.to_dict(), result=REMOVED_MARKER)
+            rows.append([record[column] for column in HISTORY_COLUMNS])
+        rows.extend([calc.to_dict()[column] for column in HISTORY_COLUMNS] for calc in appended)
+        if not rows:
+            return
+        with self._lock():
+            write_header = not self.path.exists() or self.path.stat().st_size == 0
+            with open(self.path, 'a', newline='', encoding=self.encoding) as f:
+                writer = csv.writer(f, lineterminator='\n')
+                if write_header:
+                    writer.writerow(HISTORY_COLUMNS)
+                writer.writerows(rows)
+        logging.info(
+            f"Appended history changes to {self.path}: {len(appended)} added, "
+            f"{len(removed)} removed{', cleared' if cleared else ''}"
+        )
+
+
+class SqliteHistoryStorage(HistoryStorage):
+    """Stores history in SQLite using WAL mode and a single long-lived connection.
+
+    Every calculation ever saved is kept, so the database also serves
+    history queries beyond ``max_history_size``.
+    """
+
+    incremental = True
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS calculations ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " operation TEXT NOT NULL,"
+        " operand1 TEXT NOT NULL,"
+        " operand2 TEXT NOT NULL,"
+        " result TEXT NOT NULL,"
+        " timestamp TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_calculations_timestamp ON calculations (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_calculations_operation ON calculations (operation)",
+    )
+    _INSERT = (
+        "INSERT INTO calculations (operation, operand1, operand2, result, timestamp) "
+        "VALUES (?, ?, ?, ?, ?)"
+    )
+
+    def __init__(self, path: Path, timeout: float = 10.0):
+        self.path = path
+        self.timeout = timeout
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Opened on first use and shared with the autosave worker thread;
+        # self._lock serializes access.
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.path),
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _row(calc: Calculation) -> tuple:
+        return (
+            calc.operation,
+            str(calc.operand1),
+            str(calc.operand2),
+            str(calc.result),
+            calc.timestamp.isoformat(),
+        )
+
+    @staticmethod
+    def _from_rows(rows: Iterable[tuple]) -> List[Calculation]:
+        return load_calculations(dict(zip(HISTORY_COLUMNS, row)) for row in rows)
+
+    def _transaction(self, work) -> None:
+        with self._lock:
+            conn = self.connection
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                work(conn)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def load(self, limit: Optional[int] = None) -> Optional[List[Calculation]]:
+        history = self.query(limit=limit)
+        if not history:
+            logging.info("No stored history - starting with empty history")
+            return None
+        logging.info(f"Loaded {len(history)} calculations from {self.path}")
+        return history
+
+    def save(self, history: List[Calculation]) -> None:
+        def work(conn: sqlite3.Connection) -> None:
+            conn.execute("DELETE FROM calculations")
+            conn.executemany(self._INSERT, [self._row(calc) for calc in history])
+
+        self._transaction(work)
+        logging.info(f"History saved successfully to {self.path}")
+
+    def apply_changes(
+        self,
+        appended: List[Calculation],
+        removed: List[Calculation],
+        cleared: bool = False
+    ) -> None:
+        def work(conn: sqlite3.Connection) -> None:
+            if cleared:
+                conn.execute("DELETE FROM calculations")
+            for calc in removed:
+                conn.execute(
+                    "DELETE FROM calculations WHERE id = ("
+                    " SELECT id FROM calculations WHERE timestamp = ? AND operation = ?"
+                    " AND operand1 = ? AND operand2 = ? ORDER BY id DESC LIMIT 1)",
+                    (calc.timestamp.isoformat(), calc.operation,
+                     str(calc.operand1), str(calc.operand2))
+                )
+            if appended:
+                conn.executemany(self._INSERT, [self._row(calc) for calc in appended])
+
+        if appended or removed or cleared:
+            self._transaction(work)
+            logging.info(
+                f"Saved history changes to {self.path}: {len(appended)} added, "
+                f"{len(removed)} removed{', cleared' if cleared else ''}"
+            )
+
+    def query(
+        self,
+        operation: Optional[str] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[Calculation]:
+        clauses, params = [], []
+        if operation is not None:
+            clauses.append("operation = ?")
+            params.append(operation)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since.isoformat())
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until.isoformat())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT operation, operand1, operand2, result, timestamp FROM calculations{where} ORDER BY id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        rows.reverse()
+        return self._from_rows(rows)
+
+    def iter_records(self, chunk_size: int = 1000) -> Iterator[List[Record]]:
+        # Keyset pagination: each page is a short indexed read, so the lock
+        # is never held for the whole export.
+        if chunk_size <= 0:
+            raise OperationError("chunk_size must be positive")
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self.connection.execute(
+                    "SELECT id, operation, operand1, operand2, result, timestamp "
+                    "FROM calculations WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [dict(zip(HISTORY_COLUMNS, row[1:])) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM calculations").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_history_storage(config: CalculatorConfig) -> HistoryStorage:
+    """Build the history backend selected by the configuration."""
+    if config.history_backend == 'sqlite':
+        return SqliteHistoryStorage(config.history_db_file, timeout=config.lock_timeout)
+    if config.history_backend == 'csv':
+        if config.history_mode == 'shared':
+            return SharedCsvHistoryStorage(
+                config.history_file, config.default_encoding, config.lock_timeout
+            )
+        return CsvHistoryStorage(config.history_file, config.default_encoding)
+    raise ConfigurationError(f"Unknown history backend: {config.history_backend}")
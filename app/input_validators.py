@@ -26,3 +26,14 @@ class InputValidator:
             return number.normalize()
         except InvalidOperation as e:
             raise ValidationError(f"Invalid number format: {value}") from e
+
+    @staticmethod
+    def validate_array(values: Any, config: CalculatorConfig) -> Any:
+        """Validate a numeric NumPy array against config limits in one pass."""
+        import numpy as np  # only reached with an array, so NumPy is loaded
+
+        if not np.isfinite(values).all():
+            raise ValidationError("Invalid number format: array holds NaN or infinity")
+        if values.size and np.abs(values).max() > float(config.max_input_value):
+            raise ValidationError(f"Value exceeds maximum allowed: {config.max_input_value}")
+        return values
@@ -0,0 +1,117 @@
+########################
+# Log Rotation         #
+########################
+
+import datetime
+import gzip
+import logging.handlers
+import os
+from pathlib import Path
+import queue
+import shutil
+import threading
+import time
+from typing import List, Optional
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """File handler that rotates by size and/or age and gzips rotated files.
+
+    A rotated log is renamed with a timestamp suffix, which is a single
+    cheap rename on the logging thread; compression and deletion of files
+    beyond ``backup_count`` happen on a background thread, so writes that
+    trigger a rollover do not wait for them.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 0,
+        backup_count: int = 5,
+        rotate_interval: float = 0,
+        compress: bool = True,
+        encoding: Optional[str] = None
+    ):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self._next_rollover = time.time() + rotate_interval if rotate_interval else None
+        self._pending: 'queue.Queue[Optional[str]]' = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self._next_rollover is not None and time.time() >= self._next_rollover:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+            rotated = f"{self.baseFilename}.{stamp}"
+            os.replace(self.baseFilename, rotated)
+            if self.compress:
+                self._submit(rotated)
+            else:
+                self._enforce_retention()
+        if self.rotate_interval:
+            self._next_rollover = time.time() + self.rotate_interval
+        if not self.delay:
+            self.stream = self._open()
+
+    def rotated_files(self) -> List[Path]:
+        """Rotated logs, compressed or not, oldest first."""
+        base = Path(self.baseFilename)
+        return sorted(
+            path for path in base.parent.glob(base.name + '.*')
+            if not path.name.endswith('.tmp')
+        )
+
+    def _submit(self, path: str) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._compress_loop, name="log-compressor", daemon=True
+            )
+            self._worker.start()
+        self._pending.put(path)
+
+    def _compress_loop(self) -> None:
+        while True:
+            path = self._pending.get()
+            try:
+                if path is None:
+                    return
+                self._compress(path)
+                self._enforce_retention()
+            except OSError:
+                pass  # a failed compression leaves the plain rotated file
+            finally:
+                self._pending.task_done()
+
+    @staticmethod
+    def _compress(path: str) -> None:
+        target = path + '.gz'
+        tmp_path = target + '.tmp'
+        with open(path, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, target)
+        os.remove(path)
+
+    def _enforce_retention(self) -> None:
+        rotated = self.rotated_files()
+        for path in rotated[:max(len(rotated) - self.backupCount, 0)]:
+            path.unlink(missing_ok=True)
+
+    def wait_for_compression(self) -> None:
+        """Block until every rotated file queued so far has been compressed."""
+        if self._worker is not None:
+            self._pending.join()
+
+    def close(self) -> None:
+        if self._worker is not None:
+            self._pending.put(None)
+            self._worker.join()
+            self._worker = None
+        super().close()
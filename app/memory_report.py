@@ -0,0 +1,143 @@
+########################
+# Memory Report        #
+########################
+
+from collections import deque
+import sys
+import tracemalloc
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set
+
+if TYPE_CHECKING:  # pragma: no cover
+    from app.calculator import Calculator
+
+# Code and type objects are shared process-wide; they are never counted.
+_SKIPPED = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+
+def deep_size(obj: Any, seen: Set[int]) -> int:
+    """Bytes reachable from ``obj`` that are not already in ``seen``.
+
+    Objects are added to ``seen`` as they are counted, so measuring several
+    structures with one set charges shared objects (e.g. calculations held
+    by both the history and the undo mementos) only to the first.
+    """
+    total = 0
+    pending = [obj]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or isinstance(item, _SKIPPED):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            pending.extend(item)
+        else:
+            attributes = getattr(item, '__dict__', None)
+            if attributes is not None:
+                pending.append(attributes)
+            for slot in getattr(type(item), '__slots__', ()):
+                if hasattr(item, slot):
+                    pending.append(getattr(item, slot))
+    return total
+
+
+def _section(name: str, unit: str, items: Iterable[Any], seen: Set[int]) -> Dict[str, Any]:
+    items = list(items)
+    size = sum(deep_size(item, seen) for item in items)
+    return {
+        'name': name,
+        'unit': unit,
+        'count': len(items),
+        'bytes': size,
+        'bytes_per_item': size / len(items) if items else 0.0,
+    }
+
+
+def _tracemalloc_stats(top: int) -> Optional[Dict[str, Any]]:
+    if not tracemalloc.is_tracing():
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    statistics = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    )).statistics('lineno')
+    return {
+        'current_bytes': current,
+        'peak_bytes': peak,
+        'top': [
+            {
+                'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                'bytes': stat.size,
+                'count': stat.count,
+            }
+            for stat in statistics[:top]
+        ],
+    }
+
+
+def build_memory_report(calc: 'Calculator', top: int = 10) -> Dict[str, Any]:
+    """Estimate the memory held by each part of ``calc``'s state.
+
+    Sections are measured in order with a shared ``seen`` set: the history
+    is charged for its calculations, so a memento is charged only for its
+    list and for calculations no longer in the history.
+    """
+    seen = {id(calc)}  # observers refer back to the calculator
+    sections = [
+        _section('history', 'entry', calc.history, seen),
+        _section('undo_stack', 'memento', calc.undo_stack, seen),
+        _section('redo_stack', 'memento', calc.redo_stack, seen),
+        _section('observers', 'observer', calc.observers, seen),
+    ]
+    sections.append(_section('event_bus', 'bus', [calc.event_bus], seen))
+    if calc.undo_journal is not None and calc.undo_journal.loaded:
+        sections.append(_section('undo_journal', 'stack', calc.undo_journal.load().values(), seen))
+    return {
+        'sections': sections,
+        'total_bytes': sum(section['bytes'] for section in sections),
+        'tracemalloc': _tracemalloc_stats(top),
+    }
+
+
+def _human(size: float) -> str:
+    if size < 1024:
+        return f"{size:.0f} B"
+    for unit in ('KiB', 'MiB'):
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1024:.1f} GiB"
+
+
+def format_memory_report(report: Dict[str, Any]) -> List[str]:
+    lines = ["Memory report:"]
+    for section in report['sections']:
+        lines.append(
+            f"  {section['name']:<12} {section['count']:>7} {_human(section['bytes']):>11}"
+            f"  ({_human(section['bytes_per_item'])}/{section['unit']})"
+        )
+    lines.append(f"  {'total':<12} {'':>7} {_human(report['total_bytes']):>11}")
+    traced = report['tracemalloc']
+    if traced is None:
+        lines.append("  tracemalloc: off (use 'memory trace on')")
+        return lines
+    lines.append(
+        f"  tracemalloc: current {_human(traced['current_bytes'])}, "
+        f"peak {_human(traced['peak_bytes'])}"
+    )
+    for stat in traced['top']:
+        lines.append(f"    {_human(stat['bytes']):>11} in {stat['count']:>6} blocks  {stat['location']}")
+    return lines
+
+
+def set_tracing(enabled: bool) -> None:
+    """Start or stop tracemalloc; allocations are traced only while it runs."""
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
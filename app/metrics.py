@@ -0,0 +1,133 @@
+########################
+# Operation Metrics    #
+########################
+
+from bisect import bisect_left
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from app.exceptions import OperationError
+
+# Latency bucket upper bounds in seconds, from 10µs to 1s.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+STAGES = ('validation', 'execute', 'calculation', 'memento', 'append', 'eviction', 'notify', 'total')
+
+
+class Histogram:
+    """Fixed-bucket latency histogram."""
+
+    __slots__ = ('bounds', 'counts', 'count', 'total')
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (upper bound, cumulative count) pairs ending with +Inf."""
+        running = 0
+        pairs = []
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            pairs.append((repr(bound), running))
+        pairs.append(('+Inf', self.count))
+        return pairs
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'buckets': dict(self.cumulative()),
+        }
+
+
+class MetricsRecorder:
+    """Collects per-stage and per-operation latencies for perform_operation."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.operations: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def observe(self, stage: str, operation: str, seconds: float) -> None:
+        key = (stage, operation)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def count_operation(self, operation: str) -> None:
+        self.operations[operation] = self.operations.get(operation, 0) + 1
+
+    def count_error(self, operation: str) -> None:
+        self.errors[operation] = self.errors.get(operation, 0) + 1
+
+    def reset(self) -> None:
+        self.histograms.clear()
+        self.operations.clear()
+        self.errors.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return all counters and histograms as plain data."""
+        stages: Dict[str, Dict[str, Any]] = {}
+        for (stage, operation), histogram in sorted(self.histograms.items()):
+            stages.setdefault(stage, {})[operation] = histogram.to_dict()
+        return {
+            'operations_total': dict(self.operations),
+            'errors_total': dict(self.errors),
+            'stage_seconds': stages,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = [
+            '# HELP calculator_operations_total Completed calculations by operation.',
+            '# TYPE calculator_operations_total counter',
+        ]
+        for operation, count in sorted(self.operations.items()):
+            lines.append(f'calculator_operations_total{{operation="{operation}"}} {count}')
+
+        lines += [
+            '# HELP calculator_operation_errors_total Failed calculations by operation.',
+            '# TYPE calculator_operation_errors_total counter',
+        ]
+        for operation, count in sorted(self.errors.items()):
+            lines.append(f'calculator_operation_errors_total{{operation="{operation}"}} {count}')
+
+        lines += [
+            '# HELP calculator_stage_seconds Latency of perform_operation stages.',
+            '# TYPE calculator_stage_seconds histogram',
+        ]
+        for (stage, operation), histogram in sorted(self.histograms.items()):
+            labels = f'stage="{stage}",operation="{operation}"'
+            for bound, count in histogram.cumulative():
+                lines.append(f'calculator_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'calculator_stage_seconds_sum{{{labels}}} {histogram.total!r}')
+            lines.append(f'calculator_stage_seconds_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: Union[str, Path], fmt: str = 'prometheus') -> Path:
+        """Write the metrics to a file in 'prometheus' or 'json' format."""
+        renderers = {'prometheus': self.to_prometheus, 'json': self.to_json}
+        renderer = renderers.get(fmt)
+        if renderer is None:
+            raise OperationError(f"Unknown metrics format: {fmt}")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(renderer(), encoding='utf-8')
+        return path
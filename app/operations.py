@@ -1,16 +1,212 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+import decimal
 from decimal import Decimal, InvalidOperation
-from typing import Union, Dict, Type
+import functools
+import importlib.metadata
+import importlib.util
+import logging
+from pathlib import Path
+import sys
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
+from app.calculation import REDUCTION_OPERATIONS
+from app.decimal_context import GUARD_DIGITS, round_significant
 from app.exceptions import ValidationError
 
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy
+
 Number = Union[int, float, Decimal]
+# A scalar, a sequence of numbers, or a NumPy array.
+Operand = Union[Number, Sequence[Number], 'numpy.ndarray']
+
+CONDITIONS: Dict[str, Callable[[Decimal], bool]] = {
+    'zero': lambda x: x == 0,
+    'negative': lambda x: x < 0,
+    'even': lambda x: int(x) % 2 == 0,
+}
+
+# The same conditions over whole NumPy arrays; 'even' truncates like int().
+ARRAY_CONDITIONS: Dict[str, Callable[[Any, Any], Any]] = {
+    'zero': lambda np, x: x == 0,
+    'negative': lambda np, x: x < 0,
+    'even': lambda np, x: np.fmod(np.trunc(x), 2) == 0,
+}
+
+
+@dataclass(frozen=True)
+class ValidationRule:
+    """Declares that ``operand`` ('a' or 'b') must not meet ``condition``.
+
+    ``when`` optionally narrows the rule to items whose other operand meets
+    a second condition, e.g. negative bases only for even roots. Rules are
+    data, so a batch is checked one condition and one column at a time.
+    """
+
+    operand: str
+    condition: str
+    message: str
+    when: Optional[Tuple[str, str]] = None
+
+    def __post_init__(self):
+        for operand, condition in [(self.operand, self.condition)] + ([self.when] if self.when else []):
+            if operand not in ('a', 'b') or condition not in CONDITIONS:
+                raise ValueError(f"Invalid validation rule: {operand} {condition}")
+
+    def first_violation(self, a: Sequence[Decimal], b: Sequence[Decimal]) -> Optional[int]:
+        columns = {'a': a, 'b': b}
+        hits = map(CONDITIONS[self.condition], columns[self.operand])
+        if self.when:
+            other, condition = self.when
+            hits = map(
+                lambda hit, extra: hit and extra,
+                hits,
+                map(CONDITIONS[condition], columns[other])
+            )
+        return next((i for i, hit in enumerate(hits) if hit), None)
+
+    def first_violation_array(self, np: Any, a: Any, b: Any) -> Optional[int]:
+        """``first_violation`` for broadcast NumPy arrays, as a flat index."""
+        columns = {'a': a, 'b': b}
+        hits = ARRAY_CONDITIONS[self.condition](np, columns[self.operand])
+        if self.when:
+            other, condition = self.when
+            hits = hits & ARRAY_CONDITIONS[condition](np, columns[other])
+        found = np.flatnonzero(hits)
+        return int(found[0]) if found.size else None
+
+
+def to_decimals(values: Iterable[Number]) -> List[Decimal]:
+    return [value if type(value) is Decimal else Decimal(value) for value in values]
+
+
+def iter_decimals(values: Iterable[Number]) -> Iterable[Decimal]:
+    return (value if type(value) is Decimal else Decimal(value) for value in values)
+
+
+def is_vector(value: Any) -> bool:
+    return not isinstance(value, (str, bytes)) and hasattr(value, '__len__') and hasattr(value, '__iter__')
+
+
+def broadcast(a: Operand, b: Operand) -> Tuple[List[Number], List[Number]]:
+    """Pair up two operands, repeating a scalar to the other's length."""
+    xs = list(a) if is_vector(a) else None
+    ys = list(b) if is_vector(b) else None
+    if xs is None and ys is None:
+        return [a], [b]
+    if xs is None:
+        xs = [a] * len(ys)
+    elif ys is None:
+        ys = [b] * len(xs)
+    elif len(xs) != len(ys):
+        raise ValidationError(f"Operand vectors differ in length: {len(xs)} != {len(ys)}")
+    return xs, ys
+
+
+def is_numeric_array(value: Any) -> bool:
+    # The type is checked first: another thread (e.g. pandas on the autosave
+    # worker) may be importing numpy, and a half-imported module has no
+    # ndarray yet. An actual array means numpy finished importing.
+    if type(value).__module__ != 'numpy':
+        return False
+    ndarray = getattr(sys.modules.get('numpy'), 'ndarray', None)
+    return ndarray is not None and isinstance(value, ndarray) and value.dtype.kind in 'biuf'
+
+
+def numpy_operands(a: Operand, b: Operand) -> Optional[Tuple[Any, Any, Any]]:
+    """Return (numpy, a, b) as broadcast float arrays when NumPy inputs allow it.
+
+    The fast path applies only when a numeric NumPy array is involved and
+    the other operand is one too or a scalar; object arrays (e.g. of
+    Decimal) and plain sequences stay on the exact Decimal path. NumPy is
+    never imported here: if it is not loaded, no operand can be an array.
+    """
+    if not (is_numeric_array(a) or is_numeric_array(b)):
+        return None
+    np = sys.modules['numpy']
+
+    def scalar(value: Any) -> bool:
+        return isinstance(value, (int, float, Decimal, np.number)) and not isinstance(value, bool)
+
+    if not all(is_numeric_array(value) or scalar(value) for value in (a, b)):
+        return None
+    try:
+        xs, ys = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    except ValueError as e:
+        raise ValidationError(f"Operand shapes do not broadcast: {e}")
+    return np, xs, ys
 
 
 class Operation(ABC):
+    rules: Tuple[ValidationRule, ...] = ()
+    # Expensive operations whose results the persistent result cache keeps.
+    cacheable = False
+
     @abstractmethod
     def execute(self, a: Number, b: Number) -> Number:
         pass  # pragma: no cover
 
+    def execute_many(self, a: Iterable[Number], b: Iterable[Number]) -> List[Number]:
+        """Apply the operation item by item to two operand columns.
+
+        This default falls back to ``execute`` for each pair; operations
+        override it with a bulk implementation.
+        """
+        xs, ys = self.validate_many(a, b)
+        return [self.execute(x, y) for x, y in zip(xs, ys)]
+
+    def validate_many(
+        self, a: Iterable[Number], b: Iterable[Number]
+    ) -> Tuple[List[Decimal], List[Decimal]]:
+        """Convert both columns to Decimal and check them against ``rules``."""
+        try:
+            xs, ys = to_decimals(a), to_decimals(b)
+        except (InvalidOperation, TypeError, ValueError) as e:
+            raise ValidationError(f"Invalid operand: {e}")
+        if len(xs) != len(ys):
+            raise ValidationError(f"Operand columns differ in length: {len(xs)} != {len(ys)}")
+        for rule in self.rules:
+            index = rule.first_violation(xs, ys)
+            if index is not None:
+                raise ValidationError(f"{rule.message} (item {index})")
+        return xs, ys
+
+    def execute_vector(
+        self,
+        a: Operand,
+        b: Operand,
+        executor: Optional[Callable[['Operation', List[Number], List[Number]], List[Number]]] = None
+    ) -> Union[List[Number], 'numpy.ndarray']:
+        """Apply the operation elementwise, broadcasting a scalar against a vector.
+
+        Numeric NumPy arrays take a float64 fast path through
+        ``execute_array`` and return an array; anything else is computed
+        exactly in Decimal by ``execute_many`` (or by ``executor``, e.g.
+        ``WorkerPool.execute_many``) and returns a list. Either way
+        ``rules`` are checked across the whole vector before computing.
+        """
+        arrays = numpy_operands(a, b)
+        if arrays is not None:
+            np, xs, ys = arrays
+            for rule in self.rules:
+                index = rule.first_violation_array(np, xs, ys)
+                if index is not None:
+                    raise ValidationError(f"{rule.message} (item {index})")
+            with np.errstate(all='ignore'):
+                result = self.execute_array(np, xs, ys)
+            if result is not None:
+                if not np.isfinite(result).all() and np.isfinite(xs).all() and np.isfinite(ys).all():
+                    raise ValidationError(f"{self} result is outside the float64 range; use Decimal operands")
+                return result
+            a, b = xs.ravel().tolist(), ys.ravel().tolist()
+        if executor is not None:
+            return executor(self, *broadcast(a, b))
+        return self.execute_many(*broadcast(a, b))
+
+    def execute_array(self, np: Any, xs: Any, ys: Any) -> Any:
+        """NumPy kernel over validated float arrays; None if there is none."""
+        return None
+
     def __str__(self) -> str:
         return self.__class__.__name__
 
@@ -19,32 +215,98 @@ class Addition(Operation):
     def execute(self, a: Number, b: Number) -> Number:
         return Decimal(a) + Decimal(b)
 
+    def execute_array(self, np: Any, xs: Any, ys: Any) -> Any:
+        return np.add(xs, ys)
+
+    def execute_many(self, a: Iterable[Number], b: Iterable[Number]) -> List[Number]:
+        xs, ys = self.validate_many(a, b)
+        return [x + y for x, y in zip(xs, ys)]
+
 
 class Subtraction(Operation):
     def execute(self, a: Number, b: Number) -> Number:
         return Decimal(a) - Decimal(b)
 
+    def execute_array(self, np: Any, xs: Any, ys: Any) -> Any:
+        return np.subtract(xs, ys)
+
+    def execute_many(self, a: Iterable[Number], b: Iterable[Number]) -> List[Number]:
+        xs, ys = self.validate_many(a, b)
+        return [x - y for x, y in zip(xs, ys)]
+
 
 class Multiplication(Operation):
     def execute(self, a: Number, b: Number) -> Number:
         return Decimal(a) * Decimal(b)
 
+    def execute_array(self, np: Any, xs: Any, ys: Any) -> Any:
+        return np.multiply(xs, ys)
+
+    def execute_many(self, a: Iterable[Number], b: Iterable[Number]) -> List[Number]:
+        xs, ys = self.validate_many(a, b)
+        return [x * y for x, y in zip(xs, ys)]
+
 
 class Division(Operation):
+    rules = (ValidationRule('b', 'zero', "Division by zero is not allowed"),)
+
     def execute(self, a: Number, b: Number) -> Number:
         if Decimal(b) == 0:
             raise ValidationError("Division by zero is not allowed")
         return Decimal(a) / Decimal(b)
 
+    def execute_array(self, np: Any, xs: Any, ys: Any) -> Any:
+        return np.true_divide(xs, ys)
+
+    def execute_many(self, a: Iterable[Number], b: Iterable[Number]) -> List[Number]:
+        xs, ys = self.validate_many(a, b)
+        return [x / y for x, y in zip(xs, ys)]
+
 
 class Power(Operation):
+    rules = (ValidationRule('b', 'negative', "Negative exponents not supported"),)
+    cacheable = True
+
     def execute(self, a: Number, b: Number) -> Number:
         if Decimal(b) < 0:
             raise ValidationError("Negative exponents not supported")
         return Decimal(a) ** Decimal(b)
 
+    def execute_array(self, np: Any, xs: Any, ys: Any) -> Any:
+        return np.power(xs, ys)
+
+    def execute_many(self, a: Iterable[Number], b: Iterable[Number]) -> List[Number]:
+        xs, ys = self.validate_many(a, b)
+        return [x ** y for x, y in zip(xs, ys)]
+
 
 class Root(Operation):
+    rules = (
+        ValidationRule('b', 'zero', "Zero root is undefined"),
+        ValidationRule('a', 'negative', "Cannot calculate root of negative number", when=('b', 'even')),
+    )
+    cacheable = True
+
+    @staticmethod
+    def _digits() -> int:
+        # Results are rounded to the context precision less its guard
+        # digits, which absorb the error of the inexact 1/b exponent.
+        return max(decimal.getcontext().prec - GUARD_DIGITS, 1)
+
+    def execute_many(self, a: Iterable[Number], b: Iterable[Number]) -> List[Number]:
+        xs, ys = self.validate_many(a, b)
+        one, digits = Decimal(1), self._digits()
+        try:
+            return [round_significant(x ** (one / y), digits) for x, y in zip(xs, ys)]
+        except (ZeroDivisionError, InvalidOperation):
+            raise ValidationError("Invalid root operation")
+
+    def execute_array(self, np: Any, xs: Any, ys: Any) -> Any:
+        result = np.power(xs, 1.0 / ys)
+        if np.isnan(result).any():
+            raise ValidationError("Invalid root operation")
+        return result
+
     def execute(self, a: Number, b: Number) -> Number:
         if Decimal(b) == 0:
             raise ValidationError("Zero root is undefined")
@@ -52,12 +314,128 @@ class Root(Operation):
             raise ValidationError("Cannot calculate root of negative number")
         try:
             result = Decimal(a) ** (Decimal(1) / Decimal(b))
-            return result.quantize(Decimal('1.000000000000000000'))
+            return round_significant(result, self._digits())
         except (ZeroDivisionError, InvalidOperation):
             raise ValidationError("Invalid root operation")
 
 
+def compensated_sum(values: Iterable[Number]) -> Tuple[Decimal, int]:
+    """Sum ``values`` in one pass with Neumaier compensation; return (sum, count).
+
+    The rounding error of each addition is carried in a separate term, so
+    long sums of mixed magnitudes lose no more than a final rounding.
+    """
+    total = Decimal(0)
+    compensation = Decimal(0)
+    count = 0
+    for x in iter_decimals(values):
+        t = total + x
+        if abs(total) >= abs(x):
+            compensation += (total - t) + x
+        else:
+            compensation += (x - t) + total
+        total = t
+        count += 1
+    return total + compensation, count
+
+
+class Reduction(Operation):
+    """An n-ary operation that folds any number of values into one result.
+
+    ``reduce`` consumes its input once, so values can be streamed.
+    Reductions are not binary operations: history records them as
+    'Sum(n values)', which a two-operand entry could not be told apart
+    from, so ``execute(a, b)`` is refused.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        REDUCTION_OPERATIONS.add(cls.__name__)
+
+    @abstractmethod
+    def reduce(self, values: Iterable[Number]) -> Decimal:
+        pass  # pragma: no cover
+
+    def execute(self, a: Number, b: Number) -> Number:
+        raise ValidationError(f"{self} takes a list of values, not two operands")
+
+    def _empty(self) -> ValidationError:
+        return ValidationError(f"{self} needs at least one value")
+
+
+class Sum(Reduction):
+    def reduce(self, values: Iterable[Number]) -> Decimal:
+        total, count = compensated_sum(values)
+        if not count:
+            raise self._empty()
+        return total
+
+
+class Product(Reduction):
+    def reduce(self, values: Iterable[Number]) -> Decimal:
+        product = None
+        for x in iter_decimals(values):
+            product = x if product is None else product * x
+        if product is None:
+            raise self._empty()
+        return product
+
+
+class Mean(Reduction):
+    def reduce(self, values: Iterable[Number]) -> Decimal:
+        total, count = compensated_sum(values)
+        if not count:
+            raise self._empty()
+        return total / count
+
+
+class Minimum(Reduction):
+    def reduce(self, values: Iterable[Number]) -> Decimal:
+        result = min(iter_decimals(values), default=None)
+        if result is None:
+            raise self._empty()
+        return result
+
+
+class Maximum(Reduction):
+    def reduce(self, values: Iterable[Number]) -> Decimal:
+        result = max(iter_decimals(values), default=None)
+        if result is None:
+            raise self._empty()
+        return result
+
+
+class StandardDeviation(Reduction):
+    """Sample standard deviation, computed in one pass with Welford's method."""
+
+    def reduce(self, values: Iterable[Number]) -> Decimal:
+        count = 0
+        mean = Decimal(0)
+        squares = Decimal(0)
+        for x in iter_decimals(values):
+            count += 1
+            delta = x - mean
+            mean += delta / count
+            squares += delta * (x - mean)
+        if count < 2:
+            raise ValidationError(f"{self} needs at least two values")
+        return (squares / (count - 1)).sqrt()
+
+
 class OperationFactory:
+    """Creates operations by name.
+
+    Operations are stateless, so one shared instance per name is handed
+    out. Besides the built-ins and ``register_operation``, operations come
+    from plugins: ``<name>.py`` files in a plugin directory and the
+    ``calculator.operations`` entry-point group. Plugins are only listed
+    up front; a plugin module is imported the first time its operation is
+    used, and entry points are scanned only when a name is not otherwise
+    known.
+    """
+
+    ENTRY_POINT_GROUP = 'calculator.operations'
+
     _operations: Dict[str, Type[Operation]] = {
         'add': Addition,
         'subtract': Subtraction,
@@ -65,17 +443,162 @@ class OperationFactory:
         'divide': Division,
         'power': Power,
         'root': Root,
+        'sum': Sum,
+        'product': Product,
+        'mean': Mean,
+        'min': Minimum,
+        'max': Maximum,
+        'stddev': StandardDeviation,
     }
+    _plugins: Dict[str, Callable[[], Type[Operation]]] = {}
+    _instances: Dict[str, Operation] = {}
+    _dispatch: Dict[str, Callable[[], Operation]] = {}
+    _entry_points_scanned = False
 
     @staticmethod
     def create_operation(name: str) -> Operation:
-        operation_cls = OperationFactory._operations.get(name.lower())
-        if not operation_cls:
-            raise ValueError(f"Unknown operation: {name}")
-        return operation_cls()
+        key = name.lower()
+        instance = OperationFactory._instances.get(key)
+        if instance is None:
+            instance = OperationFactory._operation_class(key, name)()
+            OperationFactory._instances[key] = instance
+        return instance
 
     @staticmethod
     def register_operation(name: str, operation_cls: Type[Operation]) -> None:
         if not issubclass(operation_cls, Operation):
             raise TypeError("Operation class must inherit from Operation base class")
-        OperationFactory._operations[name.lower()] = operation_cls
+        key = name.lower()
+        OperationFactory._operations[key] = operation_cls
+        OperationFactory._plugins.pop(key, None)
+        OperationFactory._instances.pop(key, None)
+        OperationFactory._add_dispatch(key)
+
+    @staticmethod
+    def operation_named(display_name: str) -> Operation:
+        """Return the operation whose ``str()`` is ``display_name``, e.g. 'Addition'.
+
+        A plugin's file or entry-point name need not match its class name,
+        so when no loaded class matches, the remaining plugins are loaded
+        and searched too.
+        """
+        found = OperationFactory._loaded_named(display_name)
+        if found is not None:
+            return found
+        try:
+            return OperationFactory.create_operation(display_name)
+        except ValueError:
+            pass
+        OperationFactory._scan_entry_points()
+        for key in list(OperationFactory._plugins):
+            try:
+                OperationFactory.create_operation(key)
+            except ValueError as e:
+                logging.warning(str(e))
+        found = OperationFactory._loaded_named(display_name)
+        if found is None:
+            raise ValueError(f"Unknown operation: {display_name}")
+        return found
+
+    @staticmethod
+    def _loaded_named(display_name: str) -> Optional[Operation]:
+        for key, operation_cls in list(OperationFactory._operations.items()):
+            if operation_cls.__name__ == display_name:
+                return OperationFactory.create_operation(key)
+        return None
+
+    @staticmethod
+    def _operation_class(key: str, name: str) -> Type[Operation]:
+        operation_cls = OperationFactory._operations.get(key)
+        if operation_cls is None:
+            if key not in OperationFactory._plugins:
+                OperationFactory._scan_entry_points()
+            loader = OperationFactory._plugins.get(key)
+            if loader is None:
+                raise ValueError(f"Unknown operation: {name}")
+            try:
+                operation_cls = loader()
+            except Exception as e:
+                raise ValueError(f"Could not load operation plugin '{name}': {e}") from e
+            OperationFactory.register_operation(key, operation_cls)
+        return operation_cls
+
+    @staticmethod
+    def _add_dispatch(key: str) -> None:
+        if key not in OperationFactory._dispatch:
+            OperationFactory._dispatch[key] = functools.partial(OperationFactory.create_operation, key)
+
+    @staticmethod
+    def _add_plugin(name: str, loader: Callable[[], Type[Operation]]) -> None:
+        key = name.lower()
+        if key in OperationFactory._operations or key in OperationFactory._plugins:
+            return  # built-in and explicitly registered operations win
+        OperationFactory._plugins[key] = loader
+        OperationFactory._add_dispatch(key)
+
+    @staticmethod
+    def discover(plugin_dir: Optional[Path] = None) -> List[str]:
+        """List plugin operations in ``plugin_dir`` without importing them."""
+        found = []
+        if plugin_dir is not None and plugin_dir.is_dir():
+            for path in sorted(plugin_dir.glob('*.py')):
+                if not path.stem.startswith('_'):
+                    OperationFactory._add_plugin(path.stem, functools.partial(_load_plugin_file, path))
+                    found.append(path.stem.lower())
+        return found
+
+    @staticmethod
+    def _scan_entry_points() -> None:
+        if OperationFactory._entry_points_scanned:
+            return
+        OperationFactory._entry_points_scanned = True
+        for entry_point in importlib.metadata.entry_points(group=OperationFactory.ENTRY_POINT_GROUP):
+            OperationFactory._add_plugin(entry_point.name, entry_point.load)
+
+    @staticmethod
+    def resolve(name: str) -> Optional[Callable[[], Operation]]:
+        """Return the dispatch entry for ``name``, or None if it is unknown."""
+        key = name.lower()
+        if key not in OperationFactory._dispatch:
+            OperationFactory._scan_entry_points()
+        return OperationFactory._dispatch.get(key)
+
+    @staticmethod
+    def dispatch_table() -> Dict[str, Callable[[], Operation]]:
+        """Map every known operation name to a callable returning its instance."""
+        OperationFactory._scan_entry_points()
+        return dict(OperationFactory._dispatch)
+
+
+def _load_plugin_file(path: Path) -> Type[Operation]:
+    """Import a plugin file and return its operation class.
+
+    The class is the module's ``OPERATION`` attribute or, failing that, the
+    only Operation subclass defined in the module.
+    """
+    spec = importlib.util.spec_from_file_location(f"calculator_plugins.{path.stem}", path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot import {path}")
+    module = importlib.util.module_from_spec(spec)
+    # Modules must be in sys.modules while they run, e.g. for dataclasses.
+    sys.modules[spec.name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[spec.name]
+        raise
+    operation_cls = getattr(module, 'OPERATION', None)
+    if operation_cls is None:
+        candidates = [
+            value for value in vars(module).values()
+            if isinstance(value, type) and issubclass(value, Operation)
+            and value.__module__ == module.__name__
+        ]
+        if len(candidates) != 1:
+            raise TypeError(f"{path.name} must define OPERATION or exactly one Operation subclass")
+        operation_cls = candidates[0]
+    return operation_cls
+
+
+for _name in OperationFactory._operations:
+    OperationFactory._add_dispatch(_name)
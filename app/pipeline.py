@@ -0,0 +1,59 @@
+########################
+# Operation Pipelines  #
+########################
+
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+from app.exceptions import ValidationError
+from app.operations import Number, Operation, OperationFactory
+
+Step = Tuple[Union[str, Operation], Number]
+# Runs one step over whole columns, e.g. ``WorkerPool.execute_many``.
+Executor = Callable[[Operation, Sequence[Decimal], Sequence[Decimal]], List[Number]]
+
+
+class Pipeline:
+    """A fixed chain of operations applied to a stream of values.
+
+    Each step is an operation and its second operand; the running value is
+    the first operand. For example ``Pipeline([('multiply', 2), ('add', 1)])``
+    maps x to 2x + 1. A pipeline is resolved and converted once, then run
+    one step at a time over a whole column of values with ``execute_many``.
+    """
+
+    def __init__(self, steps: Iterable[Step]):
+        self.steps: List[Tuple[Operation, Decimal]] = []
+        for operation, operand in steps:
+            if isinstance(operation, str):
+                operation = OperationFactory.create_operation(operation)
+            elif not isinstance(operation, Operation):
+                raise TypeError(f"Pipeline steps need an Operation or operation name, got {operation!r}")
+            try:
+                self.steps.append((operation, Decimal(str(operand).strip())))
+            except InvalidOperation as e:
+                raise ValidationError(f"Invalid number format: {operand}") from e
+        if not self.steps:
+            raise ValidationError("A pipeline needs at least one step")
+
+    def run(self, values: Sequence[Decimal], executor: Optional[Executor] = None) -> List[List[Decimal]]:
+        """Return one column per stage: the inputs, then each step's results.
+
+        Steps run locally unless ``executor`` is given to run them elsewhere.
+        """
+        columns = [list(values)]
+        for index, (operation, operand) in enumerate(self.steps, 1):
+            try:
+                if executor is None:
+                    columns.append(operation.execute_many(columns[-1], [operand] * len(values)))
+                else:
+                    columns.append(executor(operation, columns[-1], [operand] * len(values)))
+            except ValidationError as e:
+                raise ValidationError(f"Pipeline step {index} ({operation}): {e}") from e
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __str__(self) -> str:
+        return " -> ".join(f"{operation}({operand})" for operation, operand in self.steps)
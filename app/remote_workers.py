@@ -0,0 +1,281 @@
+########################
+# Remote Workers       #
+########################
+
+from collections import deque
+import decimal
+from decimal import Decimal
+import json
+import logging
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.decimal_context import precision_context
+from app.exceptions import OperationError, ValidationError
+from app.operations import Number, Operation, OperationFactory
+
+# Every message is a 4-byte big-endian length followed by a UTF-8 JSON object.
+#   request: {"id": n, "operation": "Power", "prec": 33, "a": [...], "b": [...]}
+#   reply:   {"id": n, "results": [...]} or {"id": n, "error": "...", "kind": "validation"}
+# Numbers travel as decimal strings so no precision is lost on the wire.
+HEADER = struct.Struct('>I')
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+Address = Tuple[str, int]
+
+
+def parse_address(address: str) -> Address:
+    """Split 'host:port' into a (host, port) pair."""
+    host, sep, port = address.strip().rpartition(':')
+    if not sep or not host or not port.isdigit():
+        raise ValueError(f"Worker address must be host:port, got {address!r}")
+    return host, int(port)
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any]) -> None:
+    payload = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Connection closed mid-message")
+        buffer += chunk
+    return bytes(buffer)
+
+
+def recv_message(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Read one message, or return None if the peer closed between messages."""
+    first = sock.recv(1)
+    if not first:
+        return None
+    (size,) = HEADER.unpack(first + _recv_exact(sock, HEADER.size - 1))
+    if size > MAX_MESSAGE_BYTES:
+        raise ConnectionError(f"Message of {size} bytes exceeds the limit")
+    try:
+        return json.loads(_recv_exact(sock, size).decode('utf-8'))
+    except ValueError as e:
+        raise ConnectionError(f"Malformed message: {e}")
+
+
+def evaluate(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Compute one batch request and build its reply."""
+    reply: Dict[str, Any] = {'id': request.get('id')}
+    try:
+        operation = OperationFactory.operation_named(request['operation'])
+        with precision_context(int(request['prec'])):
+            results = operation.execute_many(request['a'], request['b'])
+        reply['results'] = [str(result) for result in results]
+    except ValidationError as e:
+        reply.update(error=str(e), kind='validation')
+    except Exception as e:
+        reply.update(error=str(e), kind='operation')
+    return reply
+
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        # Requests on a connection are answered in the order they arrive,
+        # so a coordinator may pipeline several before reading any reply.
+        try:
+            while True:
+                request = recv_message(self.request)
+                if request is None:
+                    return
+                send_message(self.request, evaluate(request))
+        except OSError as e:
+            logging.warning(f"Worker connection from {self.client_address} failed: {e}")
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    """Serves batch evaluation requests; one thread per coordinator connection."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Address):
+        super().__init__(address, _WorkerHandler)
+
+    @property
+    def address(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+
+class _Job:
+    """Shared state for one distributed batch: chunks still to run and their results."""
+
+    def __init__(self, chunks: int, workers: int):
+        self.pending: Deque[int] = deque(range(chunks))
+        self.results: List[Optional[List[Decimal]]] = [None] * chunks
+        self.remaining = chunks
+        self.live_workers = workers
+        self.error: Optional[Exception] = None
+        self.changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.remaining == 0 or self.error is not None
+
+    def take(self) -> Optional[int]:
+        with self.changed:
+            if self.finished or not self.pending:
+                return None
+            return self.pending.popleft()
+
+    def give_back(self, indices: Iterable[int]) -> None:
+        with self.changed:
+            self.pending.extendleft(reversed(list(indices)))
+            self.changed.notify_all()
+
+    def complete(self, index: int, values: List[Decimal]) -> None:
+        with self.changed:
+            if self.results[index] is None:
+                self.results[index] = values
+                self.remaining -= 1
+            self.changed.notify_all()
+
+    def fail(self, error: Exception) -> None:
+        with self.changed:
+            if self.error is None:
+                self.error = error
+            self.changed.notify_all()
+
+    def worker_lost(self, address: str, error: Exception) -> None:
+        with self.changed:
+            self.live_workers -= 1
+            if self.live_workers == 0 and not self.finished:
+                self.error = OperationError(f"All workers failed; last error from {address}: {error}")
+            self.changed.notify_all()
+
+    def wait_for_work(self, timeout: float) -> None:
+        with self.changed:
+            if not self.finished and not self.pending:
+                self.changed.wait(timeout)
+
+
+class WorkerPool:
+    """Coordinator that spreads ``execute_many`` batches over remote workers.
+
+    A batch is split into ``chunk_size`` slices. Each worker gets its own
+    connection and keeps up to ``max_in_flight`` slices outstanding. If a
+    worker fails, its unanswered slices go back in the queue for the other
+    workers, and it reconnects up to ``retries`` times before it is dropped.
+    Results are reassembled in input order.
+    """
+
+    def __init__(
+        self,
+        addresses: Sequence[str],
+        chunk_size: int = 256,
+        max_in_flight: int = 4,
+        timeout: float = 30.0,
+        retries: int = 2
+    ):
+        if not addresses:
+            raise ValueError("WorkerPool needs at least one worker address")
+        if chunk_size <= 0 or max_in_flight <= 0:
+            raise ValueError("chunk_size and max_in_flight must be positive")
+        self.addresses = [parse_address(address) for address in addresses]
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.retries = retries
+
+    def execute_many(self, operation: Operation, a: Iterable[Number], b: Iterable[Number]) -> List[Number]:
+        """Remote equivalent of ``operation.execute_many`` at the current decimal precision."""
+        xs, ys = operation.validate_many(a, b)
+        if len(xs) <= self.chunk_size:
+            return operation.execute_many(xs, ys)  # not worth a round trip
+
+        prec = decimal.getcontext().prec
+        starts = range(0, len(xs), self.chunk_size)
+        requests = [
+            {
+                'id': index,
+                'operation': str(operation),
+                'prec': prec,
+                'a': [str(x) for x in xs[start:start + self.chunk_size]],
+                'b': [str(y) for y in ys[start:start + self.chunk_size]],
+            }
+            for index, start in enumerate(starts)
+        ]
+        job = _Job(len(requests), len(self.addresses))
+        threads = [
+            threading.Thread(target=self._drive, args=(job, address, requests), daemon=True)
+            for address in self.addresses
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if job.error is not None:
+            raise job.error
+        logging.info(f"Distributed {operation} over {len(xs)} values in {len(requests)} chunks")
+        return [value for chunk in job.results for value in chunk]
+
+    def _drive(self, job: _Job, address: Address, requests: List[Dict[str, Any]]) -> None:
+        name = f"{address[0]}:{address[1]}"
+        failures = 0
+        while not job.finished:
+            try:
+                with socket.create_connection(address, timeout=self.timeout) as sock:
+                    self._pump(sock, job, requests)
+                return
+            except OSError as e:
+                failures += 1
+                logging.warning(f"Worker {name} failed (attempt {failures}): {e}")
+                if failures > self.retries:
+                    job.worker_lost(name, e)
+                    return
+                time.sleep(min(0.05 * 2 ** failures, 1.0))
+
+    def _pump(self, sock: socket.socket, job: _Job, requests: List[Dict[str, Any]]) -> None:
+        in_flight: Deque[int] = deque()
+        try:
+            while not job.finished:
+                while len(in_flight) < self.max_in_flight:
+                    index = job.take()
+                    if index is None:
+                        break
+                    in_flight.append(index)
+                    send_message(sock, requests[index])
+                if not in_flight:
+                    # Nothing left to send, but another worker may fail and
+                    # hand its slices back.
+                    job.wait_for_work(0.05)
+                    continue
+
+                reply = recv_message(sock)
+                if reply is None:
+                    raise ConnectionError("Worker closed the connection")
+                index = in_flight.popleft()
+                if reply.get('id') != index:
+                    raise ConnectionError(f"Expected reply {index}, got {reply.get('id')}")
+                if 'error' in reply:
+                    error_type = ValidationError if reply.get('kind') == 'validation' else OperationError
+                    job.fail(error_type(reply['error']))
+                    return
+                job.complete(index, [Decimal(value) for value in reply['results']])
+        except BaseException:
+            job.give_back(in_flight)
+            raise
+
+
+def serve_worker(host: str = '127.0.0.1', port: int = 0) -> None:
+    """Run a worker until interrupted, announcing its address on stdout."""
+    with WorkerServer((host, port)) as server:
+        print(f"Worker listening on {server.address}", flush=True)
+        logging.info(f"Worker listening on {server.address}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
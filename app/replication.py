@@ -0,0 +1,275 @@
+########################
+# History Replication  #
+########################
+
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, TextIO, Tuple
+
+from app.calculation import Calculation
+from app.decimal_context import precision_context
+from app.exceptions import OperationError
+from app.history_storage import Record, read_tail_lines
+
+if TYPE_CHECKING:  # pragma: no cover
+    from app.calculator import Calculator
+
+Event = Dict[str, Any]
+EVENT_TYPES = ('append', 'evict', 'clear', 'undo', 'redo', 'reset')
+
+
+def history_edit(before: List[Calculation], after: List[Calculation]) -> Dict[str, Any]:
+    """Describe how ``after`` differs from ``before`` at either end.
+
+    History only ever changes at its ends (appends at the tail, evictions
+    at the head), so any undo or redo keeps one contiguous run of entries
+    and replaces what lies around it.
+    """
+    positions = {id(calc): index for index, calc in enumerate(before)}
+    kept = [index for index, calc in enumerate(after) if id(calc) in positions]
+    if not kept:
+        return {
+            'drop_head': len(before),
+            'head': [],
+            'drop_tail': 0,
+            'tail': [calc.to_dict() for calc in after],
+        }
+    first, last = kept[0], kept[-1]
+    return {
+        'drop_head': positions[id(after[first])],
+        'head': [calc.to_dict() for calc in after[:first]],
+        'drop_tail': len(before) - positions[id(after[last])] - 1,
+        'tail': [calc.to_dict() for calc in after[last + 1:]],
+    }
+
+
+def _entries(records: List[Record]) -> List[Calculation]:
+    # The primary already computed these results, so they are not recomputed.
+    return [Calculation.from_dict(record, recompute=False) for record in records]
+
+
+def apply_event(history: List[Calculation], event: Event) -> List[Calculation]:
+    """Return ``history`` with one replication event applied."""
+    kind = event['type']
+    if kind == 'append':
+        return history + _entries(event['calcs'])
+    if kind == 'evict':
+        return history[event['count']:]
+    if kind == 'clear':
+        return []
+    if kind == 'reset':
+        return _entries(event['calcs'])
+    if kind in ('undo', 'redo'):
+        kept = history[event['drop_head']:len(history) - event['drop_tail']]
+        return _entries(event['head']) + kept + _entries(event['tail'])
+    raise ValueError(f"Unknown replication event: {kind}")
+
+
+def stored_edit(
+    before: List[Calculation], after: List[Calculation], event: Event
+) -> Tuple[List[Calculation], List[Calculation]]:
+    """Return the (removed, added) stored rows for one event applied to ``before``.
+
+    As on the primary, evictions only leave memory, so their rows stay
+    stored. A reset replaces the window's rows, and any stored copies of
+    its entries (see ``Calculator.restore``).
+    """
+    kind = event['type']
+    if kind == 'append':
+        return [], after[len(before):]
+    if kind == 'reset':
+        return before + after, after
+    if kind in ('undo', 'redo'):
+        return before[len(before) - event['drop_tail']:], after[len(after) - len(event['tail']):]
+    return [], []
+
+
+def _last_event(path: Path) -> Optional[Event]:
+    if not path.exists() or path.stat().st_size == 0:
+        return None
+    first, tail = read_tail_lines(path, 1)
+    line = tail[-1] if tail else first
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None  # a partly written line; the writer is still appending
+
+
+class ReplicationLog:
+    """Primary side: an append-only JSONL file of history events.
+
+    Each line is one event with a sequence number and the primary's wall
+    clock time. Followers read the file from a shared directory. Once the
+    file outgrows ``max_bytes`` it can be ``compact``ed into one event.
+    """
+
+    def __init__(self, path: Path, encoding: str = 'utf-8', max_bytes: int = 1024 * 1024):
+        self.path = path
+        self.encoding = encoding
+        self.max_bytes = max_bytes
+        last = _last_event(path)
+        self.seq = last['seq'] if last else 0
+        self.size = path.stat().st_size if path.exists() else 0
+        self._file: Optional[TextIO] = None
+        self._lock = threading.Lock()
+
+    @property
+    def oversized(self) -> bool:
+        return self.size > self.max_bytes
+
+    def _line(self, kind: str, data: Dict[str, Any]) -> str:
+        self.seq += 1
+        event = {'seq': self.seq, 'time': time.time(), 'type': kind, **data}
+        return json.dumps(event) + '\n'
+
+    def publish(self, kind: str, **data: Any) -> None:
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a', encoding=self.encoding)
+            line = self._line(kind, data)
+            self._file.write(line)
+            self._file.flush()
+            self.size += len(line.encode(self.encoding))
+
+    def compact(self, calcs: List[Record]) -> None:
+        """Replace the log with one 'reset' event holding ``calcs``.
+
+        The new file is renamed over the old one, so followers notice the
+        change of file and read it from the start.
+        """
+        with self._lock:
+            self._close()
+            line = self._line('reset', {'calcs': calcs})
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.path.with_name(self.path.name + '.tmp')
+            temp.write_text(line, encoding=self.encoding)
+            os.replace(temp, self.path)
+            self.size = len(line.encode(self.encoding))
+        logging.info(f"Compacted replication log {self.path} at event {self.seq}")
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+class ReplicationFollower:
+    """Standby side: tails a primary's replication log into a calculator.
+
+    ``poll`` applies every complete event written since the last poll;
+    ``start`` does so on a background thread every ``poll_interval`` seconds.
+    """
+
+    def __init__(self, calculator: 'Calculator', path: Path, poll_interval: float = 0.1):
+        self.calculator = calculator
+        self.path = path
+        self.poll_interval = poll_interval
+        self.offset = 0
+        self._file_id: Optional[Tuple[int, int]] = None
+        self.applied_seq = 0
+        self.applied_time: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def poll(self) -> int:
+        """Apply new events; return how many were applied.
+
+        An event that cannot be read or applied is skipped with a warning,
+        so one bad line never stalls the follower.
+        """
+        with self._lock:
+            if not self.path.exists():
+                return 0
+            with open(self.path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                file_id = (stat.st_dev, stat.st_ino)
+                if file_id != self._file_id or stat.st_size < self.offset:
+                    # A new (compacted) log: its first event resets the history.
+                    self._file_id = file_id
+                    self.offset = 0
+                f.seek(self.offset)
+                data = f.read()
+            complete = data[:data.rfind(b'\n') + 1]
+            if not complete:
+                return 0
+
+            history = list(self.calculator.history)
+            added: List[Calculation] = []
+            removed: List[Calculation] = []
+            cleared = False
+            applied = 0
+            offset = self.offset
+            with precision_context(self.calculator.decimal_precision):
+                for line in complete.splitlines(keepends=True):
+                    position, offset = offset, offset + len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        event = json.loads(line.decode(self.calculator.config.default_encoding))
+                        after = apply_event(history, event)
+                        dropped, new = stored_edit(history, after, event)
+                        seq, when = event['seq'], event['time']
+                    except (ValueError, KeyError, TypeError, OperationError) as e:
+                        logging.warning(f"Skipping unreadable replication event at byte {position}: {e}")
+                        continue
+                    if event['type'] == 'clear':
+                        cleared, added, removed = True, [], []
+                    new_ids = {id(calc) for calc in added}
+                    removed.extend(calc for calc in dropped if id(calc) not in new_ids)
+                    dropped_ids = {id(calc) for calc in dropped}
+                    added = [calc for calc in added if id(calc) not in dropped_ids] + new
+                    history = after
+                    self.applied_seq, self.applied_time = seq, when
+                    applied += 1
+            self.offset = offset
+            if not applied:
+                return 0
+            self.calculator.replace_history(history, added=added, removed=removed, cleared=cleared)
+            logging.info(f"Applied {applied} replicated events up to {self.applied_seq}")
+            return applied
+
+    def lag(self) -> Dict[str, Any]:
+        """How far this follower is behind the primary, in events and seconds."""
+        last = _last_event(self.path)
+        primary_seq = last['seq'] if last else 0
+        behind = max(primary_seq - self.applied_seq, 0)
+        seconds = 0.0
+        if behind and last is not None:
+            seconds = max(last['time'] - (self.applied_time or last['time']), 0.0)
+        return {
+            'role': 'follower',
+            'applied_seq': self.applied_seq,
+            'primary_seq': primary_seq,
+            'events_behind': behind,
+            'seconds_behind': seconds,
+        }
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="replication-follower", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logging.error(f"Replication poll failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
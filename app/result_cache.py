@@ -0,0 +1,175 @@
+########################
+# Result Cache         #
+########################
+
+from dataclasses import asdict, dataclass
+import decimal
+from decimal import Decimal
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Rough per-row overhead of the key index and row header, in bytes.
+ROW_OVERHEAD = 32
+# Touches of cached rows are written in batches rather than on every hit.
+TOUCH_BATCH = 256
+
+
+def canonical(value: Decimal) -> str:
+    """Operand text that is equal for equal values, e.g. 2.50 and 2.5."""
+    if not value.is_finite():
+        return str(value)
+    # A context as wide as the value itself, so normalizing never rounds.
+    context = decimal.Context(
+        prec=max(len(value.as_tuple().digits), 1), Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN
+    )
+    return str(value.normalize(context))
+
+
+def cache_key(operation: str, a: Decimal, b: Decimal, prec: int) -> str:
+    return f"{operation}|{canonical(a)}|{canonical(b)}|{prec}"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResultCache:
+    """Persistent (operation, operands, precision) -> result cache in SQLite.
+
+    The file is opened on first use, and lookups go through its primary-key
+    index, so nothing is read up front. When the stored bytes exceed
+    ``max_bytes``, the least recently used entries are evicted until the
+    cache is back under 90% of the limit.
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS results ("
+        " key TEXT PRIMARY KEY,"
+        " result TEXT NOT NULL,"
+        " size INTEGER NOT NULL,"
+        " last_used REAL NOT NULL) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS idx_results_last_used ON results (last_used)",
+    )
+
+    def __init__(self, path: Path, max_bytes: int = 16 * 1024 * 1024, timeout: float = 10.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.stats = CacheStats()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._bytes = 0
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.path),
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+            self._bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def get(self, operation: str, a: Decimal, b: Decimal, prec: int) -> Optional[Decimal]:
+        key = cache_key(operation, a, b, prec)
+        with self._lock:
+            row = self.connection.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH:
+                self._flush_touches()
+            return Decimal(row[0])
+
+    def put(self, operation: str, a: Decimal, b: Decimal, prec: int, result: Decimal) -> None:
+        key = cache_key(operation, a, b, prec)
+        text = str(result)
+        size = len(key) + len(text) + ROW_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            conn = self.connection
+            previous = conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, result, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, text, size, time.time())
+            )
+            self._bytes += size - (previous[0] if previous else 0)
+            self.stats.stores += 1
+            if self._bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+
+    def _flush_touches(self) -> None:
+        if self._touched:
+            self.connection.executemany(
+                "UPDATE results SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self, target_bytes: int) -> None:
+        conn = self.connection
+        self._flush_touches()
+        conn.execute("BEGIN IMMEDIATE")
+        victims, freed = [], 0
+        try:
+            for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_used"):
+                if self._bytes - freed <= target_bytes:
+                    break
+                victims.append((key,))
+                freed += size
+            conn.executemany("DELETE FROM results WHERE key = ?", victims)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        self._bytes -= freed
+        self.stats.evictions += len(victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.connection.execute("DELETE FROM results")
+            self._touched.clear()
+            self._bytes = 0
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return {
+                **asdict(self.stats),
+                'hit_rate': self.stats.hit_rate,
+                'entries': entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'path': str(self.path),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._flush_touches()
+                self._conn.close()
+                self._conn = None
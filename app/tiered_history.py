@@ -0,0 +1,169 @@
+########################
+# Tiered History       #
+########################
+
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import sys
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+from app.calculation import Calculation
+from app.exceptions import OperationError
+from app.history_storage import Record
+
+_SEGMENT_NAME = re.compile(r'^segment-(\d{12})-(\d{6})\.jsonl\.gz$')
+
+
+def estimate_size(calc: Calculation) -> int:
+    """Approximate the bytes a Calculation keeps alive in memory."""
+    return (
+        sys.getsizeof(calc)
+        + sys.getsizeof(calc.__dict__)
+        + sys.getsizeof(calc.operation)
+        + _value_size(calc.operand1)
+        + _value_size(calc.operand2)
+        + _value_size(calc.result)
+        + sys.getsizeof(calc.timestamp)
+    )
+
+
+def _value_size(value: object) -> int:
+    # Vector operands and results (tuples of Decimal) count their items too.
+    size = sys.getsizeof(value)
+    if isinstance(value, tuple):
+        size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+class SegmentStore:
+    """Cold tier: calculations spilled out of memory into gzip'd segment files.
+
+    Segments are immutable JSON-lines files named after the global index
+    of their first record and their record count, so range reads open
+    only the segments that overlap the requested range. Spilled records
+    are buffered until ``segment_size`` of them can be sealed together.
+    """
+
+    def __init__(self, directory: Path, segment_size: int = 1000, encoding: str = 'utf-8'):
+        if segment_size <= 0:
+            raise OperationError("segment_size must be positive")
+        self.directory = directory
+        self.segment_size = segment_size
+        self.encoding = encoding
+        self._segments: Optional[List[Tuple[int, int, Path]]] = None
+        self._buffer: List[Record] = []
+        self._lock = threading.RLock()
+
+    @property
+    def segments(self) -> List[Tuple[int, int, Path]]:
+        """Sealed segments as (first index, count, path), scanned lazily."""
+        if self._segments is None:
+            found = []
+            if self.directory.exists():
+                for path in self.directory.iterdir():
+                    match = _SEGMENT_NAME.match(path.name)
+                    if match:
+                        found.append((int(match.group(1)), int(match.group(2)), path))
+            self._segments = sorted(found)
+        return self._segments
+
+    @property
+    def sealed_count(self) -> int:
+        segments = self.segments
+        if not segments:
+            return 0
+        start, count, _ = segments[-1]
+        return start + count
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.sealed_count + len(self._buffer)
+
+    def append(self, calculations: List[Calculation]) -> None:
+        with self._lock:
+            self._buffer.extend(calc.to_dict() for calc in calculations)
+            while len(self._buffer) >= self.segment_size:
+                self._write_segment(self._buffer[:self.segment_size])
+                del self._buffer[:self.segment_size]
+
+    def flush(self) -> None:
+        """Seal every buffered record into segment files."""
+        with self._lock:
+            while self._buffer:
+                records = self._buffer[:self.segment_size]
+                self._write_segment(records)
+                del self._buffer[:len(records)]
+
+    def _write_segment(self, records: List[Record]) -> None:
+        start = self.sealed_count
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"segment-{start:012d}-{len(records):06d}.jsonl.gz"
+        tmp_path = path.with_name(path.name + '.tmp')
+        payload = ''.join(json.dumps(record) + '\n' for record in records)
+        with gzip.open(tmp_path, 'wt', encoding=self.encoding) as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        self.segments.append((start, len(records), path))
+        logging.info(f"Spilled {len(records)} calculations to {path.name}")
+
+    def _read_segment(self, path: Path) -> List[Record]:
+        with gzip.open(path, 'rt', encoding=self.encoding) as f:
+            return [json.loads(line) for line in f]
+
+    def last_record(self) -> Optional[Record]:
+        """The most recently spilled record, or None if nothing was spilled."""
+        with self._lock:
+            if self._buffer:
+                return self._buffer[-1]
+            if not self.segments:
+                return None
+            path = self.segments[-1][2]
+        return self._read_segment(path)[-1]
+
+    def iter_records(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        chunk_size: int = 1000
+    ) -> Iterator[List[Record]]:
+        """Yield records with global index in [start, stop), one chunk at a time."""
+        if chunk_size <= 0:
+            raise OperationError("chunk_size must be positive")
+        with self._lock:
+            segments = list(self.segments)
+            buffered = list(self._buffer)
+            sealed = self.sealed_count
+        stop = sealed + len(buffered) if stop is None else stop
+
+        chunk: List[Record] = []
+        for first, count, path in segments + [(sealed, len(buffered), None)]:
+            if first + count <= start or first >= stop or count == 0:
+                continue
+            records = buffered if path is None else self._read_segment(path)
+            lo = max(start - first, 0)
+            hi = min(stop - first, count)
+            for record in records[lo:hi]:
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def iter_range(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Calculation]:
+        for chunk in self.iter_records(start, stop):
+            for record in chunk:
+                yield Calculation.from_dict(record)
+
+    def clear(self) -> None:
+        """Delete every segment and drop buffered records."""
+        with self._lock:
+            for _, _, path in self.segments:
+                path.unlink(missing_ok=True)
+            self._segments = []
+            self._buffer = []
@@ -0,0 +1,207 @@
+########################
+# Undo/Redo Journal    #
+########################
+
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Any, Dict, List, Optional, TextIO
+
+from app.calculation import Calculation
+from app.exceptions import OperationError
+
+Delta = Dict[str, Any]
+STACKS = ('undo', 'redo')
+
+
+def make_delta(appended: List[Calculation], evicted: List[Calculation]) -> Delta:
+    """Describe one history step: the appended calculations and what they evicted."""
+    return {
+        'calcs': [calc.to_dict() for calc in appended],
+        'evicted': [calc.to_dict() for calc in evicted],
+    }
+
+
+def delta_between(older: List[Calculation], newer: List[Calculation]) -> Delta:
+    """Rebuild the delta of a single step from the histories on either side of it."""
+    older_ids = {id(calc) for calc in older}
+    newer_ids = {id(calc) for calc in newer}
+    return make_delta(
+        [calc for calc in newer if id(calc) not in older_ids],
+        [calc for calc in older if id(calc) not in newer_ids]
+    )
+
+
+class UndoJournal:
+    """Session-persistent undo/redo stacks stored as an append-only log of deltas.
+
+    Every push, pop and clear is appended to the file as it happens, but
+    the file is only replayed when a caller needs a delta that is not held
+    in memory, e.g. when undoing past the in-memory window or into a
+    previous session. Stacks hold at most ``max_depth`` deltas, and the
+    file is compacted once more than ``compact_slack`` entries were
+    appended, so it does not grow across sessions.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        encoding: str = 'utf-8',
+        compact_slack: int = 64,
+        max_depth: Optional[int] = None
+    ):
+        self.path = path
+        self.encoding = encoding
+        self.compact_slack = compact_slack
+        self.max_depth = max_depth
+        self._file: Optional[TextIO] = None
+        self._stacks: Optional[Dict[str, List[Delta]]] = None
+        self._entries = 0  # journal lines, known once loaded
+        self._appended = 0  # lines appended since the last compaction check
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._stacks is not None
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding=self.encoding)
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+        self._entries += 1
+        self._appended += 1
+
+    def _trim(self, stacks: Dict[str, List[Delta]], stack: str) -> None:
+        if self.max_depth is not None and len(stacks[stack]) > self.max_depth:
+            del stacks[stack][:-self.max_depth]
+
+    def _maybe_compact(self, force: bool = False) -> None:
+        # Checked only every compact_slack appends, as it replays the journal.
+        if not force and self._appended <= self.compact_slack:
+            return
+        self._appended = 0
+        try:
+            stacks = self.load()
+            live = sum(len(entries) for entries in stacks.values())
+            if self._entries > 2 * live + self.compact_slack:
+                self.compact()
+        except (OSError, OperationError) as e:
+            logging.warning(f"Could not compact undo journal: {e}")
+
+    def record(self, delta: Delta) -> None:
+        """Record a new calculation: push its delta for undo and drop the redo stack."""
+        with self._lock:
+            self._write({'op': 'step', 'delta': delta})
+            if self._stacks is not None:
+                self._stacks['undo'].append(delta)
+                self._stacks['redo'] = []
+                self._trim(self._stacks, 'undo')
+            self._maybe_compact()
+
+    def push(self, stack: str, delta: Delta) -> None:
+        with self._lock:
+            self._write({'op': 'push', 'stack': stack, 'delta': delta})
+            if self._stacks is not None:
+                self._stacks[stack].append(delta)
+                self._trim(self._stacks, stack)
+            self._maybe_compact()
+
+    def drop(self, stack: str) -> None:
+        """Record a pop whose delta the caller already has in memory."""
+        with self._lock:
+            self._write({'op': 'pop', 'stack': stack})
+            if self._stacks is not None and self._stacks[stack]:
+                self._stacks[stack].pop()
+
+    def pop(self, stack: str) -> Optional[Delta]:
+        """Pop and return the top delta, replaying the journal if needed."""
+        with self._lock:
+            stacks = self.load()
+            if not stacks[stack]:
+                return None
+            self._write({'op': 'pop', 'stack': stack})
+            return stacks[stack].pop()
+
+    def depth(self, stack: str) -> int:
+        with self._lock:
+            return len(self.load()[stack])
+
+    def clear(self, stack: Optional[str] = None) -> None:
+        with self._lock:
+            self._write({'op': 'clear', 'stack': stack})
+            if self._stacks is not None:
+                for name in ([stack] if stack else STACKS):
+                    self._stacks[name] = []
+
+    def load(self) -> Dict[str, List[Delta]]:
+        """Replay the journal into in-memory stacks (once)."""
+        with self._lock:
+            if self._stacks is not None:
+                return self._stacks
+            stacks: Dict[str, List[Delta]] = {name: [] for name in STACKS}
+            operations = 0
+            if self.path.exists():
+                try:
+                    with open(self.path, encoding=self.encoding) as f:
+                        for line in f:
+                            if not line.strip():
+                                continue
+                            entry = json.loads(line)
+                            operations += 1
+                            self._replay(stacks, entry)
+                except (OSError, ValueError, KeyError) as e:
+                    raise OperationError(f"Failed to read undo journal: {e}")
+            self._stacks = stacks
+            self._entries = operations
+            live = sum(len(entries) for entries in stacks.values())
+            if operations > 2 * live + self.compact_slack:
+                self.compact()
+            logging.info(f"Loaded undo journal with {live} steps from {self.path}")
+            return stacks
+
+    def _replay(self, stacks: Dict[str, List[Delta]], entry: Dict[str, Any]) -> None:
+        op, stack = entry['op'], entry.get('stack')
+        if op == 'step':
+            stacks['undo'].append(entry['delta'])
+            stacks['redo'] = []
+            self._trim(stacks, 'undo')
+        elif op == 'push':
+            stacks[stack].append(entry['delta'])
+            self._trim(stacks, stack)
+        elif op == 'pop':
+            if stacks[stack]:
+                stacks[stack].pop()
+        elif op == 'clear':
+            for name in ([stack] if stack else STACKS):
+                stacks[name] = []
+
+    def compact(self) -> None:
+        """Rewrite the journal so it holds only the live stack entries."""
+        with self._lock:
+            stacks = self.load()
+            self._close_file()
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding=self.encoding) as f:
+                for name in STACKS:
+                    for delta in stacks[name]:
+                        f.write(json.dumps({'op': 'push', 'stack': name, 'delta': delta}) + '\n')
+            os.replace(tmp_path, self.path)
+            self._entries = sum(len(entries) for entries in stacks.values())
+            self._appended = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._appended:
+                # Small sessions add up, so check whatever this one appended.
+                self._maybe_compact(force=True)
+            self._close_file()
+
+    def _close_file(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
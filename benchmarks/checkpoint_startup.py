@@ -0,0 +1,81 @@
+"""Startup benchmark: loading history from CSV versus restoring a checkpoint.
+
+For each history size, saves the same session both as the CSV history
+file and as a checkpoint, then times a fresh start from each.
+
+    python -m benchmarks.checkpoint_startup --sizes 1000 10000 100000
+"""
+
+import argparse
+from decimal import Decimal
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import List
+
+
+def run(size: int) -> dict:
+    from app.calculation import Calculation
+    from app.calculator import Calculator
+    from app.calculator_config import CalculatorConfig
+    from app.operations import OperationFactory
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp)
+        config = CalculatorConfig(base_dir=base_dir, max_history_size=size, auto_save=False)
+        calc = Calculator(config)
+        calc.set_operation(OperationFactory.create_operation('multiply'))
+        calc.history = [
+            Calculation(operation='Multiplication', operand1=Decimal(i), operand2=Decimal('1.5'))
+            for i in range(size)
+        ]
+        calc.save_history()
+        checkpoint = calc.checkpoint(base_dir / 'session.ckpt')
+        calc.close()
+
+        start = time.perf_counter()
+        from_csv = Calculator(config)
+        csv_seconds = time.perf_counter() - start
+        csv_rows = len(from_csv.history)
+        from_csv.close()
+
+        # A separate base directory has no CSV, so only the checkpoint is read.
+        empty = CalculatorConfig(base_dir=base_dir / 'empty', max_history_size=size, auto_save=False)
+        start = time.perf_counter()
+        restored = Calculator(empty)
+        restored.restore(checkpoint)
+        restore_seconds = time.perf_counter() - start
+        restored_rows = len(restored.history)
+        restored.close()
+
+        return {
+            'size': size,
+            'csv_rows': csv_rows,
+            'restored_rows': restored_rows,
+            'csv_seconds': csv_seconds,
+            'restore_seconds': restore_seconds,
+            'checkpoint_bytes': checkpoint.stat().st_size,
+        }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args(argv)
+
+    print(f"{'size':>8} {'csv s':>8} {'restore s':>10} {'speedup':>8} {'ckpt KiB':>9}")
+    failed = False
+    for size in args.sizes:
+        result = run(size)
+        failed = failed or result['csv_rows'] != result['restored_rows']
+        speedup = result['csv_seconds'] / result['restore_seconds'] if result['restore_seconds'] else 0
+        print(
+            f"{result['size']:>8} {result['csv_seconds']:>8.3f} {result['restore_seconds']:>10.3f} "
+            f"{speedup:>7.1f}x {result['checkpoint_bytes'] / 1024:>9.0f}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
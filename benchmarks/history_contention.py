@@ -0,0 +1,93 @@
+"""Contention benchmark for the shared (multi-process) history mode.
+
+Starts 1-16 writer processes that each record calculations against the
+same history file, saving after every calculation, and checks that no
+update is lost.
+
+    python -m benchmarks.history_contention --writes 200 --writers 1 2 4 8 16
+"""
+
+import argparse
+import csv
+import multiprocessing
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import List
+
+
+def _writer(base_dir: str, writer_id: int, writes: int, start_event) -> float:
+    from app.calculator import Calculator
+    from app.calculator_config import CalculatorConfig
+    from app.operations import OperationFactory
+
+    config = CalculatorConfig(
+        base_dir=Path(base_dir),
+        auto_save=False,
+        history_mode='shared',
+        observer_dispatch='sync'
+    )
+    calc = Calculator(config)
+    calc.set_operation(OperationFactory.create_operation('add'))
+    start_event.wait()
+    start = time.perf_counter()
+    for i in range(writes):
+        calc.perform_operation(writer_id, i)
+        calc.save_history()
+    return time.perf_counter() - start
+
+
+def run(writers: int, writes: int) -> dict:
+    with tempfile.TemporaryDirectory() as base_dir:
+        ctx = multiprocessing.get_context('spawn')
+        manager = ctx.Manager()
+        start_event = manager.Event()
+        with ctx.Pool(writers) as pool:
+            results = [
+                pool.apply_async(_writer, (base_dir, writer_id, writes, start_event))
+                for writer_id in range(writers)
+            ]
+            time.sleep(0.2)
+            wall_start = time.perf_counter()
+            start_event.set()
+            elapsed = [r.get() for r in results]
+            wall = time.perf_counter() - wall_start
+        manager.shutdown()
+
+        history_file = Path(base_dir) / 'history' / 'calculator_history.csv'
+        with open(history_file, newline='') as f:
+            rows = list(csv.DictReader(f))
+
+    expected = writers * writes
+    return {
+        'writers': writers,
+        'rows': len(rows),
+        'expected': expected,
+        'lost': expected - len(rows),
+        'wall_seconds': wall,
+        'writes_per_second': expected / wall if wall else float('inf'),
+        'slowest_writer_seconds': max(elapsed),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--writes', type=int, default=200, help='calculations per writer')
+    args = parser.parse_args(argv)
+
+    print(f"{'writers':>7} {'rows':>8} {'lost':>5} {'wall s':>8} {'writes/s':>10}")
+    failed = False
+    for writers in args.writers:
+        result = run(writers, args.writes)
+        failed = failed or result['lost'] != 0
+        print(
+            f"{result['writers']:>7} {result['rows']:>8} {result['lost']:>5} "
+            f"{result['wall_seconds']:>8.3f} {result['writes_per_second']:>10.0f}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
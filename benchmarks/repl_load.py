@@ -0,0 +1,219 @@
+"""End-to-end load harness for the interactive REPL.
+
+Feeds the real ``calculator_repl`` loop a generated stream of commands
+(operations, history, undo/redo, save/load) through a scripted ``input``,
+with autosave on and history files in a temporary directory. Reports the
+per-command latency distribution and peak RSS, and exits non-zero when a
+configured threshold is exceeded. ``--history-rows`` seeds the history
+file first, so startup, load and save run against a realistic history.
+
+    python -m benchmarks.repl_load --commands 20000 --history-size 10000 --history-rows 100000 --max-p99-ms 20
+"""
+
+import argparse
+from collections import defaultdict
+from contextlib import redirect_stdout
+import csv
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+OPERATIONS = ['add', 'subtract', 'multiply', 'divide', 'power', 'root']
+COMMAND_WEIGHTS = {
+    'operation': 80,
+    'undo': 7,
+    'redo': 5,
+    'history': 4,
+    'save': 3,
+    'load': 1,
+}
+
+
+def generate_commands(count: int, seed: int = 0) -> List[str]:
+    """Build a reproducible command stream of ``count`` commands plus 'exit'."""
+    rng = random.Random(seed)
+    kinds = list(COMMAND_WEIGHTS)
+    weights = list(COMMAND_WEIGHTS.values())
+    commands = []
+    for kind in rng.choices(kinds, weights, k=count):
+        if kind != 'operation':
+            commands.append(kind)
+            continue
+        operation = rng.choice(OPERATIONS)
+        a = rng.randint(0, 10_000)
+        if operation == 'power':
+            b = rng.randint(0, 4)
+        elif operation == 'root':
+            b = rng.randint(1, 5)
+        else:
+            b = rng.randint(1, 10_000)
+        commands.append(f"{operation} {a} {b}")
+    commands.append('exit')
+    return commands
+
+
+def seed_history(path: str, rows: int, seed: int = 0) -> None:
+    """Write ``rows`` stored additions to the history CSV at ``path``."""
+    from app.history_storage import HISTORY_COLUMNS
+
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(HISTORY_COLUMNS)
+        for i in range(rows):
+            a, b = rng.randint(0, 10_000), rng.randint(0, 10_000)
+            timestamp = (start + datetime.timedelta(seconds=i)).isoformat()
+            writer.writerow(['Addition', a, b, a + b, timestamp])
+
+
+class ScriptedInput:
+    """Replacement for ``input`` that replays commands and timestamps each read."""
+
+    def __init__(self, commands: List[str]):
+        self.commands = commands
+        self.position = 0
+        self.read_at: List[float] = []
+
+    def __call__(self, prompt: str = '') -> str:
+        self.read_at.append(time.perf_counter())
+        if self.position >= len(self.commands):
+            raise EOFError
+        command = self.commands[self.position]
+        self.position += 1
+        return command
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None  # pragma: no cover
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run(
+    commands: List[str],
+    history_size: int = 10_000,
+    observer_dispatch: str = 'async',
+    history_rows: int = 0
+) -> Dict:
+    """Run the REPL over ``commands`` and return latency and memory statistics."""
+    from app.calculator_repl import calculator_repl
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if history_rows:
+            seed_history(os.path.join(tmp, 'history', 'calculator_history.csv'), history_rows)
+        env = {
+            'CALCULATOR_HISTORY_DIR': os.path.join(tmp, 'history'),
+            'CALCULATOR_LOG_DIR': os.path.join(tmp, 'logs'),
+            'CALCULATOR_AUTO_SAVE': 'true',
+            'CALCULATOR_MAX_HISTORY_SIZE': str(history_size),
+            'CALCULATOR_OBSERVER_DISPATCH': observer_dispatch,
+        }
+        scripted = ScriptedInput(commands)
+        with patch.dict(os.environ, env), patch('builtins.input', scripted), \
+                open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            start = time.perf_counter()
+            calculator_repl()
+            end = time.perf_counter()
+
+    # A command's latency is the time from reading it to reading the next.
+    boundaries = scripted.read_at[:scripted.position] + [end]
+    by_kind: Dict[str, List[float]] = defaultdict(list)
+    latencies = []
+    for command, begin, finish in zip(commands, boundaries, boundaries[1:]):
+        elapsed_ms = (finish - begin) * 1000
+        latencies.append(elapsed_ms)
+        by_kind[command.split()[0]].append(elapsed_ms)
+
+    latencies.sort()
+    return {
+        'commands': len(latencies),
+        'wall_seconds': end - start,
+        # Setup up to the first prompt, including loading the seeded history.
+        'startup_ms': ((scripted.read_at[0] if scripted.read_at else end) - start) * 1000,
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'max_ms': latencies[-1] if latencies else 0.0,
+        'by_command': {
+            kind: {
+                'count': len(values),
+                'p50_ms': percentile(sorted(values), 0.50),
+                'p99_ms': percentile(sorted(values), 0.99),
+            }
+            for kind, values in sorted(by_kind.items())
+        },
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def check_thresholds(
+    result: Dict,
+    max_p99_ms: Optional[float] = None,
+    max_rss_mb: Optional[float] = None
+) -> List[str]:
+    """Return a description of every threshold the run exceeded."""
+    failures = []
+    if max_p99_ms is not None and result['p99_ms'] > max_p99_ms:
+        failures.append(f"p99 latency {result['p99_ms']:.2f} ms > {max_p99_ms} ms")
+    rss = result['peak_rss_mb']
+    if max_rss_mb is not None and rss is not None and rss > max_rss_mb:
+        failures.append(f"peak RSS {rss:.1f} MiB > {max_rss_mb} MiB")
+    return failures
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--commands', type=int, default=20_000)
+    parser.add_argument('--history-size', type=int, default=10_000)
+    parser.add_argument('--history-rows', type=int, default=0,
+                        help='rows written to the history file before the run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dispatch', choices=['sync', 'async'], default='async')
+    parser.add_argument('--max-p99-ms', type=float, default=None)
+    parser.add_argument('--max-rss-mb', type=float, default=None)
+    args = parser.parse_args(argv)
+
+    result = run(
+        generate_commands(args.commands, args.seed), args.history_size, args.dispatch, args.history_rows
+    )
+
+    print(f"{result['commands']} commands in {result['wall_seconds']:.2f} s")
+    print(f"startup: {result['startup_ms']:.3f} ms")
+    print(
+        f"latency ms: p50 {result['p50_ms']:.3f}  p95 {result['p95_ms']:.3f}  "
+        f"p99 {result['p99_ms']:.3f}  max {result['max_ms']:.3f}"
+    )
+    for kind, stats in result['by_command'].items():
+        print(f"  {kind:>9}: n={stats['count']:<6} p50 {stats['p50_ms']:.3f}  p99 {stats['p99_ms']:.3f}")
+    if result['peak_rss_mb'] is not None:
+        print(f"peak RSS: {result['peak_rss_mb']:.1f} MiB")
+
+    failures = check_thresholds(result, args.max_p99_ms, args.max_rss_mb)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
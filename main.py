@@ -1,5 +1,96 @@
-from app.calculator_repl import calculator_repl
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+
+def startup_profile(target_ms: Optional[float] = None) -> int:
+    """Report import and initialization time; return 1 if over the target."""
+    baseline_modules = set(sys.modules)
+
+    start = time.perf_counter()
+    from app.calculator_config import CalculatorConfig, load_environment
+    load_environment()
+    env_loaded = time.perf_counter()
+
+    from app.calculator import Calculator
+    from app.calculator_repl import calculator_repl  # noqa: F401
+    imported = time.perf_counter()
+
+    calc = Calculator(CalculatorConfig())
+    initialized = time.perf_counter()
+
+    new_modules = set(sys.modules) - baseline_modules
+    total_ms = (initialized - start) * 1000
+    print("Startup profile:")
+    print(f"  environment: {(env_loaded - start) * 1000:.1f} ms")
+    print(f"  imports:     {(imported - env_loaded) * 1000:.1f} ms")
+    print(f"  initialize:  {(initialized - imported) * 1000:.1f} ms")
+    print(f"  total:       {total_ms:.1f} ms")
+    print(f"  modules loaded: {len(new_modules)}")
+    print(f"  pandas loaded: {'pandas' in sys.modules}")
+    print(f"  history entries: {len(calc.history)}")
+
+    if target_ms is not None and total_ms > target_ms:
+        print(f"Startup exceeded target of {target_ms:.1f} ms")
+        return 1
+    return 0
+
+
+def run_worker(host: str, port: int) -> int:
+    """Serve batch requests with this installation's operations and plugins."""
+    from app.calculator_config import CalculatorConfig, load_environment
+    from app.operations import OperationFactory
+    from app.remote_workers import serve_worker
+
+    load_environment()
+    OperationFactory.discover(CalculatorConfig().plugin_dir)
+    serve_worker(host, port)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Interactive calculator")
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="report import and initialization time, then exit"
+    )
+    parser.add_argument(
+        "--startup-target-ms",
+        type=float,
+        default=os.getenv("CALCULATOR_STARTUP_TARGET_MS"),
+        help="fail the startup profile when total startup exceeds this many ms"
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="serve batch evaluation requests for remote coordinators"
+    )
+    parser.add_argument(
+        "--host",
+        default=os.getenv("CALCULATOR_WORKER_HOST", "127.0.0.1"),
+        help="address the worker listens on"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=int(os.getenv("CALCULATOR_WORKER_PORT", "0")),
+        help="port the worker listens on (0 picks a free port)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        return run_worker(args.host, args.port)
+
+    if args.startup_profile:
+        return startup_profile(args.startup_target_ms)
+
+    from app.calculator_repl import calculator_repl
+    calculator_repl()
+    return 0
 
 
 if __name__ == "__main__":
-    calculator_repl()
\ No newline at end of file
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import datetime
+import threading
 from pathlib import Path
 import pandas as pd
 import pytest
@@ -10,7 +11,9 @@ from app.calculator_repl import calculator_repl
 from app.calculator_config import CalculatorConfig
 from app.exceptions import OperationError, ValidationError
 from app.history import LoggingObserver, AutoSaveObserver
-from app.operations import OperationFactory
+from app.metrics import MetricsRecorder
+from app.operations import OperationFactory, Power
+from app.pipeline import Pipeline
 
 @pytest.fixture
 def calculator():
@@ -92,7 +95,7 @@ def test_redo(calculator):
     calculator.redo()
     assert len(calculator.history) == 1
 
-@patch('app.calculator.pd.DataFrame.to_csv')
+@patch('pandas.DataFrame.to_csv')
 def test_save_history(mock_to_csv, calculator):
     operation = OperationFactory.create_operation('add')
     calculator.set_operation(operation)
@@ -100,16 +103,14 @@ def test_save_history(mock_to_csv, calculator):
     calculator.save_history()
     mock_to_csv.assert_called_once()
 
-@patch('app.calculator.pd.read_csv')
-@patch('app.calculator.Path.exists', return_value=True)
-def test_load_history(mock_exists, mock_read_csv, calculator):
-    mock_read_csv.return_value = pd.DataFrame({
+def test_load_history(calculator):
+    pd.DataFrame({
         'operation': ['Addition'],
         'operand1': ['12'],
         'operand2': ['8'],
         'result': ['20'],
         'timestamp': [datetime.datetime.now().isoformat()]
-    })
+    }).to_csv(calculator.config.history_file, index=False)
 
     try:
         calculator.load_history()
@@ -150,3 +151,710 @@ def test_calculator_repl_help(mock_print, mock_input):
 def test_calculator_repl_addition(mock_print, mock_input):
     calculator_repl()
     mock_print.assert_any_call("\nResult: 35")
+
+def test_failing_observer_does_not_abort_operation(calculator):
+    observer = Mock()
+    observer.update_many.side_effect = RuntimeError("observer down")
+    calculator.add_observer(observer)
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    assert calculator.perform_operation(2, 3) == Decimal('5')
+    assert calculator.flush_observers(timeout=5)
+    assert calculator.get_observer_stats()[0]['failures'] == 1
+    assert len(calculator.history) == 1
+
+def test_observer_operation_filter(calculator):
+    observer = Mock(spec=['update'])
+    calculator.add_observer(observer, operations=['Multiplication'])
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    calculator.perform_operation(1, 1)
+    calculator.set_operation(OperationFactory.create_operation('multiply'))
+    calculator.perform_operation(2, 2)
+    calculator.flush_observers(timeout=5)
+    assert observer.update.call_count == 1
+
+def test_metrics_disabled_by_default(calculator):
+    assert calculator.metrics is None
+    assert calculator.get_metrics() == {}
+    with pytest.raises(OperationError, match="Metrics are disabled"):
+        calculator.export_metrics()
+
+def test_metrics_record_stages(calculator, tmp_path):
+    calculator.config.metrics_enabled = True
+    calculator.metrics = MetricsRecorder()
+    calculator.set_operation(OperationFactory.create_operation('divide'))
+    calculator.perform_operation(10, 4)
+    with pytest.raises(ValidationError):
+        calculator.perform_operation(1, 0)
+
+    snapshot = calculator.get_metrics()
+    assert snapshot['operations_total'] == {'Division': 1}
+    assert snapshot['errors_total'] == {'Division': 1}
+    for stage in ('validation', 'execute', 'calculation', 'memento', 'append', 'eviction', 'notify', 'total'):
+        assert snapshot['stage_seconds'][stage]['Division']['count'] == 1
+
+    path = calculator.export_metrics(tmp_path / 'metrics.prom')
+    assert 'calculator_stage_seconds_bucket' in path.read_text()
+
+def _write_history_file(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame([
+        {'operation': 'Addition', 'operand1': str(a), 'operand2': str(b),
+         'result': str(a + b), 'timestamp': datetime.datetime.now().isoformat()}
+        for a, b in rows
+    ]).to_csv(path, index=False)
+
+def test_background_load_merges_calculations_made_while_loading(tmp_path):
+    config = CalculatorConfig(base_dir=tmp_path, background_load=True, auto_save=False)
+    _write_history_file(config.history_file, [(1, 1), (2, 2)])
+
+    release = threading.Event()
+    original_read = Calculator._read_history
+
+    def slow_read(self):
+        release.wait(5)
+        return original_read(self)
+
+    with patch.object(Calculator, '_read_history', slow_read):
+        calc = Calculator(config)
+        assert not calc.history_loaded
+        calc.set_operation(OperationFactory.create_operation('add'))
+        calc.perform_operation(3, 3)
+        assert len(calc.history) == 1
+        release.set()
+        assert calc.wait_for_history(timeout=5)
+
+    assert [c.operand1 for c in calc.history] == [Decimal('1'), Decimal('2'), Decimal('3')]
+    assert calc.undo()
+    assert [c.operand1 for c in calc.history] == [Decimal('1'), Decimal('2')]
+
+def test_clear_during_background_load_discards_loaded_history(tmp_path):
+    config = CalculatorConfig(base_dir=tmp_path, background_load=True, auto_save=False)
+    _write_history_file(config.history_file, [(1, 1)])
+
+    release = threading.Event()
+    original_read = Calculator._read_history
+
+    def slow_read(self):
+        release.wait(5)
+        return original_read(self)
+
+    with patch.object(Calculator, '_read_history', slow_read):
+        calc = Calculator(config)
+        calc.clear_history()
+        release.set()
+        calc.wait_for_history(timeout=5)
+
+    assert calc.show_history() == []
+
+def test_show_history_waits_for_background_load(tmp_path):
+    config = CalculatorConfig(base_dir=tmp_path, background_load=True)
+    _write_history_file(config.history_file, [(4, 5)])
+    calc = Calculator(config)
+    assert calc.show_history() == ["Addition(4, 5) = 9"]
+
+def _shared_writer(base_dir, writer_id, writes):
+    config = CalculatorConfig(
+        base_dir=Path(base_dir), auto_save=False, history_mode='shared', observer_dispatch='sync'
+    )
+    calc = Calculator(config)
+    calc.set_operation(OperationFactory.create_operation('add'))
+    for i in range(writes):
+        calc.perform_operation(writer_id, i)
+        calc.save_history()
+
+def test_shared_history_mode_loses_no_updates(tmp_path):
+    import multiprocessing
+
+    ctx = multiprocessing.get_context('spawn')
+    workers = [ctx.Process(target=_shared_writer, args=(str(tmp_path), n, 25)) for n in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    df = pd.read_csv(tmp_path / 'history' / 'calculator_history.csv')
+    assert len(df) == 100
+    assert sorted(df['operand1'].unique()) == [0, 1, 2, 3]
+
+def test_shared_history_mode_skips_undone_calculations(tmp_path):
+    config = CalculatorConfig(base_dir=tmp_path, auto_save=False, history_mode='shared')
+    calc = Calculator(config)
+    calc.set_operation(OperationFactory.create_operation('multiply'))
+    calc.perform_operation(2, 3)
+    calc.perform_operation(4, 5)
+    calc.undo()
+    calc.save_history()
+    calc.perform_operation(6, 7)
+    calc.undo()
+    calc.redo()
+    calc.save_history()
+
+    df = pd.read_csv(config.history_file)
+    assert list(df['result']) == [6, 42]
+    calc.save_history()
+    assert len(pd.read_csv(config.history_file)) == 2
+
+def test_shared_history_clear_and_undo_survive_restart(tmp_path):
+    config = CalculatorConfig(base_dir=tmp_path, auto_save=False, history_mode='shared')
+    calc = Calculator(config)
+    calc.set_operation(OperationFactory.create_operation('add'))
+    calc.perform_operation(1, 1)
+    calc.perform_operation(2, 2)
+    calc.save_history()
+    calc.clear_history()
+    calc.perform_operation(3, 3)
+    calc.perform_operation(4, 4)
+    calc.save_history()
+    calc.undo()
+    calc.save_history()
+    calc.close()
+
+    restarted = Calculator(config)
+    assert restarted.show_history() == ['Addition(3, 3) = 6']
+    restarted.close()
+
+@pytest.fixture
+def sqlite_calculator(tmp_path):
+    config = CalculatorConfig(
+        base_dir=tmp_path, history_backend='sqlite', auto_save=False, max_history_size=2
+    )
+    calc = Calculator(config)
+    yield calc
+    calc.close()
+
+def _stored_operands(calc):
+    return [c.operand1 for c in calc.storage.query()]
+
+def test_sqlite_backend_saves_incrementally(sqlite_calculator):
+    calc = sqlite_calculator
+    calc.set_operation(OperationFactory.create_operation('add'))
+    for i in range(4):
+        calc.perform_operation(i, 1)
+    calc.save_history()
+    # Evicted calculations stay in the database.
+    assert len(calc.history) == 2
+    assert _stored_operands(calc) == [Decimal(i) for i in range(4)]
+
+    calc.undo()
+    calc.save_history()
+    assert _stored_operands(calc) == [Decimal(i) for i in range(3)]
+    calc.redo()
+    calc.save_history()
+    assert _stored_operands(calc) == [Decimal(i) for i in range(4)]
+
+    calc.perform_operation(7, 1)
+    calc.undo()
+    calc.undo()
+    calc.redo()
+    calc.save_history()
+    assert _stored_operands(calc) == [Decimal(i) for i in range(4)]
+
+    calc.clear_history()
+    calc.perform_operation(9, 1)
+    calc.save_history()
+    assert _stored_operands(calc) == [Decimal('9')]
+
+def test_sqlite_backend_reload_and_query(sqlite_calculator, tmp_path):
+    calc = sqlite_calculator
+    calc.set_operation(OperationFactory.create_operation('add'))
+    calc.perform_operation(1, 1)
+    calc.set_operation(OperationFactory.create_operation('multiply'))
+    calc.perform_operation(2, 2)
+    calc.perform_operation(3, 3)
+    assert [c.result for c in calc.query_history(operation='Multiplication')] == [Decimal('4'), Decimal('9')]
+    assert _stored_operands(calc) == []  # querying does not save
+
+    calc.save_history()
+    reopened = Calculator(calc.config)
+    assert [c.result for c in reopened.history] == [Decimal('4'), Decimal('9')]
+    reopened.close()
+
+def test_queries_overlay_unsaved_changes(sqlite_calculator):
+    calc = sqlite_calculator
+    calc.set_operation(OperationFactory.create_operation('add'))
+    for i in range(4):
+        calc.perform_operation(i, 1)
+    calc.save_history()
+    calc.undo()
+    calc.perform_operation(7, 1)
+    expected = [Decimal(i) for i in (0, 1, 2, 7)]
+    assert [c.operand1 for c in calc.query_history()] == expected
+    assert [c.operand1 for c in calc.query_history(limit=2)] == expected[-2:]
+    records = [record for chunk in calc.iter_history_records(chunk_size=3) for record in chunk]
+    assert [Decimal(record['operand1']) for record in records] == expected
+    assert _stored_operands(calc) == [Decimal(i) for i in range(4)]
+
+    calc.clear_history()
+    calc.perform_operation(9, 1)
+    assert [c.operand1 for c in calc.query_history()] == [Decimal(9)]
+    assert _stored_operands(calc) == [Decimal(i) for i in range(4)]
+    calc.save_history()
+    assert _stored_operands(calc) == [Decimal(9)]
+
+def test_query_history_csv_filters_memory(calculator):
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    calculator.perform_operation(1, 2)
+    calculator.perform_operation(3, 4)
+    assert [c.result for c in calculator.query_history(limit=1)] == [Decimal('7')]
+    assert calculator.query_history(operation='Division') == []
+
+def test_export_history_streams_chunks(calculator, tmp_path):
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    for i in range(5):
+        calculator.perform_operation(i, i)
+    assert calculator.export_history(tmp_path / 'out.jsonl', chunk_size=2) == 5
+    assert len((tmp_path / 'out.jsonl').read_text().splitlines()) == 5
+    assert calculator.export_history(tmp_path / 'out.txt', format='CSV') == 5
+
+def test_export_history_from_sqlite(sqlite_calculator, tmp_path):
+    calc = sqlite_calculator
+    calc.set_operation(OperationFactory.create_operation('add'))
+    for i in range(5):
+        calc.perform_operation(i, 1)
+    # The database keeps evicted entries, so they are exported too.
+    assert calc.export_history(tmp_path / 'out.csv') == 5
+
+def test_export_history_wraps_io_errors(calculator, tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    with pytest.raises(OperationError, match="Failed to export history"):
+        calculator.export_history(blocker / 'out.csv')
+
+@pytest.fixture
+def tiered_calculator(tmp_path):
+    config = CalculatorConfig(
+        base_dir=tmp_path, tiered_history=True, max_history_size=3, segment_size=2, auto_save=False
+    )
+    calc = Calculator(config)
+    calc.set_operation(OperationFactory.create_operation('add'))
+    yield calc
+    calc.close()
+
+def test_tiered_history_spills_evicted_entries(tiered_calculator):
+    calc = tiered_calculator
+    for i in range(7):
+        calc.perform_operation(i, 0)
+    assert [int(c.operand1) for c in calc.history] == [4, 5, 6]
+    assert calc.history_length() == 7
+    assert [int(c.operand1) for c in calc.get_history_range(2, 5)] == [2, 3, 4]
+    assert [int(c.operand1) for c in calc.query_history(limit=5)] == [2, 3, 4, 5, 6]
+
+    rows = calc.export_history(calc.config.history_dir / 'all.csv')
+    assert rows == 7
+
+def test_tiered_undo_does_not_restore_spilled_entries(tiered_calculator):
+    calc = tiered_calculator
+    for i in range(4):
+        calc.perform_operation(i, 0)
+    calc.undo()
+    assert [int(c.operand1) for c in calc.history] == [1, 2]
+    assert calc.history_length() == 3
+    calc.clear_history()
+    assert calc.history_length() == 0
+
+def test_tiered_load_skips_spilled_rows(tiered_calculator):
+    calc = tiered_calculator
+    for i in range(5):
+        calc.perform_operation(i, 0)
+    calc.save_history()  # the file holds the hot window, 2..4
+    calc.perform_operation(5, 0)  # spills 2
+    calc.load_history()
+    assert [int(c.operand1) for c in calc.history] == [3, 4]
+    assert [int(c.operand1) for c in calc.query_history()] == [0, 1, 2, 3, 4]
+    calc.close()
+
+    restarted = Calculator(calc.config)
+    assert [int(c.operand1) for c in restarted.query_history()] == [0, 1, 2, 3, 4]
+    restarted.close()
+
+def test_byte_cap_limits_memory(tmp_path):
+    config = CalculatorConfig(base_dir=tmp_path, max_history_bytes=2000, auto_save=False)
+    calc = Calculator(config)
+    calc.set_operation(OperationFactory.create_operation('add'))
+    for i in range(50):
+        calc.perform_operation(i, 0)
+    assert 1 <= len(calc.history) < 50
+    assert calc._hot_bytes <= 2000
+    assert calc.history[-1].operand1 == Decimal('49')
+
+def _persistent_undo_calculator(tmp_path, **overrides):
+    config = CalculatorConfig(
+        base_dir=tmp_path, persistent_undo=True, undo_window=2, auto_save=False, **overrides
+    )
+    calc = Calculator(config)
+    calc.set_operation(OperationFactory.create_operation('add'))
+    return calc
+
+def test_persistent_undo_past_in_memory_window(tmp_path):
+    calc = _persistent_undo_calculator(tmp_path, max_history_size=3)
+    for i in range(5):
+        calc.perform_operation(i, 0)
+    assert len(calc.undo_stack) == 2
+    for _ in range(4):
+        assert calc.undo()
+    assert [int(c.operand1) for c in calc.history] == [0]
+    for _ in range(3):
+        assert calc.redo()
+    assert [int(c.operand1) for c in calc.history] == [1, 2, 3]
+    calc.close()
+
+def test_persistent_undo_survives_restart(tmp_path):
+    calc = _persistent_undo_calculator(tmp_path)
+    for i in range(3):
+        calc.perform_operation(i, 0)
+    calc.save_history()
+    calc.close()
+
+    calc = _persistent_undo_calculator(tmp_path)
+    assert not calc.undo_journal.loaded
+    assert calc.undo()
+    assert calc.undo()
+    assert [int(c.operand1) for c in calc.history] == [0]
+    assert calc.redo()
+    assert [int(c.operand1) for c in calc.history] == [0, 1]
+    calc.close()
+
+def test_persistent_undo_discards_mismatched_journal(tmp_path):
+    calc = _persistent_undo_calculator(tmp_path)
+    calc.perform_operation(1, 0)
+    calc.close()  # history never saved
+
+    calc = _persistent_undo_calculator(tmp_path)
+    assert not calc.undo()
+    assert calc.undo_journal.depth('undo') == 0
+    calc.close()
+
+def test_checkpoint_restores_whole_session(tmp_path):
+    config = CalculatorConfig(base_dir=tmp_path, auto_save=False)
+    calc = Calculator(config)
+    calc.set_operation(OperationFactory.create_operation('multiply'))
+    for i in range(3):
+        calc.perform_operation(i, 2)
+    calc.undo()
+    path = calc.checkpoint()
+    calc.close()
+
+    restored = Calculator(CalculatorConfig(base_dir=tmp_path / 'other', auto_save=False))
+    restored.restore(path)
+    assert [c.result for c in restored.history] == [Decimal('0'), Decimal('2')]
+    assert str(restored.operation_strategy) == 'Multiplication'
+    assert restored.redo()
+    assert restored.history[-1].result == Decimal('4')
+    assert restored.undo() and restored.undo()
+    assert len(restored.history) == 1
+    restored.close()
+
+def test_restore_rewrites_incremental_backend(sqlite_calculator):
+    calc = sqlite_calculator
+    calc.set_operation(OperationFactory.create_operation('add'))
+    calc.perform_operation(1, 1)
+    path = calc.checkpoint(calc.config.history_dir / 'one.ckpt')
+    calc.perform_operation(2, 2)
+    calc.save_history()
+    calc.restore(path)
+    calc.save_history()
+    assert [c.operand1 for c in calc.storage.load()] == [Decimal('1')]
+
+def test_restore_keeps_stored_rows_beyond_the_window(sqlite_calculator):
+    calc = sqlite_calculator  # keeps the last 2 calculations in memory
+    calc.set_operation(OperationFactory.create_operation('add'))
+    for i in range(4):
+        calc.perform_operation(i, 1)
+    path = calc.checkpoint(calc.config.history_dir / 'window.ckpt')
+    calc.perform_operation(4, 1)
+    calc.save_history()
+    assert _stored_operands(calc) == [Decimal(i) for i in range(5)]
+    calc.restore(path)
+    calc.save_history()
+    assert [c.operand1 for c in calc.history] == [Decimal(2), Decimal(3)]
+    assert _stored_operands(calc) == [Decimal(i) for i in range(4)]
+
+def test_high_precision_configuration_is_honoured(tmp_path):
+    calc = Calculator(CalculatorConfig(base_dir=tmp_path, precision=40, auto_save=False))
+    calc.set_operation(OperationFactory.create_operation('divide'))
+    result = calc.perform_operation(1, 3)
+    assert calc.decimal_precision > 40
+    assert result == calc.history[-1].result == Decimal('0.' + '3' * 40)
+    assert calc.history[-1].format_result(precision=40) == '0.' + '3' * 40
+    calc.close()
+
+def test_inputs_keep_digits_beyond_the_default_context(tmp_path):
+    calc = Calculator(CalculatorConfig(base_dir=tmp_path, precision=50, auto_save=False))
+    calc.set_operation(OperationFactory.create_operation('add'))
+    value = '1.234567890123456789012345678901234567890'
+    assert calc.perform_operation(value, 0) == Decimal(value)
+    assert calc.perform_reduction('sum', [value, 0]) == Decimal(value)
+    calc.set_operation(OperationFactory.create_operation('divide'))
+    assert calc.perform_operation(1, 3) == Decimal('0.' + '3' * 50)
+    calc.save_history()
+    with patch('app.calculation.logging.warning') as warning:
+        calc.load_history()
+    warning.assert_not_called()
+    assert calc.history[-1].result == Decimal('0.' + '3' * 50)
+    calc.close()
+
+def test_memory_report_charges_shared_entries_to_history(tmp_path):
+    calc = Calculator(CalculatorConfig(base_dir=tmp_path, auto_save=False))
+    calc.set_operation(OperationFactory.create_operation('add'))
+    for i in range(20):
+        calc.perform_operation(i, 1)
+    calc.undo()
+    report = calc.memory_report()
+    sections = {section['name']: section for section in report['sections']}
+    assert sections['history']['count'] == 19
+    assert sections['undo_stack']['count'] == 19
+    assert sections['redo_stack']['count'] == 1
+    # Mementos share calculations with the history, so they only pay for their lists.
+    assert sections['undo_stack']['bytes_per_item'] < sections['history']['bytes_per_item'] * 19
+    assert report['total_bytes'] == sum(section['bytes'] for section in report['sections'])
+    calc.close()
+
+def test_pipeline_records_final_step_as_one_undo_step(tmp_path):
+    from app.pipeline import Pipeline
+    calc = Calculator(CalculatorConfig(base_dir=tmp_path, auto_save=False))
+    pipeline = Pipeline([('multiply', 3), ('add', 1)])
+    assert calc.run_pipeline(pipeline, ['1', 2, Decimal(3)]) == [Decimal(4), Decimal(7), Decimal(10)]
+    assert [(c.operation, c.operand1, c.result) for c in calc.history] == [
+        ('Addition', Decimal(3), Decimal(4)),
+        ('Addition', Decimal(6), Decimal(7)),
+        ('Addition', Decimal(9), Decimal(10)),
+    ]
+    assert calc.undo()
+    assert calc.history == []
+    calc.close()
+
+def test_pipeline_can_record_every_step(tmp_path):
+    from app.pipeline import Pipeline
+    calc = Calculator(CalculatorConfig(base_dir=tmp_path, auto_save=False, pipeline_record='all'))
+    calc.run_pipeline(Pipeline([('multiply', 3), ('add', 1)]), [1, 2])
+    assert [c.result for c in calc.history] == [Decimal(3), Decimal(4), Decimal(6), Decimal(7)]
+    with pytest.raises(OperationError, match="Unknown pipeline record mode"):
+        calc.run_pipeline(Pipeline([('add', 1)]), [1], record='some')
+    calc.close()
+
+def test_pipeline_failure_records_nothing(tmp_path):
+    from app.pipeline import Pipeline
+    calc = Calculator(CalculatorConfig(base_dir=tmp_path, auto_save=False))
+    with pytest.raises(ValidationError, match=r"step 2 \(Root\).*item 1"):
+        calc.run_pipeline(Pipeline([('subtract', 3), ('root', 2)]), [5, 2])
+    with pytest.raises(ValidationError):
+        calc.run_pipeline(Pipeline([('add', 1)]), ['x'])
+    assert calc.history == [] and calc.undo_stack == []
+    calc.close()
+
+def test_persistent_undo_reverts_a_pipeline_run_from_the_journal(tmp_path):
+    from app.pipeline import Pipeline
+    calc = _persistent_undo_calculator(tmp_path, max_history_size=4)
+    calc.perform_operation(100, 0)
+    calc.run_pipeline(Pipeline([('add', 1)]), range(5))
+    assert [int(c.result) for c in calc.history] == [2, 3, 4, 5]
+    calc.undo_stack.clear()  # force the journal path
+    assert calc.undo()
+    assert [int(c.result) for c in calc.history] == [100]
+    assert calc.redo()
+    assert [int(c.result) for c in calc.history] == [2, 3, 4, 5]
+    calc.close()
+
+def test_reduction_records_one_compact_entry(tmp_path):
+    calc = Calculator(CalculatorConfig(base_dir=tmp_path, auto_save=False))
+    result = calc.perform_reduction('sum', (str(i) for i in range(10001)))
+    assert result == Decimal(50005000)
+    assert len(calc.history) == 1
+    assert calc.show_history() == ['Sum(10001 values) = 50005000']
+
+    calc.save_history()
+    calc.load_history()
+    loaded = calc.history[0]
+    assert (loaded.count, loaded.result) == (10001, Decimal(50005000))
+    assert calc.undo() and calc.history == []
+    calc.close()
+
+def test_reduction_validation(tmp_path):
+    calc = Calculator(CalculatorConfig(base_dir=tmp_path, auto_save=False))
+    with pytest.raises(OperationError, match="not a reduction"):
+        calc.perform_reduction('add', [1, 2])
+    with pytest.raises(ValidationError):
+        calc.perform_reduction('mean', [1, 'x'])
+    with pytest.raises(ValidationError, match="at least one value"):
+        calc.perform_reduction('max', [])
+    assert calc.history == []
+    calc.close()
+
+def test_result_cache_warms_restarts(tmp_path):
+    config = CalculatorConfig(base_dir=tmp_path, auto_save=False, result_cache=True)
+    calc = Calculator(config)
+    calc.set_operation(OperationFactory.create_operation('power'))
+    expected = calc.perform_operation('1.5', '40')
+    calc.set_operation(OperationFactory.create_operation('add'))
+    calc.perform_operation(1, 2)
+    calc.close()
+
+    restarted = Calculator(config)
+    restarted.set_operation(OperationFactory.create_operation('power'))
+    with patch.object(Power, 'execute', side_effect=AssertionError("recomputed")):
+        assert restarted.perform_operation('1.50', '40') == expected
+    report = restarted.cache_report()
+    assert (report['hits'], report['entries']) == (1, 1)
+    assert len(restarted.history) == 1
+    restarted.close()
+
+def test_result_cache_serves_pipelines_and_vectors(tmp_path):
+    config = CalculatorConfig(base_dir=tmp_path, auto_save=False, result_cache=True)
+    calc = Calculator(config)
+    assert calc.config.result_cache_file.parent == tmp_path.resolve() / "cache"
+    expected = calc.perform_vector_operation('power', ['1.5', '2.5'], 40)
+    assert calc.cache_report()['entries'] == 2
+    with patch.object(Power, 'execute_many', side_effect=AssertionError("recomputed")):
+        assert calc.run_pipeline(Pipeline([('power', 40)]), ['1.5', '2.5']) == expected
+        assert calc.perform_vector_operation('power', ['2.5'], 40) == expected[1:]
+    assert calc.cache_report()['hits'] == 3
+    calc.close()
+
+def test_result_cache_disabled_by_default(tmp_path):
+    calc = Calculator(CalculatorConfig(base_dir=tmp_path, auto_save=False))
+    assert calc.result_cache is None
+    assert calc.cache_report() is None
+    calc.close()
+
+def test_startup_loads_only_max_history_size(tmp_path):
+    config = CalculatorConfig(base_dir=tmp_path, auto_save=False, max_history_size=5)
+    config.history_dir.mkdir(parents=True, exist_ok=True)
+    rows = ["operation,operand1,operand2,result,timestamp"] + [
+        f"Addition,{i},1,{i + 1},2024-01-01T00:00:00" for i in range(10000)
+    ]
+    config.history_file.write_text("\n".join(rows) + "\n")
+    calc = Calculator(config)
+    assert [c.operand1 for c in calc.history] == [Decimal(i) for i in range(9995, 10000)]
+    calc.close()
+
+def test_vector_operation_records_one_entry(tmp_path):
+    calc = Calculator(CalculatorConfig(base_dir=tmp_path, auto_save=False))
+    results = calc.perform_vector_operation('multiply', ['1', '2', '3.5'], '2')
+    assert results == [Decimal(2), Decimal(4), Decimal(7)]
+    assert calc.show_history() == ['Multiplication([1, 2, 3.5], 2) = [2, 4, 7.0]']
+
+    calc.save_history()
+    calc.load_history()
+    loaded = calc.history[0]
+    assert loaded.operation == 'Multiplication[]' and loaded.count == 3
+    assert list(loaded.operand1) == [Decimal(1), Decimal(2), Decimal('3.5')]
+    assert loaded.operand2 == Decimal(2)
+    assert list(loaded.result) == results
+    assert calc.undo() and calc.history == []
+    calc.close()
+
+def test_vector_operation_round_trips_sqlite(sqlite_calculator):
+    calc = sqlite_calculator
+    calc.perform_vector_operation('add', [1, 2], [3, 5])
+    calc.save_history()
+    stored = calc.storage.load()[0]
+    assert str(stored) == 'Addition([1, 2], [3, 5]) = [4, 7]'
+
+def test_vector_operation_with_numpy(tmp_path):
+    np = pytest.importorskip("numpy")
+    calc = Calculator(CalculatorConfig(base_dir=tmp_path, auto_save=False, max_input_value=100000))
+    results = calc.perform_vector_operation('add', np.arange(10000.0), 1)
+    assert isinstance(results, np.ndarray) and results[-1] == 10000
+    entry = calc.history[0]
+    assert len(calc.history) == 1 and entry.count == 10000 and entry.result[-1] == Decimal(10000)
+    assert str(entry) == 'Addition([0.0, 1.0, 2.0, 3.0, 4.0, ... (10000 values)], 1) = [1.0, 2.0, 3.0, 4.0, 5.0, ... (10000 values)]'
+    with pytest.raises(ValidationError, match="exceeds maximum"):
+        calc.perform_vector_operation('add', np.array([1.0, 500000.0]), 1)
+    with pytest.raises(ValidationError, match="NaN or infinity"):
+        calc.perform_vector_operation('add', np.array([np.nan]), 1)
+    with pytest.raises(ValidationError, match="differ in length"):
+        calc.perform_vector_operation('add', [1, 2], [1])
+    assert len(calc.history) == 1
+    calc.close()
+
+def test_plugin_history_survives_restart(tmp_path, monkeypatch):
+    # The plugin file stem ('mod') differs from its class name ('Modulus').
+    for attr in ('_operations', '_plugins', '_instances', '_dispatch'):
+        monkeypatch.setattr(OperationFactory, attr, dict(getattr(OperationFactory, attr)))
+    registries = {
+        attr: dict(getattr(OperationFactory, attr))
+        for attr in ('_operations', '_plugins', '_instances', '_dispatch')
+    }
+    plugin_dir = tmp_path / "plugins"
+    plugin_dir.mkdir()
+    (plugin_dir / "mod.py").write_text(
+        "from decimal import Decimal\n"
+        "from app.operations import Operation\n\n"
+        "class Modulus(Operation):\n"
+        "    def execute(self, a, b):\n"
+        "        return Decimal(a) % Decimal(b)\n"
+    )
+    config = CalculatorConfig(base_dir=tmp_path, auto_save=False)
+    calc = Calculator(config)
+    calc.set_operation(OperationFactory.create_operation('add'))
+    calc.perform_operation(1, 2)
+    calc.set_operation(OperationFactory.create_operation('mod'))
+    calc.perform_operation(7, 4)
+    calc.save_history()
+    calc.close()
+
+    # A fresh process knows the plugin only by its file name.
+    for attr, registry in registries.items():
+        monkeypatch.setattr(OperationFactory, attr, dict(registry))
+    calc = Calculator(config)
+    assert calc.show_history() == ['Addition(1, 2) = 3', 'Modulus(7, 4) = 3']
+    calc.close()
+
+def test_checkpoint_with_plugin_operation(tmp_path, monkeypatch):
+    for attr in ('_operations', '_plugins', '_instances', '_dispatch'):
+        monkeypatch.setattr(OperationFactory, attr, dict(getattr(OperationFactory, attr)))
+    registries = {
+        attr: dict(getattr(OperationFactory, attr))
+        for attr in ('_operations', '_plugins', '_instances', '_dispatch')
+    }
+    plugin_dir = tmp_path / "plugins"
+    plugin_dir.mkdir()
+    (plugin_dir / "modulo.py").write_text(
+        "from decimal import Decimal\n"
+        "from app.operations import Operation\n\n"
+        "class Modulo(Operation):\n"
+        "    def execute(self, a, b):\n"
+        "        return Decimal(a) % Decimal(b)\n"
+    )
+    config = CalculatorConfig(base_dir=tmp_path, auto_save=False)
+    calc = Calculator(config)
+    calc.set_operation(OperationFactory.create_operation('modulo'))
+    calc.perform_operation(7, 4)
+    path = calc.checkpoint()
+    calc.close()
+
+    # A fresh process has not loaded the plugin yet.
+    for attr, registry in registries.items():
+        monkeypatch.setattr(OperationFactory, attr, dict(registry))
+    restored = Calculator(config)
+    restored.restore(path)
+    assert str(restored.operation_strategy) == 'Modulo'
+    assert restored.perform_operation(9, 4) == Decimal('1')
+    restored.close()
+
+@patch('app.history_storage.logging.warning')
+def test_unreadable_history_row_is_skipped(logging_warning_mock, tmp_path):
+    config = CalculatorConfig(base_dir=tmp_path, auto_save=False)
+    config.history_dir.mkdir(parents=True, exist_ok=True)
+    config.history_file.write_text(
+        "operation,operand1,operand2,result,timestamp\n"
+        "Addition,1,2,3,2024-01-01T00:00:00\n"
+        "Missing,1,2,3,2024-01-01T00:00:01\n"
+        "Multiplication,2,3,6,2024-01-01T00:00:02\n"
+    )
+    calc = Calculator(config)
+    assert calc.show_history() == ['Addition(1, 2) = 3', 'Multiplication(2, 3) = 6']
+    assert "Skipping unreadable history row" in logging_warning_mock.call_args[0][0]
+    calc.close()
+
+def test_reduction_cannot_run_as_binary_operation(tmp_path):
+    calc = Calculator(CalculatorConfig(base_dir=tmp_path, auto_save=False))
+    calc.set_operation(OperationFactory.create_operation('sum'))
+    with pytest.raises(ValidationError, match="Sum takes a list of values"):
+        calc.perform_operation(5, 7)
+    calc.perform_reduction('sum', [5, 7])
+    calc.save_history()
+    calc.load_history()
+    assert calc.show_history() == ['Sum(2 values) = 12']
+    calc.close()
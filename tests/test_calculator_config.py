@@ -2,6 +2,7 @@ import os
 import pytest
 from decimal import Decimal
 from pathlib import Path
+from unittest.mock import patch
 from app.calculator_config import CalculatorConfig
 from app.exceptions import ConfigurationError
 
@@ -80,3 +81,122 @@ def test_config_validation_failure():
             precision=1,
             max_input_value=Decimal("-1")
         ).validate()
+
+
+def test_observer_settings_validation():
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(observer_dispatch="threads").validate()
+
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(observer_backpressure="ignore").validate()
+
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(observer_queue_size=0).validate()
+
+
+def test_metrics_settings(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_METRICS_ENABLED", "1")
+    monkeypatch.setenv("CALCULATOR_METRICS_FILE", "/tmp/calc-metrics.prom")
+    config = CalculatorConfig()
+    assert config.metrics_enabled is True
+    assert config.metrics_file == Path("/tmp/calc-metrics.prom")
+
+
+def test_load_environment_is_cached(tmp_path):
+    from app.calculator_config import load_environment
+
+    env_file = tmp_path / ".env"
+    env_file.write_text("CALCULATOR_TEST_ONLY_VAR=1\n")
+    try:
+        assert load_environment(str(env_file)) is True
+        assert os.environ["CALCULATOR_TEST_ONLY_VAR"] == "1"
+        env_file.unlink()
+        assert load_environment(str(env_file)) is True
+    finally:
+        os.environ.pop("CALCULATOR_TEST_ONLY_VAR", None)
+
+
+@patch("app.calculator_config.load_environment")
+def test_config_does_not_load_environment(mock_load):
+    CalculatorConfig()
+    mock_load.assert_not_called()
+
+
+def test_history_mode_validation():
+    assert CalculatorConfig(history_mode="shared").history_mode == "shared"
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(history_mode="merge").validate()
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(lock_timeout=0).validate()
+
+
+def test_history_backend_settings(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_HISTORY_BACKEND", "SQLite")
+    monkeypatch.setenv("CALCULATOR_HISTORY_DB_FILE", "/tmp/calc.db")
+    config = CalculatorConfig()
+    assert config.history_backend == "sqlite"
+    assert config.history_db_file == Path("/tmp/calc.db")
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(history_backend="redis").validate()
+
+
+def test_tiered_history_settings(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_TIERED_HISTORY", "true")
+    monkeypatch.setenv("CALCULATOR_MAX_HISTORY_BYTES", "65536")
+    config = CalculatorConfig(base_dir=Path("/tmp").resolve())
+    assert config.tiered_history is True
+    assert config.max_history_bytes == 65536
+    assert config.segments_dir == Path("/tmp").resolve() / "history" / "segments"
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(max_history_bytes=-1).validate()
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(segment_size=0).validate()
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(undo_window=0).validate()
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(undo_depth=0).validate()
+
+def test_log_rotation_settings(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_LOG_MAX_BYTES", "1024")
+    monkeypatch.setenv("CALCULATOR_LOG_BACKUP_COUNT", "3")
+    monkeypatch.setenv("CALCULATOR_LOG_COMPRESS", "false")
+    config = CalculatorConfig(base_dir=Path("/tmp").resolve())
+    assert config.log_max_bytes == 1024
+    assert config.log_backup_count == 3
+    assert config.log_compress is False
+    assert config.log_rotate_interval == 0
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(log_backup_count=-1).validate()
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(log_rotate_interval=-1).validate()
+
+def test_worker_settings(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_WORKERS", "10.0.0.1:7000, 10.0.0.2:7000,")
+    config = CalculatorConfig(base_dir=Path("/tmp").resolve())
+    assert config.workers == ["10.0.0.1:7000", "10.0.0.2:7000"]
+    assert config.worker_chunk_size == 256
+    assert CalculatorConfig(workers=[]).workers == []
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(workers=["no-port"]).validate()
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(worker_chunk_size=0).validate()
+
+def test_result_cache_settings(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_RESULT_CACHE", "true")
+    config = CalculatorConfig(base_dir=Path("/tmp").resolve())
+    assert config.result_cache is True
+    assert config.result_cache_file == Path("/tmp").resolve() / "cache" / "result_cache.db"
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(result_cache_max_bytes=0).validate()
+
+def test_replication_settings(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_REPLICATION", "Primary")
+    config = CalculatorConfig(base_dir=Path("/tmp").resolve())
+    assert config.replication == "primary"
+    assert config.replication_file == Path("/tmp").resolve() / "history" / "replication.jsonl"
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(replication="leader").validate()
+    monkeypatch.setenv("CALCULATOR_REPLICATION_MAX_BYTES", "4096")
+    assert CalculatorConfig().replication_max_bytes == 4096
+    with pytest.raises(ConfigurationError):
+        CalculatorConfig(replication_max_bytes=0).validate()
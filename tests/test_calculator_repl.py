@@ -10,6 +10,14 @@ def test_help_command(mock_print, mock_input):
     mock_print.assert_any_call("\nAvailable commands:")
 
 
+@patch("builtins.input", side_effect=["exit"])
+@patch("builtins.print")
+@patch("app.calculator_repl.load_environment")
+def test_repl_loads_environment(mock_load, mock_print, mock_input):
+    calculator_repl()
+    mock_load.assert_called_once_with()
+
+
 @patch("builtins.input", side_effect=["save", "exit"])
 @patch("builtins.print")
 @patch("app.calculator.Calculator.save_history")
@@ -122,3 +130,171 @@ def test_exit_save_failure(mock_save, mock_print, mock_input):
     calculator_repl()
     mock_print.assert_any_call("Warning: Could not save history: fail")
     mock_print.assert_any_call("Goodbye!")
+
+
+@patch("builtins.input", side_effect=["add 2 3", "exit"])
+@patch("builtins.print")
+def test_single_line_operation(mock_print, mock_input):
+    calculator_repl()
+    mock_print.assert_any_call("\nResult: 5")
+    assert mock_input.call_count == 2
+
+
+@patch("builtins.input", side_effect=["divide 10 4; multiply 3 3 ;; power 2 10", "exit"])
+@patch("builtins.print")
+def test_multiple_commands_per_line(mock_print, mock_input):
+    calculator_repl()
+    mock_print.assert_any_call("\nResult: 2.5")
+    mock_print.assert_any_call("\nResult: 9")
+    mock_print.assert_any_call("\nResult: 1024")
+
+
+@patch("builtins.input", side_effect=["add 1", "exit"])
+@patch("builtins.print")
+def test_single_line_operation_usage(mock_print, mock_input):
+    calculator_repl()
+    mock_print.assert_any_call("Usage: add <first number> <second number>")
+
+
+@patch("builtins.input", side_effect=["divide 1 0", "exit"])
+@patch("builtins.print")
+def test_single_line_operation_error(mock_print, mock_input):
+    calculator_repl()
+    assert any("Division by zero" in str(call[0][0]) for call in mock_print.call_args_list)
+
+
+@patch("builtins.input", side_effect=["add 1; exit"])
+@patch("builtins.print")
+def test_exit_inside_command_line(mock_print, mock_input):
+    calculator_repl()
+    mock_print.assert_any_call("Usage: add <first number> <second number>")
+    mock_print.assert_any_call("Goodbye!")
+
+
+def test_source_command_runs_script(tmp_path, capsys):
+    script = tmp_path / "script.calc"
+    script.write_text("# comment\nadd 1 2\n\nmultiply 4 5; subtract 9 3\nadd\n")
+    with patch("builtins.input", side_effect=[f"source {script}", "exit"]):
+        calculator_repl()
+    output = capsys.readouterr().out
+    assert "Result: 3" in output
+    assert "Result: 20" in output
+    assert "Result: 6" in output
+    assert "Usage: add <first number> <second number>" in output
+
+
+def test_source_command_exit_stops_repl(tmp_path, capsys):
+    script = tmp_path / "script.calc"
+    script.write_text("add 1 1\nexit\nadd 5 5\n")
+    with patch("builtins.input", side_effect=[f"source {script}"]) as mock_input:
+        calculator_repl()
+    output = capsys.readouterr().out
+    assert "Result: 2" in output
+    assert "Result: 10" not in output
+    assert mock_input.call_count == 1
+
+
+def test_source_command_nesting_is_limited(tmp_path, capsys):
+    script = tmp_path / "loop.calc"
+    script.write_text(f"source {script}\n")
+    with patch("builtins.input", side_effect=[f"source {script}", "exit"]):
+        calculator_repl()
+    assert "source nested more than" in capsys.readouterr().out
+
+
+@patch("builtins.input", side_effect=["source /nonexistent/script.calc", "source", "exit"])
+@patch("builtins.print")
+def test_source_command_errors(mock_print, mock_input):
+    calculator_repl()
+    assert any("Error reading script" in str(call[0][0]) for call in mock_print.call_args_list)
+    mock_print.assert_any_call("Usage: source <file>")
+
+
+def test_export_command(tmp_path, capsys):
+    target = tmp_path / "history.jsonl"
+    with patch("builtins.input", side_effect=["add 1 2", f"export {target}", "export", "exit"]):
+        calculator_repl()
+    output = capsys.readouterr().out
+    assert "Exported " in output
+    assert "Usage: export <file> [csv|jsonl|parquet]" in output
+    assert target.exists()
+
+
+@patch("builtins.input", side_effect=["export out.xml xml", "exit"])
+@patch("builtins.print")
+def test_export_command_error(mock_print, mock_input):
+    calculator_repl()
+    mock_print.assert_any_call("Error exporting history: Unknown export format: xml")
+
+
+def test_plugin_operation_command(tmp_path, monkeypatch, capsys):
+    from app.operations import OperationFactory
+    for attr in ('_operations', '_plugins', '_instances', '_dispatch'):
+        monkeypatch.setattr(OperationFactory, attr, dict(getattr(OperationFactory, attr)))
+    (tmp_path / "halve.py").write_text(
+        "from decimal import Decimal\n"
+        "from app.operations import Operation\n\n"
+        "class Halve(Operation):\n"
+        "    def execute(self, a, b):\n"
+        "        return Decimal(a) / 2\n"
+    )
+    monkeypatch.setenv("CALCULATOR_PLUGIN_DIR", str(tmp_path))
+    with patch("builtins.input", side_effect=["help", "halve 9 0", "exit"]):
+        calculator_repl()
+    output = capsys.readouterr().out
+    assert "halve" in output
+    assert "Result: 4.5" in output
+
+
+def test_memory_command(capsys):
+    with patch("builtins.input", side_effect=["memory", "memory trace on", "memory", "memory trace off", "memory trace", "exit"]):
+        calculator_repl()
+    output = capsys.readouterr().out
+    assert "Memory report:" in output
+    assert "tracemalloc: current" in output
+    assert "Allocation tracing off" in output
+    assert "Usage: memory [trace on|off]" in output
+
+
+@patch("builtins.input", side_effect=["sum 1 2 3 4", "stddev 5", "mean", "exit"])
+@patch("builtins.print")
+def test_reduction_command(mock_print, mock_input):
+    calculator_repl()
+    mock_print.assert_any_call("\nResult: 10")
+    mock_print.assert_any_call("Error: StandardDeviation needs at least two values")
+    mock_print.assert_any_call("Usage: mean <number> [<number> ...]")
+
+
+@patch("builtins.input", side_effect=["cache", "exit"])
+@patch("builtins.print")
+def test_cache_command_when_disabled(mock_print, mock_input):
+    calculator_repl()
+    mock_print.assert_any_call("Result cache is disabled (set CALCULATOR_RESULT_CACHE=true)")
+
+
+@patch("builtins.print")
+def test_profile_commands(mock_print, tmp_path):
+    out = tmp_path / "repl.folded"
+    commands = ["profile on", "power 2 10", f"profile dump {out}", "profile off", "profile", "exit"]
+    with patch("builtins.input", side_effect=commands):
+        calculator_repl()
+    printed = [call.args[0] for call in mock_print.call_args_list if call.args]
+    assert "Profiling on" in printed and "Profiling off" in printed
+    assert any(line.startswith("Wrote ") and str(out) in line for line in printed)
+    assert "Usage: profile on|off|dump <file>" in printed
+    assert out.exists()
+
+
+@patch("builtins.input", side_effect=["replication", "exit"])
+@patch("builtins.print")
+def test_replication_command_when_off(mock_print, mock_input):
+    calculator_repl()
+    mock_print.assert_any_call("Replication is off (set CALCULATOR_REPLICATION=primary or follower)")
+
+
+@patch("builtins.input", side_effect=["add 1,2,3 10", "divide 6 1,0", "exit"])
+@patch("builtins.print")
+def test_vector_operation_command(mock_print, mock_input):
+    calculator_repl()
+    mock_print.assert_any_call("\nResult: [11, 12, 13]")
+    mock_print.assert_any_call("Error: Division by zero is not allowed (item 1)")
@@ -0,0 +1,34 @@
+import struct
+
+import pytest
+
+from app.checkpoint import MAGIC, read_checkpoint, write_checkpoint
+from app.exceptions import OperationError
+
+
+def test_round_trip_preserves_shared_references(tmp_path):
+    shared = [1, 2, 3]
+    path = write_checkpoint(tmp_path / "session.ckpt", {'a': shared, 'b': shared})
+    state = read_checkpoint(path)
+    assert state['a'] == [1, 2, 3]
+    assert state['a'] is state['b']
+    assert not (tmp_path / "session.ckpt.tmp").exists()
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "other.ckpt"
+    path.write_bytes(b"not a checkpoint at all")
+    with pytest.raises(OperationError, match="Not a calculator checkpoint"):
+        read_checkpoint(path)
+
+
+def test_rejects_unknown_versions(tmp_path):
+    path = tmp_path / "future.ckpt"
+    path.write_bytes(struct.pack('>8sH', MAGIC, 99))
+    with pytest.raises(OperationError, match="Unsupported checkpoint version"):
+        read_checkpoint(path)
+
+
+def test_missing_file_raises_operation_error(tmp_path):
+    with pytest.raises(OperationError, match="Failed to read checkpoint"):
+        read_checkpoint(tmp_path / "missing.ckpt")
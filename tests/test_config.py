@@ -92,7 +92,7 @@ def test_redo(calculator):
     calculator.redo()
     assert len(calculator.history) == 1
 
-@patch('app.calculator.pd.DataFrame.to_csv')
+@patch('pandas.DataFrame.to_csv')
 def test_save_history(mock_to_csv, calculator):
     operation = OperationFactory.create_operation('add')
     calculator.set_operation(operation)
@@ -100,16 +100,14 @@ def test_save_history(mock_to_csv, calculator):
     calculator.save_history()
     mock_to_csv.assert_called_once()
 
-@patch('app.calculator.pd.read_csv')
-@patch('app.calculator.Path.exists', return_value=True)
-def test_load_history(mock_exists, mock_read_csv, calculator):
-    mock_read_csv.return_value = pd.DataFrame({
+def test_load_history(calculator):
+    pd.DataFrame({
         'operation': ['Addition'],
         'operand1': ['20'],
         'operand2': ['30'],
         'result': ['50'],
         'timestamp': [datetime.datetime.now().isoformat()]
-    })
+    }).to_csv(calculator.config.history_file, index=False)
 
     try:
         calculator.load_history()
@@ -0,0 +1,53 @@
+import decimal
+from decimal import Decimal
+import threading
+
+from app.decimal_context import (
+    GUARD_DIGITS,
+    precision_context,
+    quantizer,
+    round_significant,
+    thread_context,
+    working_precision,
+)
+from app.operations import Root
+
+
+def test_working_precision_adds_guard_digits_above_default():
+    assert working_precision(10) == decimal.DefaultContext.prec
+    assert working_precision(50) == 50 + GUARD_DIGITS
+
+
+def test_precision_context_restores_previous_context():
+    before = decimal.getcontext()
+    with precision_context(40) as context:
+        assert decimal.getcontext() is context
+        assert len(str(Decimal(1) / Decimal(3))) == 42
+    assert decimal.getcontext() is before
+
+
+def test_contexts_are_reused_per_thread():
+    assert thread_context(33) is thread_context(33)
+    other = []
+    worker = threading.Thread(target=lambda: other.append(thread_context(33)))
+    worker.start()
+    worker.join()
+    assert other[0] is not thread_context(33)
+
+
+def test_quantizer_is_cached():
+    assert quantizer(-2) == Decimal('0.01')
+    assert quantizer(-2) is quantizer(-2)
+
+
+def test_round_significant():
+    assert str(round_significant(Decimal('2.99999999999999999'), 10)) == '3.000000000'
+    assert round_significant(Decimal('123456'), 2) == Decimal('1.2E+5')
+    assert round_significant(Decimal(0), 5) == 0
+
+
+def test_root_precision_follows_context():
+    with precision_context(60):
+        result = Root().execute(Decimal(2), Decimal(2))
+    assert len(result.as_tuple().digits) == 60 - GUARD_DIGITS
+    assert str(result).startswith('1.41421356237309504880168872420969807856967187537694')
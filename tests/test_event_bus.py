@@ -0,0 +1,164 @@
+import threading
+from decimal import Decimal
+import pytest
+
+from app.calculation import Calculation
+from app.event_bus import EventBus, Subscription
+from app.exceptions import ConfigurationError
+from app.history import HistoryObserver
+
+
+def make_calc(operation="Addition", a="1", b="2"):
+    return Calculation(operation=operation, operand1=Decimal(a), operand2=Decimal(b))
+
+
+class RecordingObserver(HistoryObserver):
+    def __init__(self):
+        self.updates = []
+
+    def update(self, calculation):
+        self.updates.append(calculation)
+
+
+class BatchObserver(RecordingObserver):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def update_many(self, calculations):
+        self.batches.append(list(calculations))
+
+
+class FailingObserver(HistoryObserver):
+    def update(self, calculation):
+        raise RuntimeError("boom")
+
+
+def test_sync_dispatch_delivers_inline():
+    bus = EventBus(mode="sync")
+    observer = RecordingObserver()
+    bus.subscribe(observer)
+    bus.publish(make_calc())
+    assert len(observer.updates) == 1
+    assert bus.stats()[0]["delivered"] == 1
+
+
+def test_async_dispatch_delivers_after_flush():
+    bus = EventBus(mode="async")
+    observer = RecordingObserver()
+    bus.subscribe(observer)
+    for i in range(50):
+        bus.publish(make_calc(a=str(i)))
+    assert bus.flush(timeout=5)
+    assert [c.operand1 for c in observer.updates] == [Decimal(i) for i in range(50)]
+    bus.close()
+
+
+def test_async_observer_can_unsubscribe_itself():
+    bus = EventBus(mode="async")
+
+    left = threading.Event()
+
+    class LeavingObserver(RecordingObserver):
+        def update(self, calculation):
+            super().update(calculation)
+            bus.unsubscribe(self)
+            left.set()
+
+    observer = LeavingObserver()
+    bus.subscribe(observer)
+    bus.publish(make_calc())
+    assert left.wait(timeout=5)
+    assert bus.stats() == []
+    assert len(observer.updates) == 1
+
+
+def test_update_many_receives_batches():
+    bus = EventBus(mode="sync", batch_size=3)
+    observer = BatchObserver()
+    bus.subscribe(observer)
+    bus.publish_many([make_calc(a=str(i)) for i in range(7)])
+    assert [len(batch) for batch in observer.batches] == [3, 3, 1]
+    assert observer.updates == []
+
+
+def test_operation_filter():
+    bus = EventBus(mode="sync")
+    observer = RecordingObserver()
+    bus.subscribe(observer, operations=["Multiplication"])
+    bus.publish(make_calc("Addition"))
+    bus.publish(make_calc("Multiplication"))
+    assert [c.operation for c in observer.updates] == ["Multiplication"]
+
+
+def test_failure_is_isolated():
+    bus = EventBus(mode="sync")
+    good = RecordingObserver()
+    bus.subscribe(FailingObserver())
+    bus.subscribe(good)
+    bus.publish(make_calc())
+    stats = bus.stats()
+    assert stats[0]["failures"] == 1
+    assert stats[1]["delivered"] == 1
+    assert len(good.updates) == 1
+
+
+class BlockedObserver(RecordingObserver):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def update(self, calculation):
+        self.started.set()
+        self.release.wait(5)
+        super().update(calculation)
+
+
+@pytest.mark.parametrize("policy,expected", [
+    ("drop_newest", ["0", "1", "2"]),
+    ("drop_oldest", ["0", "3", "4"]),
+])
+def test_drop_policies(policy, expected):
+    bus = EventBus(mode="async", max_queue_size=2, policy=policy, batch_size=1)
+    observer = BlockedObserver()
+    bus.subscribe(observer)
+    bus.publish(make_calc(a="0"))
+    assert observer.started.wait(5)
+    for i in range(1, 5):
+        bus.publish(make_calc(a=str(i)))
+    observer.release.set()
+    assert bus.flush(timeout=5)
+    assert [str(c.operand1) for c in observer.updates] == expected
+    assert bus.stats()[0]["dropped"] == 2
+    bus.close()
+
+
+def test_block_policy_loses_nothing():
+    bus = EventBus(mode="async", max_queue_size=2, policy="block", batch_size=1)
+    observer = RecordingObserver()
+    bus.subscribe(observer)
+    for i in range(20):
+        bus.publish(make_calc(a=str(i)))
+    assert bus.flush(timeout=5)
+    assert len(observer.updates) == 20
+    bus.close()
+
+
+def test_unsubscribe_stops_delivery():
+    bus = EventBus(mode="sync")
+    observer = RecordingObserver()
+    bus.subscribe(observer)
+    bus.unsubscribe(observer)
+    bus.publish(make_calc())
+    assert observer.updates == []
+    assert bus.stats() == []
+
+
+def test_invalid_settings():
+    with pytest.raises(ConfigurationError):
+        EventBus(mode="parallel")
+    with pytest.raises(ConfigurationError):
+        Subscription(RecordingObserver(), policy="ignore")
+    with pytest.raises(ConfigurationError):
+        Subscription(RecordingObserver(), max_queue_size=0)
@@ -0,0 +1,43 @@
+import multiprocessing
+import pytest
+
+from app.exceptions import OperationError
+from app.file_lock import FileLock
+
+
+def _hold_lock(path, acquired, release):
+    with FileLock(path):
+        acquired.set()
+        release.wait(5)
+
+
+def test_lock_context_manager(tmp_path):
+    lock = FileLock(tmp_path / "sub/history.lock")
+    with lock:
+        assert lock.locked
+    assert not lock.locked
+    lock.release()  # releasing twice is harmless
+
+
+def test_shared_locks_do_not_block_each_other(tmp_path):
+    path = tmp_path / "history.lock"
+    with FileLock(path, shared=True):
+        with FileLock(path, shared=True, timeout=0.1) as second:
+            assert second.locked
+
+
+def test_exclusive_lock_times_out_across_processes(tmp_path):
+    path = tmp_path / "history.lock"
+    ctx = multiprocessing.get_context("spawn")
+    acquired, release = ctx.Event(), ctx.Event()
+    holder = ctx.Process(target=_hold_lock, args=(path, acquired, release))
+    holder.start()
+    try:
+        assert acquired.wait(10)
+        with pytest.raises(OperationError, match="Could not lock"):
+            FileLock(path, timeout=0.05).acquire()
+    finally:
+        release.set()
+        holder.join(10)
+    with FileLock(path, timeout=1):
+        pass
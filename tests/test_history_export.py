@@ -0,0 +1,93 @@
+import csv
+import json
+import sys
+from decimal import Decimal
+import pytest
+
+from app.calculation import Calculation
+from app.exceptions import OperationError
+from app.history_export import export_format_for, export_records
+from app.history_storage import CsvHistoryStorage, SqliteHistoryStorage, record_chunks
+
+
+def make_calcs(count):
+    return [
+        Calculation(operation="Addition", operand1=Decimal(i), operand2=Decimal(1))
+        for i in range(count)
+    ]
+
+
+def test_record_chunks_are_bounded():
+    chunks = list(record_chunks(make_calcs(7), chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert chunks[0][1]["operand1"] == "1"
+    with pytest.raises(OperationError, match="chunk_size must be positive"):
+        list(record_chunks(make_calcs(1), chunk_size=0))
+
+
+def test_record_chunks_is_lazy():
+    def endless():
+        i = 0
+        while True:
+            yield Calculation(operation="Addition", operand1=Decimal(i), operand2=Decimal(0))
+            i += 1
+
+    first = next(record_chunks(endless(), chunk_size=5))
+    assert len(first) == 5
+
+
+def test_export_csv_and_jsonl(tmp_path):
+    rows = export_records(tmp_path / "out.csv", record_chunks(make_calcs(5), 2), "csv")
+    assert rows == 5
+    with open(tmp_path / "out.csv", newline="") as f:
+        assert [r["operand1"] for r in csv.DictReader(f)] == ["0", "1", "2", "3", "4"]
+
+    export_records(tmp_path / "out.jsonl", record_chunks(make_calcs(3), 2), "jsonl")
+    lines = (tmp_path / "out.jsonl").read_text().splitlines()
+    assert [json.loads(line)["result"] for line in lines] == ["1", "2", "3"]
+
+
+def test_failed_export_leaves_no_partial_file(tmp_path):
+    def broken_chunks():
+        yield [make_calcs(1)[0].to_dict()]
+        raise RuntimeError("storage went away")
+
+    target = tmp_path / "out.csv"
+    with pytest.raises(RuntimeError):
+        export_records(target, broken_chunks(), "csv")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unknown_format_and_inference(tmp_path):
+    with pytest.raises(OperationError, match="Unknown export format"):
+        export_records(tmp_path / "out.xml", iter([]), "xml")
+    assert export_format_for("history.JSONL") == "jsonl"
+    assert export_format_for("history.parquet") == "parquet"
+    assert export_format_for("history.txt") == "csv"
+
+
+def test_parquet_requires_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(OperationError, match="requires the 'pyarrow' package"):
+        export_records(tmp_path / "out.parquet", record_chunks(make_calcs(1), 1), "parquet")
+
+
+def test_parquet_export(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    export_records(tmp_path / "out.parquet", record_chunks(make_calcs(5), 2), "parquet")
+    table = pq.read_table(tmp_path / "out.parquet")
+    assert table.num_rows == 5
+    assert pq.ParquetFile(tmp_path / "out.parquet").num_row_groups == 3
+
+
+def test_storage_iter_records(tmp_path):
+    csv_storage = CsvHistoryStorage(tmp_path / "history.csv")
+    assert list(csv_storage.iter_records()) == []
+    csv_storage.save(make_calcs(5))
+    assert [len(c) for c in csv_storage.iter_records(chunk_size=2)] == [2, 2, 1]
+
+    sqlite_storage = SqliteHistoryStorage(tmp_path / "history.db")
+    sqlite_storage.apply_changes(make_calcs(5), [])
+    chunks = list(sqlite_storage.iter_records(chunk_size=2))
+    assert [r["operand1"] for chunk in chunks for r in chunk] == ["0", "1", "2", "3", "4"]
+    sqlite_storage.close()
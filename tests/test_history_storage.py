@@ -0,0 +1,139 @@
+import datetime
+from decimal import Decimal
+from pathlib import Path
+import pytest
+
+from app.calculation import Calculation
+from app.calculator_config import CalculatorConfig
+from app.exceptions import ConfigurationError, OperationError
+from app.history_storage import (
+    CsvHistoryStorage,
+    SharedCsvHistoryStorage,
+    SqliteHistoryStorage,
+    create_history_storage,
+    read_tail_lines,
+)
+
+
+def make_calc(operation="Addition", a="1", b="2", minutes=0):
+    calc = Calculation(operation=operation, operand1=Decimal(a), operand2=Decimal(b))
+    calc.timestamp = datetime.datetime(2024, 1, 1, 12, 0) + datetime.timedelta(minutes=minutes)
+    return calc
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path):
+    storage = SqliteHistoryStorage(tmp_path / "history.db")
+    yield storage
+    storage.close()
+
+
+def test_sqlite_uses_wal_and_indexes(sqlite_storage):
+    conn = sqlite_storage.connection
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(calculations)")}
+    assert {"idx_calculations_timestamp", "idx_calculations_operation"} <= indexes
+
+
+def test_sqlite_save_and_load_with_limit(sqlite_storage):
+    assert sqlite_storage.load() is None
+    sqlite_storage.save([make_calc(a=str(i), minutes=i) for i in range(5)])
+    loaded = sqlite_storage.load(limit=2)
+    assert [c.operand1 for c in loaded] == [Decimal("3"), Decimal("4")]
+    sqlite_storage.save([make_calc(a="9")])
+    assert sqlite_storage.count() == 1
+
+
+def test_sqlite_apply_changes(sqlite_storage):
+    first, second, third = (make_calc(a=str(i), minutes=i) for i in range(3))
+    sqlite_storage.apply_changes([first, second], [])
+    sqlite_storage.apply_changes([third], [second])
+    assert [c.operand1 for c in sqlite_storage.load()] == [Decimal("0"), Decimal("2")]
+    sqlite_storage.apply_changes([second], [], cleared=True)
+    assert [c.operand1 for c in sqlite_storage.load()] == [Decimal("1")]
+
+
+def test_sqlite_query_pushdown(sqlite_storage):
+    sqlite_storage.apply_changes([
+        make_calc("Addition", minutes=0),
+        make_calc("Multiplication", minutes=1),
+        make_calc("Addition", minutes=2),
+        make_calc("Addition", minutes=3),
+    ], [])
+    assert len(sqlite_storage.query(operation="Addition")) == 3
+    since = datetime.datetime(2024, 1, 1, 12, 1)
+    until = datetime.datetime(2024, 1, 1, 12, 3)
+    assert [c.operation for c in sqlite_storage.query(since=since, until=until)] == ["Multiplication", "Addition"]
+    assert [c.timestamp.minute for c in sqlite_storage.query(operation="Addition", limit=2)] == [2, 3]
+
+
+def test_sqlite_failed_transaction_rolls_back(sqlite_storage):
+    sqlite_storage.save([make_calc()])
+    bad = make_calc()
+    bad.operation = None
+    with pytest.raises(Exception):
+        sqlite_storage.save([make_calc(), bad])
+    assert sqlite_storage.count() == 1
+
+
+def test_csv_round_trip_and_query(tmp_path):
+    storage = CsvHistoryStorage(tmp_path / "history.csv")
+    assert storage.load() is None
+    storage.save([])
+    assert storage.load() is None
+    storage.save([make_calc("Addition"), make_calc("Division", "8", "2")])
+    assert [c.result for c in storage.query(operation="Division")] == [Decimal("4")]
+    with pytest.raises(OperationError, match="does not support incremental"):
+        storage.apply_changes([make_calc()], [])
+
+
+def test_shared_csv_appends_only(tmp_path):
+    path = tmp_path / "history.csv"
+    storage = SharedCsvHistoryStorage(path)
+    storage.apply_changes([make_calc(a="1"), make_calc(a="2"), make_calc(a="3")], [])
+    storage.apply_changes([make_calc(a="4")], [make_calc(a="2")])
+    assert [c.operand1 for c in storage.load()] == [Decimal("1"), Decimal("3"), Decimal("4")]
+    assert [c.operand1 for c in storage.load(limit=2)] == [Decimal("3"), Decimal("4")]
+    storage.apply_changes([make_calc(a="5")], [], cleared=True)
+    assert [c.operand1 for c in storage.load()] == [Decimal("5")]
+    assert [[r["operand1"] for r in chunk] for chunk in storage.iter_records(chunk_size=1)] == [["5"]]
+    # Nothing written before is rewritten.
+    assert len(path.read_text().splitlines()) == 1 + 3 + 2 + 2
+    with pytest.raises(OperationError, match="cannot be rewritten"):
+        storage.save([])
+
+
+def test_create_history_storage(tmp_path):
+    assert isinstance(create_history_storage(CalculatorConfig(base_dir=tmp_path)), CsvHistoryStorage)
+    shared = create_history_storage(CalculatorConfig(base_dir=tmp_path, history_mode="shared"))
+    assert isinstance(shared, SharedCsvHistoryStorage)
+    sqlite = create_history_storage(CalculatorConfig(base_dir=tmp_path, history_backend="sqlite"))
+    assert isinstance(sqlite, SqliteHistoryStorage)
+    assert sqlite.path == Path(tmp_path / "history" / "calculator_history.db").resolve()
+    with pytest.raises(ConfigurationError):
+        create_history_storage(CalculatorConfig(base_dir=tmp_path, history_backend="redis"))
+
+
+def test_read_tail_lines_across_blocks(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"header\n" + b"".join(b"row%d\n" % i for i in range(1000)))
+    header, lines = read_tail_lines(path, 3, block_size=7)
+    assert header == b"header\n"
+    assert lines == [b"row997", b"row998", b"row999"]
+
+    path.write_bytes(b"header\r\nrow0\r\nrow1")
+    assert read_tail_lines(path, 5, block_size=4)[1] == [b"row0", b"row1"]
+    path.write_bytes(b"header\n")
+    assert read_tail_lines(path, 5)[1] == []
+
+
+def test_csv_load_limit_reads_only_the_tail(tmp_path):
+    storage = CsvHistoryStorage(tmp_path / "history.csv")
+    storage.save([make_calc(a=str(i), minutes=i) for i in range(500)])
+    loaded = storage.load(limit=4)
+    assert [calc.operand1 for calc in loaded] == [Decimal(i) for i in range(496, 500)]
+    assert loaded[-1].timestamp == make_calc(minutes=499).timestamp
+    assert len(storage.load()) == 500
+
+    CsvHistoryStorage(tmp_path / "empty.csv").save([])
+    assert CsvHistoryStorage(tmp_path / "empty.csv").load(limit=4) is None
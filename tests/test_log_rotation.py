@@ -0,0 +1,69 @@
+import gzip
+import logging
+
+import pytest
+
+from app.log_rotation import CompressingRotatingFileHandler
+
+
+@pytest.fixture
+def make_logger(tmp_path):
+    handlers = []
+
+    def factory(**kwargs):
+        handler = CompressingRotatingFileHandler(str(tmp_path / "app.log"), **kwargs)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger = logging.getLogger(f"rotation-test-{len(handlers)}-{tmp_path.name}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        handlers.append((logger, handler))
+        return logger, handler
+
+    yield factory
+    for logger, handler in handlers:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_size_rotation_compresses_in_background(make_logger, tmp_path):
+    logger, handler = make_logger(max_bytes=200, backup_count=10)
+    for i in range(20):
+        logger.info(f"line {i:03d} " + "x" * 40)
+    handler.wait_for_compression()
+
+    rotated = handler.rotated_files()
+    assert rotated and all(path.name.endswith('.gz') for path in rotated)
+    assert (tmp_path / "app.log").stat().st_size <= 200
+    lines = b"".join(gzip.open(path).read() for path in rotated).decode().splitlines()
+    current = (tmp_path / "app.log").read_text().splitlines()
+    assert [line[:8] for line in lines + current] == [f"line {i:03d}" for i in range(20)]
+
+
+def test_retention_keeps_newest_backups(make_logger):
+    logger, handler = make_logger(max_bytes=50, backup_count=2)
+    for i in range(30):
+        logger.info(f"message {i} " + "y" * 40)
+    handler.wait_for_compression()
+    rotated = handler.rotated_files()
+    assert len(rotated) == 2
+    assert f"message 28" in gzip.open(rotated[-1]).read().decode()
+
+
+def test_uncompressed_rotation(make_logger):
+    logger, handler = make_logger(max_bytes=50, backup_count=3, compress=False)
+    for i in range(10):
+        logger.info("z" * 60)
+    rotated = handler.rotated_files()
+    assert len(rotated) == 3
+    assert not any(path.name.endswith('.gz') for path in rotated)
+
+
+def test_interval_rotation(make_logger, monkeypatch):
+    logger, handler = make_logger(rotate_interval=60)
+    logger.info("before")
+    monkeypatch.setattr(handler, '_next_rollover', 0)
+    logger.info("after")
+    handler.wait_for_compression()
+    assert len(handler.rotated_files()) == 1
+    assert handler._next_rollover > 0
@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import main
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def test_importing_calculator_does_not_load_pandas():
+    code = "import sys, app.calculator_repl; print('pandas' in sys.modules, 'dotenv' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "False False"
+
+
+def test_startup_profile_reports_timings(monkeypatch, tmp_path, capsys):
+    monkeypatch.setenv("CALCULATOR_BASE_DIR", str(tmp_path))
+    assert main.main(["--startup-profile"]) == 0
+    output = capsys.readouterr().out
+    assert "Startup profile:" in output
+    assert "total:" in output
+
+
+def test_startup_profile_fails_over_target(monkeypatch, tmp_path, capsys):
+    monkeypatch.setenv("CALCULATOR_BASE_DIR", str(tmp_path))
+    assert main.main(["--startup-profile", "--startup-target-ms", "0"]) == 1
+    assert "Startup exceeded target" in capsys.readouterr().out
+
+
+@patch("app.calculator_repl.calculator_repl")
+def test_main_runs_repl(mock_repl):
+    assert main.main([]) == 0
+    mock_repl.assert_called_once()
+
+
+@patch("app.remote_workers.serve_worker")
+def test_main_runs_worker(mock_serve, monkeypatch, tmp_path):
+    monkeypatch.setenv("CALCULATOR_BASE_DIR", str(tmp_path))
+    assert main.main(["--worker", "--port", "9123"]) == 0
+    mock_serve.assert_called_once_with("127.0.0.1", 9123)
+
+
+def test_piped_input_is_saved_at_end_of_input(tmp_path):
+    env = {
+        **os.environ,
+        "CALCULATOR_HISTORY_DIR": str(tmp_path / "history"),
+        "CALCULATOR_LOG_DIR": str(tmp_path / "logs"),
+        "CALCULATOR_OBSERVER_DISPATCH": "async",
+        "CALCULATOR_AUTO_SAVE": "true",
+    }
+    result = subprocess.run(
+        [sys.executable, "main.py"], cwd=PROJECT_ROOT, input="add 1 2\nmultiply 3 4\n",
+        capture_output=True, text=True, env=env, check=True
+    )
+    assert "Input terminated. Exiting..." in result.stdout
+    assert "History saved successfully." in result.stdout
+    rows = (tmp_path / "history" / "calculator_history.csv").read_text().splitlines()
+    assert [row.split(",")[0] for row in rows[1:]] == ["Addition", "Multiplication"]
+
+
+def test_building_calculator_does_not_load_pandas(tmp_path):
+    code = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "from app.calculator import Calculator\n"
+        "from app.calculator_config import CalculatorConfig\n"
+        "base = Path(sys.argv[1])\n"
+        "Calculator(CalculatorConfig(base_dir=base / 'missing')).close()\n"
+        "config = CalculatorConfig(base_dir=base / 'empty')\n"
+        "config.history_dir.mkdir(parents=True)\n"
+        "config.history_file.write_text('operation,operand1,operand2,result,timestamp\\n')\n"
+        "Calculator(config).close()\n"
+        "print('pandas' in sys.modules)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code, str(tmp_path)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "False"
@@ -0,0 +1,36 @@
+from decimal import Decimal
+import tracemalloc
+
+from app.calculation import Calculation
+from app.memory_report import deep_size, format_memory_report, set_tracing
+
+
+def test_shared_objects_are_counted_once():
+    calcs = [Calculation(operation="Addition", operand1=Decimal(i), operand2=Decimal(1)) for i in range(10)]
+    seen = set()
+    first = deep_size(calcs, seen)
+    copy_cost = deep_size(list(calcs), seen)
+    assert first > copy_cost > 0
+    assert deep_size(calcs, seen) == 0
+
+
+def test_format_without_tracing():
+    report = {
+        'sections': [{'name': 'history', 'unit': 'entry', 'count': 2, 'bytes': 2048, 'bytes_per_item': 1024.0}],
+        'total_bytes': 2048,
+        'tracemalloc': None,
+    }
+    lines = format_memory_report(report)
+    assert "2.0 KiB" in lines[1] and "1.0 KiB/entry" in lines[1]
+    assert "tracemalloc: off" in lines[-1]
+
+
+def test_set_tracing():
+    was_tracing = tracemalloc.is_tracing()
+    try:
+        set_tracing(True)
+        assert tracemalloc.is_tracing()
+        set_tracing(False)
+        assert not tracemalloc.is_tracing()
+    finally:
+        set_tracing(was_tracing)
@@ -0,0 +1,56 @@
+import json
+import pytest
+
+from app.exceptions import OperationError
+from app.metrics import Histogram, MetricsRecorder
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(bounds=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.1", 1), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.count == 4
+    assert histogram.total == pytest.approx(3.05)
+
+
+def test_snapshot_groups_by_stage_and_operation():
+    recorder = MetricsRecorder(buckets=(0.1,))
+    recorder.observe("execute", "Addition", 0.01)
+    recorder.observe("execute", "Division", 0.2)
+    recorder.count_operation("Addition")
+    recorder.count_error("Division")
+
+    snapshot = recorder.snapshot()
+    assert snapshot["operations_total"] == {"Addition": 1}
+    assert snapshot["errors_total"] == {"Division": 1}
+    assert snapshot["stage_seconds"]["execute"]["Division"]["buckets"] == {"0.1": 0, "+Inf": 1}
+
+
+def test_prometheus_format():
+    recorder = MetricsRecorder(buckets=(0.1,))
+    recorder.observe("total", "Addition", 0.05)
+    recorder.count_operation("Addition")
+    text = recorder.to_prometheus()
+    assert "# TYPE calculator_stage_seconds histogram" in text
+    assert 'calculator_operations_total{operation="Addition"} 1' in text
+    assert 'calculator_stage_seconds_bucket{stage="total",operation="Addition",le="0.1"} 1' in text
+    assert 'calculator_stage_seconds_count{stage="total",operation="Addition"} 1' in text
+
+
+def test_export_json_and_unknown_format(tmp_path):
+    recorder = MetricsRecorder()
+    recorder.count_operation("Power")
+    path = recorder.export(tmp_path / "out/metrics.json", fmt="json")
+    assert json.loads(path.read_text())["operations_total"] == {"Power": 1}
+
+    with pytest.raises(OperationError, match="Unknown metrics format"):
+        recorder.export(tmp_path / "metrics.txt", fmt="xml")
+
+
+def test_reset():
+    recorder = MetricsRecorder()
+    recorder.observe("total", "Addition", 0.001)
+    recorder.count_operation("Addition")
+    recorder.reset()
+    assert recorder.snapshot() == {"operations_total": {}, "errors_total": {}, "stage_seconds": {}}
@@ -1,7 +1,13 @@
+import importlib.metadata
+import statistics
+import sys
+import types
+
 import pytest
 from decimal import Decimal
 from typing import Any, Dict, Type
 
+from app.calculation import REDUCTION_OPERATIONS
 from app.exceptions import ValidationError
 from app.operations import (
     Operation,
@@ -12,6 +18,14 @@ from app.operations import (
     Power,
     Root,
     OperationFactory,
+    ValidationRule,
+    Mean,
+    StandardDeviation,
+    Sum,
+    ARRAY_CONDITIONS,
+    CONDITIONS,
+    broadcast,
+    compensated_sum,
 )
 
 
@@ -56,6 +70,23 @@ class BaseOperationTest:
             with pytest.raises(error, match=error_message):
                 operation.execute(a, b)
 
+    def test_execute_many_matches_execute(self):
+        """Test the bulk path gives the scalar results for every valid case."""
+        operation = self.operation_class()
+        cases = list(self.valid_test_cases.values())
+        a = [Decimal(str(case["a"])) for case in cases]
+        b = [Decimal(str(case["b"])) for case in cases]
+        assert operation.execute_many(a, b) == [operation.execute(x, y) for x, y in zip(a, b)]
+
+    def test_execute_many_rejects_invalid_items(self):
+        """Test declared rules reject a batch containing an invalid item."""
+        operation = self.operation_class()
+        for name, case in self.invalid_test_cases.items():
+            a = [Decimal("4"), Decimal(str(case["a"]))]
+            b = [Decimal("2"), Decimal(str(case["b"]))]
+            with pytest.raises(ValidationError, match=r"\(item 1\)"):
+                operation.execute_many(a, b)
+
 
 class TestAddition(BaseOperationTest):
     """Test Addition operation."""
@@ -224,4 +255,231 @@ class TestOperationFactory:
             pass
 
         with pytest.raises(TypeError, match="Operation class must inherit"):
-            OperationFactory.register_operation("invalid", InvalidOperation)
\ No newline at end of file
+            OperationFactory.register_operation("invalid", InvalidOperation)
+
+class TestBatchProtocol:
+    """Test the bulk operation protocol shared by plugins."""
+
+    def test_scalar_fallback_for_plugins(self):
+        """Test operations without a bulk method fall back to execute."""
+        class Mean(Operation):
+            rules = (ValidationRule('b', 'negative', "No negatives"),)
+
+            def execute(self, a: Decimal, b: Decimal) -> Decimal:
+                return (a + b) / 2
+
+        assert Mean().execute_many([1, 3], [3, 5]) == [Decimal(2), Decimal(4)]
+        with pytest.raises(ValidationError, match=r"No negatives \(item 0\)"):
+            Mean().execute_many([1], [-1])
+
+    def test_mismatched_columns(self):
+        """Test operand columns must have the same length."""
+        with pytest.raises(ValidationError, match="differ in length"):
+            Addition().execute_many([1, 2], [1])
+
+    def test_invalid_operand_in_column(self):
+        """Test non-numeric items are rejected."""
+        with pytest.raises(ValidationError, match="Invalid operand"):
+            Addition().execute_many(["x"], [1])
+
+    def test_rules_reject_unknown_conditions(self):
+        """Test rule declarations are checked when defined."""
+        with pytest.raises(ValueError):
+            ValidationRule('b', 'prime', "Not supported")
+
+    def test_conditional_rule(self):
+        """Test a rule narrowed by the other operand."""
+        with pytest.raises(ValidationError, match=r"negative number \(item 1\)"):
+            Root().execute_many([8, -8], [3, 2])
+        # Odd roots of negatives pass the rule and fail like the scalar path.
+        with pytest.raises(ValidationError, match="Invalid root operation"):
+            Root().execute_many([-8], [3])
+
+
+@pytest.fixture
+def isolated_factory(monkeypatch):
+    """Restore the factory's registries after a test that adds plugins."""
+    for attr in ('_operations', '_plugins', '_instances', '_dispatch'):
+        monkeypatch.setattr(OperationFactory, attr, dict(getattr(OperationFactory, attr)))
+    monkeypatch.setattr(OperationFactory, '_entry_points_scanned', False)
+    return OperationFactory
+
+
+PLUGIN_SOURCE = '''
+from decimal import Decimal
+from app.operations import Operation
+
+class Hypot(Operation):
+    def execute(self, a, b):
+        return (Decimal(a) ** 2 + Decimal(b) ** 2).sqrt()
+'''
+
+
+class TestPluginDiscovery:
+    """Test lazy plugin discovery and flyweight dispatch."""
+
+    def test_instances_are_shared(self):
+        """Test stateless operations are handed out as flyweights."""
+        assert OperationFactory.create_operation('add') is OperationFactory.create_operation('ADD')
+
+    def test_directory_plugins_load_on_first_use(self, isolated_factory, tmp_path):
+        """Test plugin files are listed at discovery but imported on use."""
+        (tmp_path / "hypot.py").write_text(PLUGIN_SOURCE)
+        (tmp_path / "_private.py").write_text("raise RuntimeError")
+        assert isolated_factory.discover(tmp_path) == ['hypot']
+        assert 'calculator_plugins.hypot' not in sys.modules
+
+        entry = isolated_factory.resolve('hypot')
+        assert entry().execute(3, 4) == Decimal(5)
+        assert 'calculator_plugins.hypot' in sys.modules
+        assert entry() is isolated_factory.create_operation('hypot')
+
+    def test_plugin_file_with_explicit_operation(self, isolated_factory, tmp_path):
+        """Test OPERATION selects the class when a module defines several."""
+        (tmp_path / "first.py").write_text(
+            PLUGIN_SOURCE + "\nclass Other(Hypot):\n    pass\n\nOPERATION = Other\n"
+        )
+        isolated_factory.discover(tmp_path)
+        assert str(isolated_factory.create_operation('first')) == 'Other'
+
+    def test_broken_plugin_reports_name(self, isolated_factory, tmp_path):
+        """Test a plugin that fails to import raises a clear error."""
+        (tmp_path / "broken.py").write_text("import does_not_exist\n")
+        isolated_factory.discover(tmp_path)
+        with pytest.raises(ValueError, match="Could not load operation plugin 'broken'"):
+            isolated_factory.create_operation('broken')
+
+    def test_plugins_do_not_shadow_builtins(self, isolated_factory, tmp_path):
+        """Test a plugin named like a built-in is ignored."""
+        (tmp_path / "add.py").write_text(PLUGIN_SOURCE)
+        isolated_factory.discover(tmp_path)
+        assert isinstance(isolated_factory.create_operation('add'), Addition)
+
+    def test_entry_points_scanned_lazily(self, isolated_factory, monkeypatch):
+        """Test entry points are read once, only for unknown names."""
+        calls = []
+
+        class FakeEntryPoint:
+            name = 'double'
+
+            @staticmethod
+            def load():
+                class Double(Operation):
+                    def execute(self, a, b):
+                        return Decimal(a) * 2
+                return Double
+
+        def entry_points(group):
+            calls.append(group)
+            return [FakeEntryPoint]
+
+        monkeypatch.setattr(importlib.metadata, 'entry_points', entry_points)
+        isolated_factory.create_operation('add')
+        assert calls == []
+        assert isolated_factory.create_operation('double').execute(4, 0) == Decimal(8)
+        assert isolated_factory.resolve('missing') is None
+        assert calls == [OperationFactory.ENTRY_POINT_GROUP]
+        assert 'double' in isolated_factory.dispatch_table()
+
+
+class TestReductions:
+    """Test the n-ary reduction operations."""
+
+    def test_sum_is_compensated(self):
+        """Test small terms survive cancellation of large ones."""
+        values = [Decimal('1e30'), Decimal(1), Decimal('-1e30')]
+        assert sum(values) == 0
+        assert OperationFactory.create_operation('sum').reduce(values) == 1
+        assert compensated_sum(iter([1, 2, 3])) == (Decimal(6), 3)
+
+    def test_reductions(self):
+        """Test every reduction over a streamed generator."""
+        data = [2, 4, 4, 4, 5, 5, 7, 9]
+        expected = {
+            'sum': Decimal(40),
+            'product': Decimal(201600),
+            'mean': Decimal(5),
+            'min': Decimal(2),
+            'max': Decimal(9),
+        }
+        for name, value in expected.items():
+            assert OperationFactory.create_operation(name).reduce(x for x in data) == value, name
+        stddev = OperationFactory.create_operation('stddev').reduce(iter(data))
+        assert abs(stddev - Decimal(statistics.stdev(data))) < Decimal('1e-12')
+
+    def test_empty_input(self):
+        """Test reductions reject empty input."""
+        for name in ('sum', 'product', 'mean', 'min', 'max'):
+            with pytest.raises(ValidationError, match="needs at least one value"):
+                OperationFactory.create_operation(name).reduce([])
+        with pytest.raises(ValidationError, match="needs at least two values"):
+            StandardDeviation().reduce([1])
+
+    def test_binary_use_is_rejected(self):
+        """Test a reduction refuses two operands, which history could not tell apart."""
+        with pytest.raises(ValidationError, match="Sum takes a list of values"):
+            Sum().execute(Decimal(2), Decimal(3))
+        with pytest.raises(ValidationError, match="Mean takes a list of values"):
+            Mean().execute_many([1, 3], [3, 5])
+
+    def test_reductions_are_registered_for_history(self):
+        """Test reduction names are known to Calculation loading."""
+        assert {'Sum', 'Mean', 'StandardDeviation'} <= REDUCTION_OPERATIONS
+
+
+class TestVectorOperands:
+    """Test elementwise operations over vector operands."""
+
+    NAMES = ['add', 'subtract', 'multiply', 'divide', 'power', 'root']
+
+    def test_decimal_path_broadcasts(self):
+        """Test lists broadcast against scalars and match pairwise execute."""
+        values = [Decimal(1), Decimal('2.5'), Decimal(4)]
+        for name in self.NAMES:
+            operation = OperationFactory.create_operation(name)
+            assert operation.execute_vector(values, 2) == [operation.execute(x, 2) for x in values]
+            assert operation.execute_vector(2, values) == [operation.execute(2, x) for x in values]
+        assert broadcast(1, 2) == ([1], [2])
+        with pytest.raises(ValidationError, match="differ in length"):
+            Addition().execute_vector([1, 2], [1, 2, 3])
+
+    def test_numpy_fast_path(self):
+        """Test numeric arrays are computed in float64 and stay arrays."""
+        np = pytest.importorskip("numpy")
+        values = np.array([1.0, 2.5, 4.0])
+        for name in self.NAMES:
+            operation = OperationFactory.create_operation(name)
+            result = operation.execute_vector(values, np.int64(2))
+            assert isinstance(result, np.ndarray)
+            expected = [float(operation.execute(Decimal(str(x)), 2)) for x in values]
+            assert np.allclose(result, expected)
+        assert Addition().execute_vector(np.array([[1], [2]]), np.array([10, 20])).shape == (2, 2)
+        decimals = np.array([Decimal('0.1'), Decimal('0.2')], dtype=object)
+        assert Addition().execute_vector(decimals, Decimal('0.1')) == [Decimal('0.2'), Decimal('0.3')]
+
+    def test_half_imported_numpy_is_not_touched(self, monkeypatch):
+        """Test plain vectors work while another thread is still importing numpy."""
+        monkeypatch.setitem(sys.modules, 'numpy', types.ModuleType('numpy'))
+        assert Addition().execute_vector([1, 2], 3) == [Decimal(4), Decimal(5)]
+
+    def test_numpy_validation(self):
+        """Test rules are applied to whole arrays before computing."""
+        np = pytest.importorskip("numpy")
+        with pytest.raises(ValidationError, match=r"Division by zero is not allowed \(item 2\)"):
+            Division().execute_vector(np.array([1, 2, 3]), np.array([1, 1, 0]))
+        with pytest.raises(ValidationError, match="negative number"):
+            Root().execute_vector(np.array([4.0, -4.0]), 2)
+        with pytest.raises(ValidationError, match="Invalid root operation"):
+            Root().execute_vector(np.array([-8.0]), 3)
+        with pytest.raises(ValidationError, match="float64 range"):
+            Power().execute_vector(np.array([10.0]), 400)
+        with pytest.raises(ValidationError, match="do not broadcast"):
+            Addition().execute_vector(np.array([1, 2]), np.array([1, 2, 3]))
+
+    def test_array_conditions_match_scalar_conditions(self):
+        """Test the NumPy conditions agree with the Decimal ones."""
+        np = pytest.importorskip("numpy")
+        samples = [-3.5, -2.0, -1.0, 0.0, 0.5, 1.0, 2.0, 2.5, 3.0]
+        for name, condition in CONDITIONS.items():
+            expected = [condition(Decimal(str(x))) for x in samples]
+            assert ARRAY_CONDITIONS[name](np, np.array(samples)).tolist() == expected, name
@@ -0,0 +1,33 @@
+from decimal import Decimal
+
+import pytest
+
+from app.exceptions import ValidationError
+from app.operations import Multiplication
+from app.pipeline import Pipeline
+
+
+def test_pipeline_runs_each_step_over_the_column():
+    pipeline = Pipeline([(Multiplication(), 2), ('add', '1'), ('root', 2)])
+    columns = pipeline.run([Decimal(4), Decimal(12)])
+    assert columns[1] == [Decimal(8), Decimal(24)]
+    assert columns[2] == [Decimal(9), Decimal(25)]
+    assert columns[3] == [Decimal(3), Decimal(5)]
+    assert str(pipeline) == "Multiplication(2) -> Addition(1) -> Root(2)"
+
+
+def test_step_errors_name_the_step():
+    pipeline = Pipeline([('subtract', 5), ('divide', 0)])
+    with pytest.raises(ValidationError, match=r"Pipeline step 2 \(Division\): Division by zero"):
+        pipeline.run([Decimal(1)])
+
+
+def test_invalid_definitions():
+    with pytest.raises(ValidationError, match="at least one step"):
+        Pipeline([])
+    with pytest.raises(ValidationError, match="Invalid number format"):
+        Pipeline([('add', 'abc')])
+    with pytest.raises(TypeError):
+        Pipeline([(42, 1)])
+    with pytest.raises(ValueError, match="Unknown operation"):
+        Pipeline([('nope', 1)])
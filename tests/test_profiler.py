@@ -0,0 +1,43 @@
+import time
+
+from app.profiler import SamplingProfiler
+
+
+def busy_work(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_samples_only_inside_sampling_blocks(tmp_path):
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    try:
+        busy_work(0.05)
+        assert not profiler.samples
+        with profiler.sampling():
+            with profiler.sampling():  # nested blocks keep sampling
+                busy_work(0.05)
+            busy_work(0.05)
+    finally:
+        profiler.stop()
+    assert not profiler.running
+
+    lines = profiler.collapsed()
+    assert any("busy_work (test_profiler.py:" in line for line in lines)
+    stack, count = lines[0].rsplit(' ', 1)
+    assert int(count) > 0 and ';' in stack
+
+    path = tmp_path / "out" / "profile.folded"
+    assert profiler.dump(path) == sum(profiler.samples.values())
+    assert path.read_text().splitlines() == lines
+    profiler.reset()
+    assert profiler.collapsed() == []
+
+
+def test_idle_profiler_starts_no_thread():
+    profiler = SamplingProfiler()
+    with profiler.sampling():
+        busy_work(0.01)
+    assert not profiler.running
+    assert not profiler.samples
@@ -0,0 +1,159 @@
+from decimal import Decimal
+from pathlib import Path
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.decimal_context import precision_context
+from app.exceptions import OperationError, ValidationError
+from app.operations import Power, Root
+from app.pipeline import Pipeline
+from app.remote_workers import (
+    WorkerPool,
+    WorkerServer,
+    evaluate,
+    parse_address,
+    recv_message,
+    send_message,
+)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def workers():
+    servers = [_serve(WorkerServer(('127.0.0.1', 0))) for _ in range(3)]
+    yield [server.address for server in servers]
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _closed_port_address():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f"127.0.0.1:{sock.getsockname()[1]}"
+
+
+class _DropAfterOneRequest(WorkerServer):
+    """A worker that reads one request and then hangs up without replying."""
+
+    def finish_request(self, request, client_address):
+        recv_message(request)
+
+
+def test_messages_round_trip():
+    left, right = socket.socketpair()
+    with left, right:
+        send_message(left, {'id': 1, 'a': ['1.5']})
+        assert recv_message(right) == {'id': 1, 'a': ['1.5']}
+        left.close()
+        assert recv_message(right) is None
+
+
+def test_parse_address():
+    assert parse_address('localhost:9000') == ('localhost', 9000)
+    with pytest.raises(ValueError):
+        parse_address('localhost')
+
+
+def test_evaluate_reports_errors():
+    request = {'id': 7, 'operation': 'Root', 'prec': 30, 'a': ['-4'], 'b': ['2']}
+    assert evaluate(request) == {
+        'id': 7, 'error': 'Cannot calculate root of negative number (item 0)', 'kind': 'validation'
+    }
+    assert evaluate({'id': 8, 'operation': 'Nope', 'prec': 30, 'a': [], 'b': []})['kind'] == 'operation'
+
+
+@pytest.mark.parametrize('operation', [Power(), Root()])
+def test_pool_matches_local_results_in_order(workers, operation):
+    a = [Decimal(i) / 7 for i in range(1, 501)]
+    b = [Decimal(i % 5 + 1) for i in range(500)]
+    pool = WorkerPool(workers, chunk_size=16, max_in_flight=3)
+    with precision_context(60):
+        assert pool.execute_many(operation, a, b) == operation.execute_many(a, b)
+
+
+def test_small_batches_stay_local():
+    pool = WorkerPool([_closed_port_address()], chunk_size=10)
+    assert pool.execute_many(Power(), [2, 3], [2, 2]) == [Decimal(4), Decimal(9)]
+
+
+def test_validation_errors_are_raised(workers):
+    pool = WorkerPool(workers, chunk_size=4)
+    with pytest.raises(ValidationError, match="Negative exponents"):
+        pool.execute_many(Power(), [1] * 20, [1] * 19 + [-1])
+
+
+def test_failed_workers_are_retried_elsewhere(workers):
+    flaky = _serve(_DropAfterOneRequest(('127.0.0.1', 0)))
+    try:
+        pool = WorkerPool([flaky.address, _closed_port_address(), workers[0]], chunk_size=8, retries=1)
+        a = list(range(200))
+        assert pool.execute_many(Power(), a, [2] * 200) == [Decimal(x) ** 2 for x in a]
+    finally:
+        flaky.shutdown()
+        flaky.server_close()
+
+
+def test_all_workers_failing_raises():
+    pool = WorkerPool([_closed_port_address(), _closed_port_address()], chunk_size=4, retries=1)
+    with pytest.raises(OperationError, match="All workers failed"):
+        pool.execute_many(Power(), [1] * 20, [2] * 20)
+
+
+def test_calculator_runs_pipelines_on_workers(tmp_path, workers):
+    config = CalculatorConfig(base_dir=tmp_path, auto_save=False, workers=workers, worker_chunk_size=8)
+    calc = Calculator(config)
+    assert calc.worker_pool is not None
+    results = calc.run_pipeline(Pipeline([('power', 2), ('root', 2)]), range(1, 41))
+    assert results == [Decimal(x) for x in range(1, 41)]
+    calc.close()
+
+
+def test_calculator_runs_vector_operations_on_workers(tmp_path, workers, monkeypatch):
+    config = CalculatorConfig(base_dir=tmp_path, auto_save=False, workers=workers, worker_chunk_size=8)
+    calc = Calculator(config)
+    calls = []
+    execute_many = calc.worker_pool.execute_many
+    monkeypatch.setattr(
+        calc.worker_pool, 'execute_many', lambda *args: calls.append(args[0]) or execute_many(*args)
+    )
+    assert calc.perform_vector_operation('power', list(range(40)), 2) == [Decimal(x) ** 2 for x in range(40)]
+    assert [str(operation) for operation in calls] == ['Power']
+    # Reductions are not elementwise, so they stay local.
+    assert calc.perform_reduction('sum', range(40)) == Decimal(780)
+    assert len(calls) == 1
+    calc.close()
+
+
+def test_local_worker_processes():
+    processes = [
+        subprocess.Popen(
+            [sys.executable, 'main.py', '--worker', '--port', '0'],
+            cwd=PROJECT_ROOT, stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(2)
+    ]
+    try:
+        addresses = [process.stdout.readline().split()[-1] for process in processes]
+        pool = WorkerPool(addresses, chunk_size=25)
+        a = [Decimal(i) for i in range(100)]
+        with precision_context(40):
+            assert pool.execute_many(Root(), a, [3] * 100) == Root().execute_many(a, [3] * 100)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+            process.stdout.close()
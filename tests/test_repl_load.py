@@ -0,0 +1,31 @@
+from benchmarks.repl_load import check_thresholds, generate_commands, main, run
+
+
+def test_command_stream_is_reproducible():
+    commands = generate_commands(50, seed=3)
+    assert commands == generate_commands(50, seed=3)
+    assert len(commands) == 51 and commands[-1] == 'exit'
+
+
+def test_run_drives_the_real_repl(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = run(generate_commands(100, seed=1), history_size=50, observer_dispatch='sync')
+    assert result['commands'] == 101
+    assert 0 <= result['p50_ms'] <= result['p99_ms'] <= result['max_ms']
+    assert result['by_command']['exit']['count'] == 1
+
+
+def test_run_with_seeded_history(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    commands = ['history', 'add 1 2', 'save', 'exit']
+    result = run(commands, history_size=100, observer_dispatch='sync', history_rows=500)
+    assert result['commands'] == 4
+    assert result['startup_ms'] > 0
+
+
+def test_thresholds_fail_the_run():
+    result = {'p99_ms': 12.0, 'peak_rss_mb': 300.0}
+    assert check_thresholds(result) == []
+    failures = check_thresholds(result, max_p99_ms=5, max_rss_mb=100)
+    assert len(failures) == 2
+    assert main(['--commands', '20', '--max-p99-ms', '0']) == 1
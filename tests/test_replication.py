@@ -0,0 +1,239 @@
+from decimal import Decimal
+from pathlib import Path
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import OperationError
+from app.operations import OperationFactory
+from app.replication import ReplicationLog, apply_event, history_edit
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def snapshot(calc):
+    return [(c.operation, c.operand1, c.operand2, c.result, c.timestamp) for c in calc.history]
+
+
+@pytest.fixture
+def pair(tmp_path, monkeypatch):
+    monkeypatch.setenv("CALCULATOR_REPLICATION_FILE", str(tmp_path / "shared" / "replication.jsonl"))
+    primary = Calculator(CalculatorConfig(
+        base_dir=tmp_path / "primary", auto_save=False, max_history_size=3, replication='primary'
+    ))
+    follower = Calculator(CalculatorConfig(base_dir=tmp_path / "follower", replication='follower'))
+    follower.replication_follower.stop()  # the tests poll explicitly
+    yield primary, follower
+    primary.close()
+    follower.close()
+
+
+def test_history_edit_round_trips():
+    calcs = [Calculation('Addition', Decimal(i), Decimal(1)) for i in range(6)]
+    before, after = calcs[1:4], calcs[0:3]  # undo that restores an evicted entry
+    edit = history_edit(before, after)
+    assert (edit['drop_head'], len(edit['head']), edit['drop_tail'], edit['tail']) == (0, 1, 1, [])
+    assert apply_event(before, {'type': 'undo', **edit}) == after
+    edit = history_edit(calcs[:2], calcs[4:])
+    assert apply_event(calcs[:2], {'type': 'redo', **edit}) == calcs[4:]
+    with pytest.raises(ValueError):
+        apply_event([], {'type': 'bogus'})
+
+
+def test_follower_tracks_every_history_event(pair):
+    primary, follower = pair
+    add = OperationFactory.create_operation('add')
+    primary.set_operation(add)
+    for i in range(5):
+        primary.perform_operation(i, 1)
+    primary.perform_reduction('sum', [1, 2, 3])
+    primary.undo()
+    primary.undo()
+    primary.redo()
+
+    status = follower.replication_status()
+    assert status['events_behind'] > 0
+    follower.replication_follower.poll()
+    assert snapshot(follower) == snapshot(primary)
+    assert follower.replication_status()['events_behind'] == 0
+    assert follower.replication_status()['applied_seq'] == primary.replication_status()['seq']
+
+    primary.clear_history()
+    primary.perform_operation(7, 7)
+    follower.replication_follower.poll()
+    assert snapshot(follower) == snapshot(primary)
+
+
+def test_partial_lines_wait_for_the_writer(pair):
+    primary, follower = pair
+    primary.set_operation(OperationFactory.create_operation('multiply'))
+    primary.perform_operation(2, 3)
+    with open(primary.config.replication_file, 'a') as f:
+        f.write('{"seq": 99, "ty')
+    follower.replication_follower.poll()
+    assert [c.result for c in follower.history] == [Decimal(6)]
+    assert follower.replication_follower.poll() == 0
+
+
+def test_log_sequence_survives_restarts(tmp_path):
+    path = tmp_path / "replication.jsonl"
+    log = ReplicationLog(path)
+    log.publish('clear')
+    log.publish('clear')
+    log.close()
+    assert ReplicationLog(path).seq == 2
+
+
+def test_follower_process_replicates_primary_process(tmp_path, monkeypatch):
+    shared = tmp_path / "replication.jsonl"
+    monkeypatch.setenv("CALCULATOR_REPLICATION_FILE", str(shared))
+    script = (
+        "from pathlib import Path\n"
+        "from app.calculator import Calculator\n"
+        "from app.calculator_config import CalculatorConfig\n"
+        "from app.operations import OperationFactory\n"
+        f"calc = Calculator(CalculatorConfig(base_dir=Path({str(tmp_path / 'primary')!r}),"
+        " auto_save=False, replication='primary'))\n"
+        "calc.set_operation(OperationFactory.create_operation('power'))\n"
+        "for i in range(20):\n"
+        "    calc.perform_operation(i, 2)\n"
+        "calc.undo()\n"
+        "calc.close()\n"
+    )
+    follower = Calculator(CalculatorConfig(base_dir=tmp_path / "follower", replication='follower'))
+    follower.replication_follower.poll_interval = 0.02
+    try:
+        subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, check=True)
+        deadline = time.monotonic() + 10
+        while follower.replication_status()['events_behind'] and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert [c.operand1 for c in follower.history] == [Decimal(i) for i in range(19)]
+        assert follower.history[-1].result == Decimal(324)
+    finally:
+        follower.close()
+
+
+def test_replicated_results_are_not_recomputed(monkeypatch):
+    def recompute(self):
+        raise AssertionError("recomputed")
+
+    monkeypatch.setattr(Calculation, 'calculate', recompute)
+    record = {
+        'operation': 'Modulus', 'operand1': '7', 'operand2': '4',
+        'result': '3', 'timestamp': '2024-01-01T00:00:00',
+    }
+    history = apply_event([], {'type': 'append', 'calcs': [record]})
+    assert [(c.operation, c.result) for c in history] == [('Modulus', Decimal(3))]
+
+
+def test_bad_events_are_skipped(pair, monkeypatch):
+    primary, follower = pair
+    warnings = []
+    monkeypatch.setattr('app.replication.logging.warning', warnings.append)
+    primary.set_operation(OperationFactory.create_operation('add'))
+    primary.perform_operation(1, 1)
+    with open(primary.config.replication_file, 'a') as f:
+        f.write('not json\n{"seq": 50, "time": 0, "type": "bogus"}\n')
+    primary.perform_operation(2, 2)
+    assert follower.replication_follower.poll() == 2
+    assert snapshot(follower) == snapshot(primary)
+    assert len(warnings) == 2
+    assert follower.replication_follower.poll() == 0
+    assert len(warnings) == 2
+
+
+def test_log_is_compacted(tmp_path, monkeypatch):
+    monkeypatch.setenv("CALCULATOR_REPLICATION_FILE", str(tmp_path / "replication.jsonl"))
+    primary = Calculator(CalculatorConfig(
+        base_dir=tmp_path / "primary", auto_save=False, max_history_size=3,
+        replication='primary', replication_max_bytes=2000
+    ))
+    follower = Calculator(CalculatorConfig(base_dir=tmp_path / "follower", replication='follower'))
+    follower.replication_follower.stop()
+    try:
+        primary.set_operation(OperationFactory.create_operation('add'))
+        for i in range(100):
+            primary.perform_operation(i, 1)
+            if i % 7 == 0:
+                follower.replication_follower.poll()
+            assert primary.config.replication_file.stat().st_size <= 2000 + 1000
+        follower.replication_follower.poll()
+        assert snapshot(follower) == snapshot(primary)
+        assert follower.replication_status()['events_behind'] == 0
+    finally:
+        primary.close()
+        follower.close()
+
+
+def test_sqlite_follower_keeps_rows_beyond_the_window(tmp_path, monkeypatch):
+    monkeypatch.setenv("CALCULATOR_REPLICATION_FILE", str(tmp_path / "replication.jsonl"))
+    primary = Calculator(CalculatorConfig(
+        base_dir=tmp_path / "primary", auto_save=False, max_history_size=3, replication='primary'
+    ))
+    follower = Calculator(CalculatorConfig(
+        base_dir=tmp_path / "follower", auto_save=False, history_backend='sqlite', replication='follower'
+    ))
+    follower.replication_follower.stop()
+
+    def stored():
+        follower.replication_follower.poll()
+        follower.save_history()
+        return [c.operand1 for c in follower.storage.query()]
+
+    try:
+        primary.set_operation(OperationFactory.create_operation('add'))
+        for i in range(3):
+            primary.perform_operation(i, 1)
+        assert stored() == [Decimal(0), Decimal(1), Decimal(2)]
+        for i in range(3, 5):
+            primary.perform_operation(i, 1)
+        primary.undo()
+        assert stored() == [Decimal(i) for i in range(4)]
+        primary.clear_history()
+        primary.perform_operation(9, 1)
+        assert stored() == [Decimal(9)]
+    finally:
+        primary.close()
+        follower.close()
+
+
+def test_batch_of_skipped_events_leaves_history_alone(pair, monkeypatch):
+    primary, follower = pair
+    primary.set_operation(OperationFactory.create_operation('add'))
+    primary.perform_operation(1, 1)
+    follower.replication_follower.poll()
+    monkeypatch.setattr('app.replication.logging.warning', lambda message: None)
+    with open(primary.config.replication_file, 'a') as f:
+        f.write('not json\n')
+    replaced = []
+    monkeypatch.setattr(follower, 'replace_history', lambda *args, **kwargs: replaced.append(args))
+    assert follower.replication_follower.poll() == 0
+    assert replaced == []
+
+
+def test_follower_is_read_only(pair):
+    _, follower = pair
+    follower.set_operation(OperationFactory.create_operation('add'))
+    for mutate in (
+        lambda: follower.perform_operation(1, 1),
+        lambda: follower.perform_reduction('sum', [1, 2]),
+        lambda: follower.perform_vector_operation('add', [1], [2]),
+        follower.undo,
+        follower.redo,
+        follower.clear_history,
+    ):
+        with pytest.raises(OperationError, match="read-only"):
+            mutate()
+
+
+def test_follower_defaults_to_its_own_history_file(tmp_path):
+    primary = CalculatorConfig(base_dir=tmp_path, replication='primary')
+    follower = CalculatorConfig(base_dir=tmp_path, replication='follower')
+    assert follower.replication_file == primary.replication_file
+    assert follower.history_file != primary.history_file
+    assert follower.history_db_file != primary.history_db_file
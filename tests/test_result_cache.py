@@ -0,0 +1,47 @@
+from decimal import Decimal
+
+from app.result_cache import ResultCache, cache_key, canonical
+
+
+def test_canonical_operands():
+    assert canonical(Decimal('2.50')) == canonical(Decimal('2.5')) == '2.5'
+    assert canonical(Decimal('100')) == '1E+2'
+    long = Decimal('1.' + '3' * 60)
+    assert canonical(long) == str(long)
+    assert cache_key('Power', Decimal('2.0'), Decimal('3'), 33) == 'Power|2|3|33'
+
+
+def test_get_put_and_persistence(tmp_path):
+    path = tmp_path / 'cache.db'
+    cache = ResultCache(path)
+    assert cache.get('Power', Decimal(2), Decimal(10), 33) is None
+    cache.put('Power', Decimal(2), Decimal(10), 33, Decimal(1024))
+    assert cache.get('Power', Decimal('2.00'), Decimal(10), 33) == Decimal(1024)
+    assert cache.get('Power', Decimal(2), Decimal(10), 40) is None
+    cache.close()
+
+    reopened = ResultCache(path)
+    assert reopened.get('Power', Decimal(2), Decimal(10), 33) == Decimal(1024)
+    report = reopened.report()
+    assert (report['hits'], report['misses'], report['entries']) == (1, 0, 1)
+    assert report['bytes'] > 0
+    reopened.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(tmp_path / 'cache.db', max_bytes=400)
+    for i in range(5):
+        cache.put('Root', Decimal(i), Decimal(2), 33, Decimal(i).sqrt())
+    cache.get('Root', Decimal(0), Decimal(2), 33)  # keep the oldest entry warm
+    for i in range(5, 10):
+        cache.put('Root', Decimal(i), Decimal(2), 33, Decimal(i).sqrt())
+
+    report = cache.report()
+    assert report['evictions'] > 0
+    assert report['bytes'] <= 400
+    assert cache.get('Root', Decimal(0), Decimal(2), 33) is not None
+    assert cache.get('Root', Decimal(1), Decimal(2), 33) is None
+    assert cache.get('Root', Decimal(9), Decimal(2), 33) is not None
+    cache.clear()
+    assert cache.report()['entries'] == 0
+    cache.close()
@@ -0,0 +1,61 @@
+from decimal import Decimal
+import pytest
+
+from app.calculation import Calculation
+from app.exceptions import OperationError
+from app.tiered_history import SegmentStore, estimate_size
+
+
+def make_calcs(start, count):
+    return [
+        Calculation(operation="Addition", operand1=Decimal(i), operand2=Decimal(1))
+        for i in range(start, start + count)
+    ]
+
+
+def test_segments_are_sealed_when_full(tmp_path):
+    store = SegmentStore(tmp_path, segment_size=3)
+    store.append(make_calcs(0, 2))
+    assert list(tmp_path.iterdir()) == []
+    store.append(make_calcs(2, 2))
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names == ["segment-000000000000-000003.jsonl.gz"]
+    assert len(store) == 4
+
+
+def test_range_reads_span_segments_and_buffer(tmp_path):
+    store = SegmentStore(tmp_path, segment_size=3)
+    store.append(make_calcs(0, 8))
+    assert [int(c.operand1) for c in store.iter_range(2, 7)] == [2, 3, 4, 5, 6]
+    assert [int(c.operand1) for c in store.iter_range()] == list(range(8))
+    chunks = list(store.iter_records(chunk_size=5))
+    assert [len(chunk) for chunk in chunks] == [5, 3]
+
+
+def test_segments_survive_reopen(tmp_path):
+    store = SegmentStore(tmp_path, segment_size=3)
+    store.append(make_calcs(0, 4))
+    store.flush()
+    reopened = SegmentStore(tmp_path, segment_size=3)
+    assert len(reopened) == 4
+    reopened.append(make_calcs(4, 3))
+    assert [int(c.operand1) for c in reopened.iter_range(3, 6)] == [3, 4, 5]
+
+
+def test_clear_removes_segments(tmp_path):
+    store = SegmentStore(tmp_path, segment_size=2)
+    store.append(make_calcs(0, 5))
+    store.clear()
+    assert len(store) == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_invalid_sizes(tmp_path):
+    with pytest.raises(OperationError):
+        SegmentStore(tmp_path, segment_size=0)
+    with pytest.raises(OperationError):
+        list(SegmentStore(tmp_path).iter_records(chunk_size=0))
+
+
+def test_estimate_size_is_positive():
+    assert estimate_size(make_calcs(0, 1)[0]) > 100
@@ -0,0 +1,91 @@
+from decimal import Decimal
+
+from app.calculation import Calculation
+from app.undo_journal import UndoJournal, delta_between, make_delta
+
+
+def make_delta_for(value):
+    calc = Calculation(operation="Addition", operand1=Decimal(value), operand2=Decimal(0))
+    return make_delta([calc], [])
+
+
+def test_journal_replays_stack_operations(tmp_path):
+    path = tmp_path / "undo.jsonl"
+    journal = UndoJournal(path)
+    for i in range(3):
+        journal.record(make_delta_for(i))
+    journal.drop('undo')
+    journal.push('redo', make_delta_for(2))
+    journal.close()
+
+    reopened = UndoJournal(path)
+    assert not reopened.loaded
+    assert reopened.depth('undo') == 2
+    assert reopened.pop('redo')['calcs'][0]['operand1'] == '2'
+    assert reopened.pop('redo') is None
+    assert reopened.pop('undo')['calcs'][0]['operand1'] == '1'
+    reopened.close()
+
+
+def test_recording_a_step_drops_redo(tmp_path):
+    journal = UndoJournal(tmp_path / "undo.jsonl")
+    journal.push('redo', make_delta_for(1))
+    journal.record(make_delta_for(2))
+    assert journal.depth('redo') == 0
+    journal.clear()
+    assert journal.depth('undo') == 0
+
+
+def test_load_compacts_dead_entries(tmp_path):
+    path = tmp_path / "undo.jsonl"
+    journal = UndoJournal(path, compact_slack=0)
+    for i in range(10):
+        journal.record(make_delta_for(i))
+        journal.drop('undo')
+    journal.record(make_delta_for(99))
+    journal.close()
+
+    reopened = UndoJournal(path, compact_slack=0)
+    assert reopened.depth('undo') == 1
+    assert len(path.read_text().splitlines()) == 1
+
+
+def test_delta_between_lists_evictions():
+    calcs = [Calculation(operation="Addition", operand1=Decimal(i), operand2=Decimal(0)) for i in range(4)]
+    delta = delta_between(calcs[:3], calcs[1:])
+    assert [record['operand1'] for record in delta['calcs']] == ['3']
+    assert [record['operand1'] for record in delta['evicted']] == ['0']
+
+
+def test_stacks_are_capped_at_max_depth(tmp_path):
+    path = tmp_path / "undo.jsonl"
+    journal = UndoJournal(path, max_depth=3)
+    journal.load()
+    for i in range(5):
+        journal.record(make_delta_for(i))
+    assert journal.depth('undo') == 3
+    journal.close()
+
+    reopened = UndoJournal(path, max_depth=3)
+    assert [delta['calcs'][0]['operand1'] for delta in reopened.load()['undo']] == ['2', '3', '4']
+
+
+def test_journal_compacts_while_recording(tmp_path):
+    path = tmp_path / "undo.jsonl"
+    journal = UndoJournal(path, compact_slack=4, max_depth=2)
+    for i in range(20):
+        journal.record(make_delta_for(i))
+        assert len(path.read_text().splitlines()) <= 2 * 2 + 2 * 4 + 1
+    assert journal.depth('undo') == 2
+    journal.close()
+
+
+def test_close_compacts_across_sessions(tmp_path):
+    path = tmp_path / "undo.jsonl"
+    for session in range(10):
+        journal = UndoJournal(path, compact_slack=4, max_depth=2)
+        journal.record(make_delta_for(2 * session))
+        journal.record(make_delta_for(2 * session + 1))
+        journal.close()
+    assert len(path.read_text().splitlines()) <= 2 * 2 + 4
+    assert UndoJournal(path, max_depth=2).depth('undo') == 2